@@ -1,14 +1,29 @@
 import streamlit as st
-import fitz  # PyMuPDF
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
+import copy
+import hashlib
+import io
 import os
-from utils.rl_agent import SimpleRLAgent
-from utils.decision import make_decision, save_results_to_csv, save_results_to_json
+import time
+from utils.rl_agent import build_trained_agent
+from utils.decision import format_decision, make_decision, results_to_csv, results_to_json
+from utils.pdf_extract import extract_texts
+from utils.cv_cache import CvCache, content_key
+from utils.document import Document
+from utils import instrumentation
 
 st.set_page_config(page_title="Talha AI HR Matcher", layout="wide", page_icon="📄")
 
+@st.cache_resource
+def get_cv_cache():
+    return CvCache()
+
+@st.cache_resource
+def get_trained_agent():
+    return build_trained_agent()
+
 # Custom CSS styling
 st.markdown("""
     <style>
@@ -60,158 +75,224 @@ with tab1:
         min_similarity_threshold = st.slider(
             "Minimum Similarity Score Required", 0.0, 1.0, 0.5, step=0.05
         )
+        merge_duplicates = st.checkbox("Score near-duplicate CVs once", value=False)
+        dedup_threshold = st.slider(
+            "Near-duplicate Jaccard threshold", 0.5, 1.0, 0.9, step=0.05, disabled=not merge_duplicates
+        )
+        trace_memory = st.checkbox("Trace peak memory per stage (slower)", value=False)
 
     run_button = st.button("🚀 Run Matching")
 
+@st.cache_resource(max_entries=4)
+def build_results_table(results_key, _results):
+    """DataFrame and styled table for one set of results (keyed by its digest)."""
+    results_df = pd.DataFrame(_results)
+
+    def color_decision(val):
+        if val == "Hire":
+            return 'background-color: #b6ffb3; color: black;'  # green
+        elif val == "Reject":
+            return 'background-color: #ffb3b3; color: black;'  # red
+        elif val == "Reassign":
+            return 'background-color: #fff5b3; color: black;'  # yellow
+        return ''
+
+    return results_df, results_df.style.applymap(color_decision, subset=['decision'])
+
+def fig_to_png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buffer.getvalue()
+
+@st.cache_data(max_entries=4)
+def render_result_figures(results_key, _results_df):
+    """Render every chart once per set of results; reruns reuse the PNG bytes."""
+    results_df = _results_df
+    figures = []
+
+    # Similarity Score Distribution
+    fig, ax = plt.subplots(figsize=(10, 5))
+    sns.barplot(data=results_df, x="cv_name", y="similarity_score_%", palette="Blues_d", ax=ax)
+    ax.set_title("Similarity Scores per CV")
+    ax.set_xlabel("CV Filename")
+    ax.set_ylabel("Similarity Score (%)")
+    plt.setp(ax.get_xticklabels(), rotation=45)
+    figures.append(("### 🔍 Similarity Score Distribution", fig_to_png(fig)))
+
+    # Sentiment Distribution Pie Chart
+    sentiment_counts = results_df['sentiment_label'].value_counts()
+    fig1, ax1 = plt.subplots()
+    ax1.pie(sentiment_counts, labels=sentiment_counts.index, autopct='%1.1f%%', startangle=90)
+    ax1.axis('equal')
+    figures.append(("### 🧠 Sentiment Distribution", fig_to_png(fig1)))
+
+    # Decision Actions Distribution
+    decision_counts = results_df['decision'].value_counts()
+    fig2, ax2 = plt.subplots()
+    sns.barplot(x=decision_counts.index, y=decision_counts.values, palette="Set2", ax=ax2)
+    ax2.set_title("Actions Taken by RL Agent")
+    ax2.set_ylabel("Count")
+    figures.append(("### 🧾 Decision Actions Distribution", fig_to_png(fig2)))
+
+    # Degree Match Pie Chart
+    degree_counts = results_df['degree_match'].value_counts()
+    degree_counts = degree_counts.reindex([True, False], fill_value=0)
+    fig3, ax3 = plt.subplots()
+    ax3.pie(
+        degree_counts,
+        labels=["Match", "Mismatch"],
+        autopct='%1.1f%%',
+        startangle=90,
+        colors=["#4CAF50", "#F44336"]
+    )
+    ax3.set_title("Degree Match Distribution", fontsize=14, fontweight='bold')
+    ax3.axis('equal')
+    figures.append((None, fig_to_png(fig3)))
+
+    # Skill Match Pie Chart
+    def skill_category(pct):
+        if pct >= 0.8:
+            return "High Match"
+        elif pct >= 0.5:
+            return "Medium Match"
+        else:
+            return "Low Match"
+
+    skill_cats = results_df['skill_match_%'].apply(skill_category)
+    skill_counts = skill_cats.value_counts()
+    fig4, ax4 = plt.subplots()
+    ax4.pie(
+        skill_counts,
+        labels=skill_counts.index,
+        autopct='%1.1f%%',
+        startangle=90,
+        colors=["#4CAF50", "#FFC107", "#F44336"]  # green, yellow, red
+    )
+    ax4.set_title(f"Candidate Skill Match Distribution (n = {len(results_df)})",
+                  fontsize=14, fontweight='bold')
+    ax4.axis('equal')
+    figures.append((None, fig_to_png(fig4)))
+    return figures
+
 with tab2:
     if 'results' in st.session_state:
         st.success("✅ Decision Results")
 
-        results_df = pd.DataFrame(st.session_state['results'])
-
-        def color_decision(val):
-            if val == "Hire":
-                return 'background-color: #b6ffb3; color: black;'  # green
-            elif val == "Reject":
-                return 'background-color: #ffb3b3; color: black;'  # red
-            elif val == "Reassign":
-                return 'background-color: #fff5b3; color: black;'  # yellow
-            return ''
+        results_key = st.session_state['results_key']
+        results_df, styled_results = build_results_table(results_key, st.session_state['results'])
 
         st.markdown("### 📄 Candidate Decisions (with explanations)")
-        st.dataframe(results_df.style.applymap(color_decision, subset=['decision']))
-
-        # Similarity Score Distribution
-        st.markdown("### 🔍 Similarity Score Distribution")
-        fig, ax = plt.subplots(figsize=(10, 5))
-        sns.barplot(data=results_df, x="cv_name", y="similarity_score_%", palette="Blues_d", ax=ax)
-        ax.set_title("Similarity Scores per CV")
-        ax.set_xlabel("CV Filename")
-        ax.set_ylabel("Similarity Score (%)")
-        plt.xticks(rotation=45)
-        st.pyplot(fig)
-
-        # Sentiment Distribution Pie Chart
-        st.markdown("### 🧠 Sentiment Distribution")
-        sentiment_counts = results_df['sentiment_label'].value_counts()
-        fig1, ax1 = plt.subplots()
-        ax1.pie(sentiment_counts, labels=sentiment_counts.index, autopct='%1.1f%%', startangle=90)
-        ax1.axis('equal')
-        st.pyplot(fig1)
-
-        # Decision Actions Distribution
-        st.markdown("### 🧾 Decision Actions Distribution")
-        decision_counts = results_df['decision'].value_counts()
-        fig2, ax2 = plt.subplots()
-        sns.barplot(x=decision_counts.index, y=decision_counts.values, palette="Set2", ax=ax2)
-        ax2.set_title("Actions Taken by RL Agent")
-        ax2.set_ylabel("Count")
-        st.pyplot(fig2)
-
-        # Degree Match Pie Chart
-        degree_counts = results_df['degree_match'].value_counts()
-        degree_counts = degree_counts.reindex([True, False], fill_value=0)
-        fig3, ax3 = plt.subplots()
-        ax3.pie(
-            degree_counts,
-            labels=["Match", "Mismatch"],
-            autopct='%1.1f%%',
-            startangle=90,
-            colors=["#4CAF50", "#F44336"]
-        )
-        ax3.set_title("Degree Match Distribution", fontsize=14, fontweight='bold')
-        ax3.axis('equal')
-        st.pyplot(fig3)
-
-        # Skill Match Pie Chart
-        def skill_category(pct):
-            if pct >= 0.8:
-                return "High Match"
-            elif pct >= 0.5:
-                return "Medium Match"
-            else:
-                return "Low Match"
-
-        skill_cats = results_df['skill_match_%'].apply(skill_category)
-        skill_counts = skill_cats.value_counts()
-        fig4, ax4 = plt.subplots()
-        ax4.pie(
-            skill_counts,
-            labels=skill_counts.index,
-            autopct='%1.1f%%',
-            startangle=90,
-            colors=["#4CAF50", "#FFC107", "#F44336"]  # green, yellow, red
-        )
-        ax4.set_title(f"Candidate Skill Match Distribution (n = {len(results_df)})",
-                      fontsize=14, fontweight='bold')
-        ax4.axis('equal')
-        st.pyplot(fig4)
-
-        # Download Buttons
-        try:
-            with open("final_results.csv", "rb") as f_csv:
-                csv_data = f_csv.read()
-            with open("final_results.json", "rb") as f_json:
-                json_data = f_json.read()
-            st.download_button("⬇️ Download CSV", data=csv_data, file_name="results.csv")
-            st.download_button("⬇️ Download JSON", data=json_data, file_name="results.json")
-        except Exception as e:
-            st.error(f"Error loading result files for download: {e}")
+        st.dataframe(styled_results)
+
+        for heading, png in render_result_figures(results_key, results_df):
+            if heading:
+                st.markdown(heading)
+            st.image(png)
+
+        # Download Buttons (buffers are built once per run)
+        csv_data, json_data = st.session_state['downloads']
+        st.download_button("⬇️ Download CSV", data=csv_data, file_name="results.csv")
+        st.download_button("⬇️ Download JSON", data=json_data, file_name="results.json")
 
     else:
         st.info("Run the matching first in the Input tab.")
 
+def render_run_report(run_report):
+    """Per-stage timing breakdown, counters and decision log of the last run."""
+    report = run_report["report"]
+    st.markdown(f"### ⏱️ Last run: {run_report['total_s']:.2f}s")
+    if report["stages"]:
+        stages_df = pd.DataFrame.from_dict(report["stages"], orient="index")
+        stages_df.index.name = "stage"
+        if stages_df["peak_kb"].isna().all():
+            stages_df = stages_df.drop(columns="peak_kb")
+        st.dataframe(stages_df)
+        st.bar_chart(stages_df["total_s"])
+    if report["counters"]:
+        st.json(report["counters"])
+    with st.expander("Decision log", expanded=False):
+        st.text("\n".join(format_decision(e) for e in run_report["events"] if e["event"] == "decision"))
+    st.download_button("⬇️ Download run log (JSON)", data=run_report["json"], file_name="run_log.json")
+
 with tab3:
-    st.text("Logs and system updates will appear here.")
-
-def extract_text_from_pdf(file):
-    try:
-        file_bytes = file.read()
-        doc = fitz.open(stream=file_bytes, filetype="pdf")
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        doc.close()
-        return text
-    except Exception as e:
-        st.error(f"Failed to extract text from PDF: {e}")
-        return ""
+    logs_area = st.empty()
+    with logs_area.container():
+        if 'run_report' in st.session_state:
+            render_run_report(st.session_state['run_report'])
+        else:
+            st.text("Logs and system updates will appear here.")
+    cache_stats = get_cv_cache().stats()
+    st.caption(
+        f"CV cache: {cache_stats['entries']} entries, {cache_stats['bytes'] / 1e6:.1f} MB | "
+        f"hits {sum(cache_stats['hits'].values())}, misses {sum(cache_stats['misses'].values())}"
+    )
+
+# Documents keyed by their file bytes, so extraction and parsing share cache entries
+def extract_texts_from_pdfs(files, cache):
+    file_bytes = [f.getvalue() for f in files]
+    keys = [content_key(data) for data in file_bytes]
+    texts = cache.get_many(keys, "raw_text")
+
+    missing = [i for i, text in enumerate(texts) if text is None]
+    extracted, errors = extract_texts([file_bytes[i] for i in missing])
+    failed = set()
+    for j, i in enumerate(missing):
+        texts[i] = extracted[j]
+        if j in errors:
+            st.error(f"Failed to extract text from {files[i].name}: {errors[j].split(': ', 1)[-1]}")
+            failed.add(i)
+    stored = [i for i in missing if i not in failed]
+    cache.put_many([keys[i] for i in stored], raw_text=[texts[i] for i in stored])
+    return [Document(text, key, cacheable=i not in failed) for i, (text, key) in enumerate(zip(texts, keys))]
 
 if run_button:
     if uploaded_cvs and jd_text.strip() and feedback_input.strip():
         with st.spinner("Processing CVs and feedback..."):
-            cv_texts = [extract_text_from_pdf(f) for f in uploaded_cvs]
-            feedbacks = [line.strip() for line in feedback_input.strip().split("\n") if line.strip()]
-
-            if len(cv_texts) != len(feedbacks):
-                st.error("⚠️ Number of CVs and HR feedbacks must be the same!")
-            else:
-                agent = SimpleRLAgent(["Hire", "Reject", "Reassign"])
-
-                training_data = [
-                    (0.85, "Positive", 1, 1, "Hire", 10),
-                    (0.20, "Negative", 0, 0, "Reject", 9),
-                    (0.60, "Neutral", 1, 0, "Reassign", 6),
-                ]
-
-                for sim, sent, deg, skill, act, rew in training_data:
-                    agent.update(sim, sent, deg, skill, act, rew)
-
-                results = make_decision(
-                    cv_texts,
-                    jd_text,
-                    feedbacks,
-                    agent,
-                    similarity_threshold=min_similarity_threshold,
-                    skill_match_threshold=min_skill_threshold
-                )
-
-                for i, res in enumerate(results):
-                    res['cv_name'] = uploaded_cvs[i].name
-
-                st.session_state['results'] = results
-                save_results_to_csv(results, "final_results.csv")
-                save_results_to_json(results, "final_results.json")
+            run_start = time.perf_counter()
+            with instrumentation.collect(trace_memory=trace_memory) as run_stats:
+                cv_cache = get_cv_cache()
+                cv_texts = extract_texts_from_pdfs(uploaded_cvs, cv_cache)
+                feedbacks = [line.strip() for line in feedback_input.strip().split("\n") if line.strip()]
+
+                if len(cv_texts) != len(feedbacks):
+                    st.error("⚠️ Number of CVs and HR feedbacks must be the same!")
+                else:
+                    # Every run starts from the same trained agent
+                    agent = copy.deepcopy(get_trained_agent())
+
+                    results = make_decision(
+                        cv_texts,
+                        jd_text,
+                        feedbacks,
+                        agent,
+                        similarity_threshold=min_similarity_threshold,
+                        skill_match_threshold=min_skill_threshold,
+                        cache=cv_cache,
+                        dedup_threshold=dedup_threshold if merge_duplicates else None
+                    )
+
+                    for i, res in enumerate(results):
+                        res['cv_name'] = uploaded_cvs[i].name
+
+                    csv_data = results_to_csv(results).encode("utf-8")
+                    json_data = results_to_json(results).encode("utf-8")
+                    st.session_state['results'] = results
+                    st.session_state['results_key'] = hashlib.sha256(json_data).hexdigest()
+                    st.session_state['downloads'] = (csv_data, json_data)
+                    with open("final_results.csv", "wb") as f_csv:
+                        f_csv.write(csv_data)
+                    with open("final_results.json", "wb") as f_json:
+                        f_json.write(json_data)
+
+            st.session_state['run_report'] = {
+                "total_s": time.perf_counter() - run_start,
+                "report": run_stats.report(),
+                "events": run_stats.events(),
+                "json": run_stats.to_json().encode("utf-8"),
+            }
+            with logs_area.container():
+                render_run_report(st.session_state['run_report'])
     else:
         st.warning("Please upload CVs, paste JD, and enter feedbacks.")
 
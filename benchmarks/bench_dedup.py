@@ -0,0 +1,109 @@
+"""
+Near-duplicate detection (utils/dedup.py) on synthetic CVs with planted copies.
+
+--duplicates CVs are copies of earlier ones with --edit-rate of their words
+dropped or replaced. For each threshold the script reports:
+- eligible: planted copies whose exact shingle Jaccard with their original
+  reaches the threshold
+- recall: share of eligible copies clustered with their original
+- false merges: CVs merged with a representative of a different original
+- detection time, and make_decision time with dedup_threshold (the time
+  without it is printed first)
+
+    python benchmarks/bench_dedup.py --candidates 2000 --duplicates 500 --edit-rate 0.03
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+sys.path.append(os.path.dirname(__file__))
+from synthetic import FILLER, generate_cvs, generate_feedbacks, generate_jds
+from utils.decision import make_decision
+from utils.dedup import find_duplicates, jaccard, shingles
+from utils.document import Document
+from utils.rl_agent import build_trained_agent
+from utils.sentiment import get_analyzer
+from utils.universal_parser import get_nlp
+
+
+def near_copy(rng, text, edit_rate):
+    words = text.split(" ")
+    out = []
+    for word in words:
+        roll = rng.random()
+        if roll < edit_rate / 2:
+            continue
+        out.append(rng.choice(FILLER) if roll < edit_rate else word)
+    return " ".join(out)
+
+
+def planted_corpus(n, duplicates, edit_rate, seed):
+    """CV texts plus the index each planted copy was made from (None for originals)."""
+    rng = random.Random(f"dedup-{seed}")
+    texts = generate_cvs(n, seed)
+    source = [None] * n
+    for _ in range(duplicates):
+        original = rng.randrange(n)
+        texts.append(near_copy(rng, texts[original], edit_rate))
+        source.append(original)
+    order = list(range(len(texts)))
+    rng.shuffle(order)
+    new_position = {old: new for new, old in enumerate(order)}
+    return [texts[i] for i in order], [None if source[i] is None else new_position[source[i]] for i in order]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=2000)
+    parser.add_argument("--duplicates", type=int, default=500)
+    parser.add_argument("--edit-rate", type=float, default=0.03)
+    parser.add_argument("--thresholds", default="0.95,0.9,0.8")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    raw_texts, source = planted_corpus(args.candidates, args.duplicates, args.edit_rate, args.seed)
+    texts = [Document(text) for text in raw_texts]
+    planted = {i: s for i, s in enumerate(source) if s is not None}
+    planted_jaccard = {i: jaccard(shingles(texts[i]), shingles(texts[s])) for i, s in planted.items()}
+    feedbacks = generate_feedbacks(len(texts), args.seed)
+    jd = generate_jds(1, args.seed)[0]
+    get_nlp()
+    get_analyzer()
+
+    def timed_decision(threshold):
+        random.seed(args.seed)
+        agent = build_trained_agent()
+        docs = [Document(text) for text in raw_texts]   # no cleaning carried over between runs
+        start = time.perf_counter()
+        make_decision(docs, jd, feedbacks, agent, 0.05, 0.2, dedup_threshold=threshold)
+        return time.perf_counter() - start
+
+    baseline_s = timed_decision(None)
+    print(f"{len(texts)} CVs ({len(planted)} planted copies); make_decision without dedup {baseline_s:.2f}s")
+    print(f"{'threshold':>9s} {'eligible':>9s} {'recall':>7s} {'false merges':>12s} {'detect s':>9s} "
+          f"{'decision s':>11s}")
+    for threshold in [float(t) for t in args.thresholds.split(",")]:
+        start = time.perf_counter()
+        duplicate_of = find_duplicates(texts, threshold)
+        detect_s = time.perf_counter() - start
+
+        # A planted copy is found when it lands in the same cluster as its original;
+        # a merge is false when the CV and its representative come from different originals
+        def root(i):
+            return i if duplicate_of[i] is None else duplicate_of[i]
+
+        def original(i):
+            return i if source[i] is None else source[i]
+        eligible = [i for i in planted if planted_jaccard[i] >= threshold]
+        found = sum(root(i) == root(planted[i]) for i in eligible)
+        false_merges = sum(rep is not None and original(i) != original(rep) for i, rep in enumerate(duplicate_of))
+        print(f"{threshold:>9.2f} {len(eligible):>9d} {found / max(len(eligible), 1):>7.3f} {false_merges:>12d} "
+              f"{detect_s:>9.2f} {timed_decision(threshold):>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Repeated string preparation per CV: each stage given the raw string (every
+stage lowers or cleans it itself) versus one shared Document.
+
+Both paths call the real stage entry points on every CV:
+- clean_of: the cleaned text compute_similarity vectorizes
+- CvFeatureExtractor.extract: the parser (lowercases its input)
+- skill_bonus: the matcher's JD-skill bonus (lowercases its input)
+The first column times the string preparation alone (clean_of + lower_of),
+the second the three stages including their own work.
+
+    python benchmarks/bench_document.py --repeat 200
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from utils.document import Document, clean_of, lower_of
+from utils.matcher import DEFAULT_JD_SKILLS, skill_bonus
+from utils.pdf_extract import extract_texts
+from utils.universal_parser import CvFeatureExtractor
+
+
+def bench(texts, prepare, run, repeat):
+    """Average seconds per CV of `run(prepare(text))` over `repeat` rounds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            run(prepare(text))
+    return (time.perf_counter() - start) / (repeat * len(texts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--cv-folder", default=os.path.join(ROOT, "data", "sample_cvs"))
+    args = parser.parse_args()
+
+    paths = sorted(os.path.join(args.cv_folder, f) for f in os.listdir(args.cv_folder) if f.lower().endswith(".pdf"))
+    texts, _ = extract_texts(paths, workers=1)
+    texts = [t for t in texts if t.strip()]
+    avg_chars = sum(len(t) for t in texts) / len(texts)
+    jd_skills = DEFAULT_JD_SKILLS
+    extractor = CvFeatureExtractor()
+
+    def preparation(cv):
+        clean_of(cv)
+        lower_of(cv)
+        lower_of(cv)
+
+    def stages(cv):
+        clean_of(cv)
+        extractor.extract(cv)
+        skill_bonus(cv, jd_skills)
+
+    # A fresh Document per CV, so nothing computed in one round is reused in the next
+    timings = {}
+    for name, prepare in [("strings", str), ("Document", Document)]:
+        timings[name] = (bench(texts, prepare, preparation, args.repeat),
+                         bench(texts, prepare, stages, args.repeat))
+
+    print(f"{len(texts)} CVs, {avg_chars:.0f} chars on average, {len(jd_skills)} JD skills")
+    print(f"{'path':<10}{'prep us/CV':>12}{'stages us/CV':>14}")
+    for name, (prep_s, stages_s) in timings.items():
+        print(f"{name:<10}{prep_s * 1e6:>12.1f}{stages_s * 1e6:>14.1f}")
+    (prep_str, stages_str), (prep_doc, stages_doc) = timings["strings"], timings["Document"]
+    print(f"Document saves {(1 - prep_doc / prep_str) * 100:.0f}% of the string preparation and "
+          f"{(1 - stages_doc / stages_str) * 100:.0f}% of the stage time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Dense LSA index (LsaIndex, memory-mapped float32 vectors) vs the sparse
+TF-IDF paths on synthetic CVs.
+
+Both indexes are fitted and saved once. Each query mode then runs in its own
+interpreter so its peak RSS only covers that mode:
+- compute_similarity: refits TF-IDF over all CVs for every JD
+- sparse: CvIndex.load + one sparse mat-vec per JD
+- dense: LsaIndex.load (mmap) + one BLAS mat-vec per JD
+
+Reported per mode: index bytes, peak RSS, p50/p99 query latency, and for
+the dense mode recall@k of its top-k against the sparse index's top-k.
+
+    python benchmarks/bench_lsa.py --candidates 50000 --components 256 --jds 50
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+sys.path.append(os.path.dirname(__file__))
+
+MODES = ["compute_similarity", "sparse", "dense"]
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def build_indexes(work_dir, candidates, components, seed):
+    from synthetic import generate_cvs
+    from utils.embedding import CvIndex, LsaIndex
+
+    cvs = generate_cvs(candidates, seed)
+    cv_ids = [f"cv_{i + 1}" for i in range(candidates)]
+    for name, index in [("sparse", CvIndex()), ("dense", LsaIndex(components))]:
+        start = time.perf_counter()
+        index.fit(cv_ids, cvs)
+        fit_s = time.perf_counter() - start
+        index.save(os.path.join(work_dir, name))
+        print(f"{name:>6s} index: fitted in {fit_s:.2f}s, "
+              f"{dir_size(os.path.join(work_dir, name)) / 1e6:.1f} MB on disk")
+
+
+def run_mode(mode, work_dir, candidates, jds, top_k, seed):
+    from synthetic import generate_cvs, generate_jds
+    from utils.embedding import CvIndex, LsaIndex, compute_similarity, top_k_indices
+
+    jd_texts = generate_jds(jds, seed)
+    if mode == "compute_similarity":
+        cvs = generate_cvs(candidates, seed)
+        index_bytes = None
+        query = lambda jd: compute_similarity(cvs, jd)
+    elif mode == "sparse":
+        index = CvIndex.load(os.path.join(work_dir, "sparse"))
+        index_bytes = index.matrix.data.nbytes + index.matrix.indices.nbytes + index.matrix.indptr.nbytes
+        query = index.query
+    else:
+        index = LsaIndex.load(os.path.join(work_dir, "dense"))
+        index_bytes = index.nbytes()
+        query = index.query
+
+    latencies, rankings = [], []
+    for jd in jd_texts:
+        start = time.perf_counter()
+        scores = query(jd)
+        latencies.append(time.perf_counter() - start)
+        rankings.append(top_k_indices(scores, top_k).tolist())
+    ms = np.asarray(latencies) * 1000
+    return {
+        "index_mb": None if index_bytes is None else round(index_bytes / 1e6, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "rankings": rankings,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=20000)
+    parser.add_argument("--components", type=int, default=256)
+    parser.add_argument("--jds", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", default=os.path.join("/tmp", "bench_lsa"))
+    parser.add_argument("--worker", metavar="MODE", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker == "build":
+        build_indexes(args.work_dir, args.candidates, args.components, args.seed)
+        return
+    if args.worker:
+        print(json.dumps(run_mode(args.worker, args.work_dir, args.candidates, args.jds, args.top_k, args.seed)))
+        return
+
+    # Everything heavy runs in child processes: on Linux a child's peak RSS
+    # starts from its parent's RSS at fork time, so the parent stays small
+    common = ["--work-dir", args.work_dir, "--candidates", str(args.candidates), "--jds", str(args.jds),
+              "--top-k", str(args.top_k), "--seed", str(args.seed), "--components", str(args.components)]
+    subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", "build"] + common, cwd=ROOT, check=True)
+
+    results = {}
+    for mode in MODES:
+        cmd = [sys.executable, os.path.abspath(__file__), "--worker", mode] + common
+        out = subprocess.run(cmd, capture_output=True, text=True, cwd=ROOT)
+        if out.returncode != 0:
+            print(f"{mode}: ERROR {out.stderr.strip().splitlines()[-1] if out.stderr.strip() else 'failed'}")
+            continue
+        results[mode] = json.loads(out.stdout.strip().splitlines()[-1])
+
+    print(f"{'mode':>20s} {'index MB':>9s} {'peak RSS MB':>12s} {'p50 ms':>9s} {'p99 ms':>9s} {'recall@k':>9s}")
+    for mode, result in results.items():
+        recall = ""
+        if mode == "dense" and "sparse" in results:
+            recall = f"{np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(result['rankings'], results['sparse']['rankings'])]):.3f}"
+        index_mb = "-" if result["index_mb"] is None else f"{result['index_mb']:.2f}"
+        print(f"{mode:>20s} {index_mb:>9s} {result['peak_rss_mb']:>12.1f} {result['p50_ms']:>9.3f} "
+              f"{result['p99_ms']:>9.3f} {recall:>9s}")
+
+
+if __name__ == "__main__":
+    main()
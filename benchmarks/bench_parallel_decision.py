@@ -0,0 +1,63 @@
+"""
+make_decision vs make_decision_parallel on synthetic candidates.
+
+For each worker count the parallel run must return exactly the same results
+and leave the agent with exactly the same Q-table and reward history as the
+serial run with the same seed; any difference exits with status 1.
+
+    python benchmarks/bench_parallel_decision.py --candidates 5000 --workers 1,2,4
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+sys.path.append(os.path.dirname(__file__))
+from synthetic import generate_cvs, generate_feedbacks, generate_jds
+from utils.decision import make_decision, make_decision_parallel
+from utils.rl_agent import build_trained_agent
+from utils.sentiment import clear_sentiment_memo, get_analyzer
+from utils.universal_parser import get_nlp
+
+
+def run(fn, cvs, jd, feedbacks, seed, **kwargs):
+    clear_sentiment_memo()
+    random.seed(seed)
+    agent = build_trained_agent()
+    start = time.perf_counter()
+    results = fn(cvs, jd, feedbacks, agent, 0.05, 0.2, **kwargs)
+    return results, agent, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cvs = generate_cvs(args.candidates, args.seed)
+    jd = generate_jds(1, args.seed)[0]
+    feedbacks = generate_feedbacks(args.candidates, args.seed)
+    get_nlp()
+    get_analyzer()
+
+    expected, serial_agent, serial_s = run(make_decision, cvs, jd, feedbacks, args.seed)
+    print(f"{'serial':>12s} {serial_s:8.2f}s {args.candidates / serial_s:10.1f} CVs/s")
+
+    failed = False
+    for workers in [int(w) for w in args.workers.split(",")]:
+        results, agent, seconds = run(make_decision_parallel, cvs, jd, feedbacks, args.seed, workers=workers)
+        identical = (results == expected and agent.q_table == serial_agent.q_table
+                     and list(agent.rewards) == list(serial_agent.rewards))
+        failed |= not identical
+        print(f"{f'{workers} workers':>12s} {seconds:8.2f}s {args.candidates / seconds:10.1f} CVs/s "
+              f"x{serial_s / seconds:5.2f}  {'identical' if identical else 'MISMATCH'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
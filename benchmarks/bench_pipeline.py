@@ -0,0 +1,216 @@
+"""
+Pipeline benchmark on synthetic data at 100 / 1k / 10k / 100k candidates.
+
+Times compute_similarity, parse_cv_text, extract_requirements,
+classify_sentiment, SimpleRLAgent (choose_action + update) and end-to-end
+make_decision. Every (stage, scale) pair runs in its own interpreter so its
+peak RSS is not inflated by earlier runs. Results are compared with a JSON
+baseline; a stage is flagged when its throughput drops or its peak RSS grows
+by more than --tolerance.
+
+    python benchmarks/bench_pipeline.py --scales 100,1000 --save-baseline
+    python benchmarks/bench_pipeline.py --scales 100,1000          # compare
+
+extract_requirements runs spaCy once per JD, so it is measured on
+scale // 100 JDs (at least 1, at most --max-jds) rather than one per CV.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_BASELINE = os.path.join(ROOT, "docs", "benchmarks", "pipeline_baseline.json")
+STAGES = ["compute_similarity", "parse_cv_text", "extract_requirements",
+          "classify_sentiment", "rl_agent", "make_decision"]
+DEFAULT_SCALES = [100, 1000, 10000, 100000]
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# ----------------------
+# Stages (run inside the worker process)
+# ----------------------
+def run_stage(stage, scale, seed, max_jds):
+    sys.path.append(ROOT)
+    sys.path.append(os.path.dirname(__file__))
+    from synthetic import generate_cvs, generate_feedbacks, generate_jds
+
+    if stage == "extract_requirements":
+        from utils.universal_parser import extract_requirements, get_nlp
+        jds = generate_jds(max(1, min(scale // 100, max_jds)), seed)
+        get_nlp()   # model load is a startup cost, not per-JD work
+        setup_rss = peak_rss_mb()
+        start = time.perf_counter()
+        for jd in jds:
+            extract_requirements(jd)
+        return len(jds), time.perf_counter() - start, setup_rss
+
+    cvs = generate_cvs(scale, seed)
+    jd = generate_jds(1, seed)[0]
+    feedbacks = generate_feedbacks(scale, seed)
+
+    if stage == "compute_similarity":
+        from utils.embedding import compute_similarity
+        setup_rss = peak_rss_mb()
+        start = time.perf_counter()
+        compute_similarity(cvs, jd)
+
+    elif stage == "parse_cv_text":
+        from utils.universal_parser import parse_cv_text
+        setup_rss = peak_rss_mb()
+        start = time.perf_counter()
+        for i, cv in enumerate(cvs):
+            parse_cv_text(f"cv_{i + 1}", cv)
+
+    elif stage == "classify_sentiment":
+        from utils.sentiment import classify_sentiment, get_analyzer
+        get_analyzer()
+        setup_rss = peak_rss_mb()
+        start = time.perf_counter()
+        for feedback in feedbacks:
+            classify_sentiment(feedback)
+
+    elif stage == "rl_agent":
+        from utils.rl_agent import SimpleRLAgent
+        rng = random.Random(seed)
+        rows = [(rng.random(), rng.choice(["Positive", "Neutral", "Negative"]), rng.random() < 0.7,
+                 rng.random()) for _ in range(scale)]
+        agent = SimpleRLAgent(["Strong Hire", "Consider", "Needs Review", "Reject"])
+        random.seed(seed)
+        setup_rss = peak_rss_mb()
+        start = time.perf_counter()
+        for row in rows:
+            action = agent.choose_action(*row)
+            agent.update(*row, action, 1.0 if action in ("Strong Hire", "Consider") else 0.0)
+
+    elif stage == "make_decision":
+        from utils.decision import make_decision
+        from utils.rl_agent import build_trained_agent
+        from utils.universal_parser import get_nlp
+        from utils.sentiment import get_analyzer
+        get_nlp()
+        get_analyzer()
+        agent = build_trained_agent()
+        random.seed(seed)
+        setup_rss = peak_rss_mb()
+        start = time.perf_counter()
+        make_decision(cvs, jd, feedbacks, agent, similarity_threshold=0.05, skill_match_threshold=0.2)
+
+    else:
+        raise ValueError(f"Unknown stage: {stage}")
+    return scale, time.perf_counter() - start, setup_rss
+
+
+def run_in_subprocess(stage, scale, seed, max_jds):
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", stage, str(scale),
+           "--seed", str(seed), "--max-jds", str(max_jds)]
+    out = subprocess.run(cmd, capture_output=True, text=True, cwd=ROOT)
+    if out.returncode != 0:
+        return {"error": out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "failed"}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+# ----------------------
+# Baseline comparison
+# ----------------------
+def compare(results, baseline, tolerance):
+    """
+    (regressions, skipped): human-readable regressions of `results` against
+    `baseline`, and the metrics that could not be compared because a run
+    has no number for them (e.g. a spaCy stage without the model).
+    """
+    regressions, skipped = [], []
+    for key, current in results.items():
+        previous = baseline.get("results", {}).get(key)
+        if not previous or "error" in current or "error" in previous:
+            continue
+        for metric, label, unit in [("throughput", "throughput", "/s"), ("peak_rss_mb", "peak RSS", " MB")]:
+            now, before = current.get(metric), previous.get(metric)
+            if now is None or before is None:
+                skipped.append(f"{key}: {label}")
+                continue
+            if metric == "throughput":
+                regressed = now < before * (1 - tolerance)
+            else:
+                regressed = now > before * (1 + tolerance)
+            if regressed:
+                regressions.append(f"{key}: {label} {now:.1f}{unit} vs baseline {before:.1f}{unit}")
+    return regressions, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", default=",".join(map(str, DEFAULT_SCALES)))
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-jds", type=int, default=50)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown / RSS growth")
+    parser.add_argument("--worker", nargs=2, metavar=("STAGE", "SCALE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        stage, scale = args.worker[0], int(args.worker[1])
+        items, seconds, setup_rss = run_stage(stage, scale, args.seed, args.max_jds)
+        print(json.dumps({
+            "items": items,
+            "seconds": round(seconds, 4),
+            "throughput": round(items / seconds, 2) if seconds > 0 else None,
+            "setup_rss_mb": round(setup_rss, 1),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }))
+        return
+
+    results = {}
+    for scale in [int(s) for s in args.scales.split(",")]:
+        for stage in args.stages.split(","):
+            key = f"{stage}@{scale}"
+            results[key] = result = run_in_subprocess(stage, scale, args.seed, args.max_jds)
+            if "error" in result:
+                print(f"{key:32s} ERROR {result['error']}")
+            elif result["throughput"] is None:
+                print(f"{key:32s} {result['items']:>7d} items, no throughput measured")
+            else:
+                print(f"{key:32s} {result['items']:>7d} items {result['seconds']:>9.3f}s "
+                      f"{result['throughput']:>11.1f}/s  peak RSS {result['peak_rss_mb']:>7.1f} MB")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "machine": {"platform": platform.platform(), "python": platform.python_version(),
+                            "cpus": os.cpu_count()},
+                "seed": args.seed,
+                "results": results,
+            }, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+        return
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions, skipped = compare(results, baseline, args.tolerance)
+    for line in skipped:
+        print("NOT COMPARED " + line)
+    for line in regressions:
+        print("REGRESSION " + line)
+    if not regressions:
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+JD requirement extraction throughput: `extract_requirements` one JD at a
+time versus `extract_requirements_many` over `nlp.pipe`.
+
+The JD corpus is the non-empty files in data/sample_jds, with their lines
+shuffled deterministically to reach --n-jds documents. Results are printed
+and written as a markdown table to docs/benchmarks/requirements.md.
+
+    python benchmarks/bench_requirements.py --n-jds 2000 --batch-sizes 16 64 256 --n-process 1 2 4
+"""
+import argparse
+import os
+import platform
+import random
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from utils import universal_parser
+from utils.universal_parser import extract_requirements, extract_requirements_many, get_nlp
+
+DEFAULT_OUTPUT = os.path.join(ROOT, "docs", "benchmarks", "requirements.md")
+
+
+def build_corpus(n_jds, seed=0):
+    jd_dir = os.path.join(ROOT, "data", "sample_jds")
+    sources = []
+    for name in sorted(os.listdir(jd_dir)):
+        with open(os.path.join(jd_dir, name), "r", encoding="utf-8") as f:
+            lines = [line for line in f.read().splitlines() if line.strip()]
+        if lines:
+            sources.append(lines)
+
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(n_jds):
+        lines = list(sources[i % len(sources)])
+        rng.shuffle(lines)
+        corpus.append("\n".join(lines))
+    return corpus
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n-jds", type=int, default=1000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--n-process", type=int, nargs="+", default=[1])
+    parser.add_argument("--model", default=universal_parser.SPACY_MODEL,
+                        help="spaCy package name or path (default: %(default)s)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    universal_parser.SPACY_MODEL = args.model
+    get_nlp.cache_clear()
+    get_nlp()  # keep model load time out of the measurements
+
+    corpus = build_corpus(args.n_jds)
+    baseline, base_secs = timed(lambda: [extract_requirements(jd) for jd in corpus])
+    rows = [("extract_requirements (loop)", "-", "-", base_secs, True)]
+    for n_process in args.n_process:
+        for batch_size in args.batch_sizes:
+            batched, secs = timed(lambda: extract_requirements_many(
+                corpus, n_process=n_process, batch_size=batch_size))
+            rows.append(("extract_requirements_many", n_process, batch_size, secs, batched == baseline))
+
+    lines = [
+        "# JD requirement extraction throughput",
+        "",
+        f"- JDs: {len(corpus)} (data/sample_jds, lines shuffled)",
+        f"- spaCy model: `{args.model}`, pipes: {', '.join(get_nlp().pipe_names)}",
+        f"- Python {platform.python_version()}, {platform.machine()}, {os.cpu_count()} CPUs",
+        "",
+        "| mode | n_process | batch_size | seconds | JDs/s | speed-up | same output |",
+        "|---|---|---|---|---|---|---|",
+    ]
+    for mode, n_process, batch_size, secs, same in rows:
+        lines.append(f"| {mode} | {n_process} | {batch_size} | {secs:.2f} | "
+                     f"{len(corpus) / secs:.1f} | {base_secs / secs:.2f}x | {'yes' if same else 'NO'} |")
+    report = "\n".join(lines) + "\n"
+
+    print(report)
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Recall and speed of two-stage matching (SkillIndex shortlist + TF-IDF)
+against exhaustive compute_similarity over every CV.
+
+For each min_overlap, and for each skill_match_threshold (min_overlap
+derived per JD by `min_overlap_for`), it reports, averaged over the JDs:
+- shortlist: fraction of the CV pool that reaches TF-IDF scoring
+- recall@k: share of the exhaustive top-k CVs that the two-stage top-k keeps
+- time of the two-stage match vs the exhaustive one
+
+    python benchmarks/bench_skill_index.py --candidates 20000 --jds 10 --top-k 20
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+sys.path.append(os.path.dirname(__file__))
+from synthetic import generate_cvs, generate_jds
+from utils.document import Document
+from utils.embedding import compute_similarity, top_k_indices
+from utils.skill_index import SkillIndex, shortlist_match
+from utils.universal_parser import extract_requirements
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=20000)
+    parser.add_argument("--jds", type=int, default=10)
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--min-overlaps", default="1,2,3")
+    parser.add_argument("--skill-thresholds", default="0.1,0.2,0.3")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--index-path", default=os.path.join("/tmp", "bench_skill_index.json"))
+    args = parser.parse_args()
+
+    cv_ids = [f"cv_{i + 1}" for i in range(args.candidates)]
+    docs = [Document(text) for text in generate_cvs(args.candidates, args.seed)]
+    cv_texts = dict(zip(cv_ids, docs))
+
+    start = time.perf_counter()
+    index = SkillIndex()
+    index.add_texts(cv_ids, docs)
+    build_s = time.perf_counter() - start
+    index.save(args.index_path)
+    start = time.perf_counter()
+    index = SkillIndex.load(args.index_path)
+    print(f"index: {len(index)} CVs, {len(index.skills)} skills, built in {build_s:.2f}s, "
+          f"loaded in {time.perf_counter() - start:.2f}s, {os.path.getsize(args.index_path) / 1e6:.1f} MB")
+
+    jds = generate_jds(args.jds, args.seed)
+    requirements = [extract_requirements(jd) for jd in jds]
+
+    exhaustive = []
+    start = time.perf_counter()
+    for jd in jds:
+        scores = compute_similarity(docs, jd)
+        exhaustive.append({cv_ids[i] for i in top_k_indices(scores, args.top_k)})
+    exhaustive_s = (time.perf_counter() - start) / len(jds)
+    print(f"exhaustive: {exhaustive_s * 1000:.1f} ms/JD")
+
+    settings = [(f"min_overlap={m}", {"min_overlap": int(m)}) for m in args.min_overlaps.split(",")]
+    settings += [(f"threshold={t}", {"skill_match_threshold": float(t)}) for t in args.skill_thresholds.split(",")]
+    print(f"{'setting':>16s} {'shortlist':>10s} {'recall@k':>9s} {'ms/JD':>8s} {'speedup':>8s}")
+    for label, kwargs in settings:
+        fractions, recalls, seconds = [], [], 0.0
+        for jd, jd_req, expected in zip(jds, requirements, exhaustive):
+            start = time.perf_counter()
+            ranked = shortlist_match(jd, index, cv_texts, top_k=args.top_k, jd_req=jd_req, **kwargs)
+            seconds += time.perf_counter() - start
+            fractions.append(len(index.candidates_for(jd_req, **kwargs)) / len(index))
+            recalls.append(len(expected & {cv_id for cv_id, _ in ranked}) / len(expected))
+        per_jd = seconds / len(jds)
+        print(f"{label:>16s} {np.mean(fractions):>10.1%} {np.mean(recalls):>9.3f} "
+              f"{per_jd * 1000:>8.1f} {exhaustive_s / per_jd:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
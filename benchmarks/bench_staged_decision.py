@@ -0,0 +1,76 @@
+"""
+make_decision vs make_decision_staged on synthetic candidates.
+
+Checks that the staged evaluator gives every row the same decision and
+explanation as make_decision (and the same record for every surviving row),
+prints how many rows each stage removed, and compares run times. Exits with
+status 1 on any mismatch.
+
+    python benchmarks/bench_staged_decision.py --candidates 5000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+sys.path.append(os.path.dirname(__file__))
+from synthetic import generate_cvs, generate_feedbacks, generate_jds
+from utils.decision import make_decision, make_decision_staged
+from utils.document import Document
+from utils.rl_agent import SimpleRLAgent, build_trained_agent
+from utils.sentiment import clear_sentiment_memo, get_analyzer
+from utils.universal_parser import get_nlp
+
+
+def run(fn, cvs, jd, feedbacks, agent_factory, seed, thresholds):
+    clear_sentiment_memo()
+    docs = [Document(cv) for cv in cvs]
+    random.seed(seed)
+    agent = agent_factory()
+    start = time.perf_counter()
+    output = fn(docs, jd, feedbacks, agent, *thresholds)
+    return output, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--jds", type=int, default=3)
+    parser.add_argument("--similarity-threshold", type=float, default=0.05)
+    parser.add_argument("--skill-threshold", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cvs = generate_cvs(args.candidates, args.seed)
+    feedbacks = generate_feedbacks(args.candidates, args.seed)
+    thresholds = (args.similarity_threshold, args.skill_threshold)
+    agents = {
+        "trained": build_trained_agent,
+        "fresh": lambda: SimpleRLAgent(["Strong Hire", "Consider", "Needs Review", "Reject"]),
+    }
+    get_nlp()
+    get_analyzer()
+
+    failed = False
+    for j, jd in enumerate(generate_jds(args.jds, args.seed), 1):
+        for name, factory in agents.items():
+            expected, serial_s = run(make_decision, cvs, jd, feedbacks, factory, args.seed, thresholds)
+            (results, counts), staged_s = run(make_decision_staged, cvs, jd, feedbacks, factory,
+                                              args.seed, thresholds)
+            mismatches = sum(
+                (got["decision"], got["explanation"]) != (want["decision"], want["explanation"])
+                or (got["decision"] != "Reject" or got["sentiment_label"] is not None) and got != want
+                for got, want in zip(results, expected)
+            )
+            failed |= mismatches > 0 or len(results) != len(expected)
+            print(f"JD {j} / {name:7s} serial {serial_s:6.2f}s  staged {staged_s:6.2f}s  "
+                  f"x{serial_s / staged_s:4.2f}  mismatches {mismatches}")
+            print("    removed: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Startup benchmark: import time of each utils module and the first-use cost
+of the lazily loaded models.
+
+Every measurement runs in a fresh interpreter so nothing is already cached.
+
+    python benchmarks/bench_startup.py --repeat 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+MODULES = [
+    "utils.preprocess",
+    "utils.embedding",
+    "utils.sentiment",
+    "utils.universal_parser",
+    "utils.matcher",
+    "utils.rl_agent",
+    "utils.decision",
+]
+
+# (label, module to import first, statement timed on first use)
+LOADERS = [
+    ("spaCy pipeline", "utils.universal_parser", "utils.universal_parser.get_nlp()"),
+    ("NLTK stopwords", "utils.preprocess", "utils.preprocess.get_stop_words()"),
+    ("VADER analyzer", "utils.sentiment", "utils.sentiment.get_analyzer()"),
+]
+
+SNIPPET = """
+import sys, time
+sys.path.insert(0, {root!r})
+{setup}
+t0 = time.perf_counter()
+{stmt}
+print(time.perf_counter() - t0)
+"""
+
+
+def time_in_subprocess(setup, stmt):
+    code = SNIPPET.format(root=ROOT, setup=setup, stmt=stmt)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "failed")
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def measure(setup, stmt, repeat):
+    try:
+        samples = [time_in_subprocess(setup, stmt) for _ in range(repeat)]
+    except RuntimeError as e:
+        return None, str(e)
+    return statistics.median(samples), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per measurement")
+    args = parser.parse_args()
+
+    print(f"{'what':<32}{'median (ms)':>14}")
+    for module in MODULES:
+        median, error = measure("", f"import {module}", args.repeat)
+        shown = f"{median * 1000:>14.1f}" if error is None else f"  error: {error}"
+        print(f"{'import ' + module:<32}{shown}")
+    for label, module, stmt in LOADERS:
+        median, error = measure(f"import {module}", stmt, args.repeat)
+        shown = f"{median * 1000:>14.1f}" if error is None else f"  error: {error}"
+        print(f"{'first use: ' + label:<32}{shown}")
+
+
+if __name__ == "__main__":
+    main()
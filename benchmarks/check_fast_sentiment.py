@@ -0,0 +1,92 @@
+"""
+Parity check for the fast sentiment engine: FastSentimentScorer against
+VADER (with the custom HR lexicon) on data/feedbacks.txt and on a seeded
+synthetic corpus built to exercise every VADER rule (boosters, dampeners,
+negations, "no", "least", "but", ALL CAPS, idioms, punctuation, emoji).
+
+Compares the rounded compound score and the label of every text, prints
+the first mismatches and the timing of both engines, and exits non-zero on
+any mismatch.
+
+    python benchmarks/check_fast_sentiment.py --synthetic 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from utils.fast_sentiment import FastSentimentScorer
+from utils.sentiment import CUSTOM_LEXICON, get_analyzer, sentiment_label
+
+FILLER = ["the", "candidate", "answers", "were", "team", "project", "and", "of", "at", "this",
+          "so", "or", "nor", "interview", "showed", "skills", "kind", "sort", "just", "doubt"]
+RULE_WORDS = ["not", "never", "no", "isn't", "without", "least", "but", "BUT", "very", "extremely",
+              "slightly", "barely", "kind of", "sort of", "just enough", "the bomb", "bad ass",
+              "yeah right", "to die for", "kiss of death", "nothing", "cannot", "wasn't"]
+EXTRAS = ["!", "!!", "!!!!!", "?", "??", "????", ":)", ":(", "😀", "😡", "👍", "...", ","]
+
+
+def synthetic_corpus(n, seed=0):
+    rng = random.Random(seed)
+    lexicon = get_analyzer().lexicon
+    sentiment_words = list(CUSTOM_LEXICON) + rng.sample(sorted(lexicon), 400)
+    texts = []
+    for _ in range(n):
+        words = []
+        for _ in range(rng.randint(0, 18)):
+            pool = rng.choice((FILLER, RULE_WORDS, sentiment_words, sentiment_words))
+            word = rng.choice(pool)
+            roll = rng.random()
+            if roll < 0.1:
+                word = word.upper()
+            elif roll < 0.15:
+                word = word.capitalize()
+            if rng.random() < 0.1:
+                word += rng.choice(EXTRAS)
+            words.append(word)
+        texts.append(" ".join(words))
+    return texts
+
+
+def compare(name, texts, scorer):
+    analyzer = get_analyzer()
+    start = time.perf_counter()
+    expected = [analyzer.polarity_scores(text)['compound'] for text in texts]
+    vader_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = scorer.compound_scores(texts)
+    fast_time = time.perf_counter() - start
+
+    mismatches = [(text, e, a) for text, e, a in zip(texts, expected, actual) if e != a]
+    label_mismatches = sum(sentiment_label(e) != sentiment_label(a) for e, a in zip(expected, actual))
+    print(f"{name}: {len(texts)} texts, {len(mismatches)} score mismatches, "
+          f"{label_mismatches} label mismatches | VADER {vader_time:.3f}s, "
+          f"fast {fast_time:.3f}s ({vader_time / max(fast_time, 1e-9):.1f}x)")
+    for text, e, a in mismatches[:10]:
+        print(f"    vader={e:+.4f} fast={a:+.4f}  {text!r}")
+    return len(mismatches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--feedback", default=os.path.join(ROOT, "data", "feedbacks.txt"))
+    parser.add_argument("--synthetic", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.feedback, "r", encoding="utf-8") as f:
+        feedbacks = [line.strip() for line in f if line.strip()]
+
+    # Fresh scorer so the timing includes building the token table
+    scorer = FastSentimentScorer()
+    failures = compare("feedbacks.txt", feedbacks, scorer)
+    failures += compare("synthetic", synthetic_corpus(args.synthetic, args.seed), scorer)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Replay load generator for the scoring service (utils/service.py).
+
+Reads a JSONL file with one request per line,
+
+    {"endpoint": "/sentiment", "payload": {"feedbacks": ["..."]}}
+
+and sends the requests over --concurrency keep-alive connections (each
+connection takes the next unsent line), then reports p50/p99 latency,
+throughput and the status codes seen. 503s are the service's backpressure
+and are counted, not retried.
+
+    python benchmarks/replay.py --generate requests_sample.jsonl --requests 2000
+    python -m utils.service --cv-folder data/sample_cvs &
+    python benchmarks/replay.py requests_sample.jsonl --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+ENDPOINT_MIX = {"/sentiment": 0.4, "/match": 0.25, "/parse": 0.2, "/similarity": 0.1, "/score": 0.05}
+
+
+# ----------------------
+# Request file
+# ----------------------
+def generate_requests(path, n, seed=0):
+    """Write `n` synthetic requests with ENDPOINT_MIX proportions."""
+    sys.path.append(os.path.dirname(__file__))
+    from synthetic import generate_cvs, generate_feedbacks, generate_jds
+
+    rng = random.Random(f"replay-{seed}")
+    cvs = generate_cvs(200, seed)
+    jds = generate_jds(20, seed)
+    feedbacks = generate_feedbacks(200, seed)
+    endpoints, weights = zip(*ENDPOINT_MIX.items())
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(n):
+            endpoint = rng.choices(endpoints, weights)[0]
+            if endpoint == "/sentiment":
+                payload = {"feedbacks": rng.sample(feedbacks, rng.randint(1, 5))}
+            elif endpoint == "/match":
+                payload = {"jd": rng.choice(jds), "top_k": rng.choice([5, 10, 20])}
+            elif endpoint == "/parse":
+                payload = {"cv": rng.choice(cvs)}
+            else:
+                k = rng.randint(5, 20)
+                payload = {"cvs": rng.sample(cvs, k), "jd": rng.choice(jds)}
+                if endpoint == "/score":
+                    payload["feedbacks"] = rng.sample(feedbacks, k)
+            f.write(json.dumps({"endpoint": endpoint, "payload": payload}) + "\n")
+
+
+def load_requests(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# ----------------------
+# Client
+# ----------------------
+async def _send(reader, writer, host, endpoint, payload):
+    body = json.dumps(payload).encode("utf-8")
+    writer.write((f"POST {endpoint} HTTP/1.1\r\nHost: {host}\r\n"
+                  f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    keep_alive = True
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+        elif name.strip().lower() == "connection":
+            keep_alive = value.strip().lower() != "close"
+    await reader.readexactly(length)
+    return status, keep_alive
+
+
+async def _connection(host, port, requests, cursor, latencies, statuses):
+    reader = writer = None
+    while cursor[0] < len(requests):
+        request = requests[cursor[0]]
+        cursor[0] += 1
+        if writer is None:
+            reader, writer = await asyncio.open_connection(host, port)
+        start = time.perf_counter()
+        try:
+            status, keep_alive = await _send(reader, writer, host, request["endpoint"], request["payload"])
+        except (ConnectionError, asyncio.IncompleteReadError, IndexError, ValueError):
+            status, keep_alive = "connection_error", False
+        latencies.setdefault(request["endpoint"], []).append(time.perf_counter() - start)
+        statuses[status] += 1
+        if not keep_alive:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def replay(requests, host, port, concurrency):
+    latencies, statuses, cursor = {}, Counter(), [0]
+    start = time.perf_counter()
+    await asyncio.gather(*[_connection(host, port, requests, cursor, latencies, statuses)
+                           for _ in range(concurrency)])
+    return latencies, statuses, time.perf_counter() - start
+
+
+async def fetch_stats(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET /stats HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+
+def summarize(latencies, statuses, seconds):
+    """Print p50/p99 per endpoint and overall."""
+    everything = np.concatenate([np.asarray(v) for v in latencies.values()]) * 1000
+    print(f"{'endpoint':14s} {'requests':>8s} {'p50 ms':>9s} {'p99 ms':>9s}")
+    for endpoint, values in sorted(latencies.items()) + [("all", None)]:
+        ms = everything if values is None else np.asarray(values) * 1000
+        print(f"{endpoint:14s} {len(ms):>8d} {np.percentile(ms, 50):>9.2f} {np.percentile(ms, 99):>9.2f}")
+    print(f"{len(everything)} requests in {seconds:.2f}s ({len(everything) / seconds:.1f} req/s)")
+    print("status codes: " + ", ".join(f"{k}: {v}" for k, v in sorted(statuses.items(), key=str)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("requests_file", nargs="?", help="JSONL request file to replay")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=16, help="parallel keep-alive connections")
+    parser.add_argument("--generate", metavar="PATH", help="write a synthetic request file and exit")
+    parser.add_argument("--requests", type=int, default=1000, help="requests to generate")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.generate:
+        generate_requests(args.generate, args.requests, args.seed)
+        print(f"Wrote {args.requests} requests to {args.generate}")
+        return
+    if not args.requests_file:
+        parser.error("a request file (or --generate PATH) is required")
+
+    requests = load_requests(args.requests_file)
+    latencies, statuses, seconds = asyncio.run(replay(requests, args.host, args.port, args.concurrency))
+    summarize(latencies, statuses, seconds)
+    stats = asyncio.run(fetch_stats(args.host, args.port))
+    print("server batching: " + ", ".join(
+        f"{endpoint} {s['requests']} req / {s['batches']} batches (mean {s['mean_batch']}, rejected {s['rejected']})"
+        for endpoint, s in stats["endpoints"].items() if s["requests"] or s["rejected"]
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Deterministic synthetic CVs, JDs and HR feedback for benchmarks.
+
+Text is assembled from the vocabularies the parser itself uses
+(BASE_SKILLS, DOMAIN_SYNONYMS, DOMAIN_KEYWORDS, DEGREE_MAP) plus the custom
+sentiment lexicon, so every stage has realistic work to do: domains are
+detectable, degrees and skills match (sometimes fuzzily), experience is
+stated, and feedback mixes templated and free-form sentences. The same
+(n, seed) always produces the same texts.
+
+    python benchmarks/synthetic.py --cvs 3 --seed 1
+"""
+import argparse
+import os
+import random
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from utils.sentiment import CUSTOM_LEXICON
+from utils.universal_parser import BASE_SKILLS, DEGREE_MAP, DOMAIN_KEYWORDS, DOMAIN_SYNONYMS
+
+DOMAINS = sorted(DOMAIN_SYNONYMS)
+DEGREE_WORDS = sorted(DEGREE_MAP)
+FILLER = [
+    "team", "project", "delivered", "stakeholders", "requirements", "reporting", "improved",
+    "process", "customers", "analysis", "design", "managed", "planning", "quality", "results",
+    "collaborated", "documentation", "support", "training", "operations", "strategy", "growth",
+]
+UNIVERSITIES = ["State University", "Institute of Technology", "City College", "National University"]
+TEMPLATED_FEEDBACK = [
+    "Candidate met minimum technical expectations but did not exceed them.",
+    "Good communication skills, needs more hands-on experience.",
+    "Strong problem solving and clear explanations throughout the interview.",
+    "Answers were vague and the candidate seemed unprepared.",
+]
+POSITIVE = sorted(w for w, v in CUSTOM_LEXICON.items() if v > 0)
+NEGATIVE = sorted(w for w, v in CUSTOM_LEXICON.items() if v < 0)
+
+
+def _sentence(rng, words, length):
+    return " ".join(rng.choice(words) for _ in range(length)).capitalize() + "."
+
+
+def _skills_for(rng, domain, k):
+    pool = DOMAIN_SYNONYMS[domain] + BASE_SKILLS
+    return rng.sample(sorted(set(pool)), min(k, len(set(pool))))
+
+
+def generate_cv(rng, index):
+    domain = rng.choice(DOMAINS)
+    skills = _skills_for(rng, domain, rng.randint(3, 10))
+    degree = rng.choice(DEGREE_WORDS)
+    years = rng.randint(0, 15)
+    keywords = DOMAIN_KEYWORDS[domain]
+    lines = [
+        f"Candidate {index}",
+        f"{rng.choice(keywords).title()} professional with {years} years of experience.",
+        f"Education: {degree.upper() if rng.random() < 0.3 else degree} from {rng.choice(UNIVERSITIES)}.",
+        "Skills: " + ", ".join(s.title() if rng.random() < 0.5 else s for s in skills),
+    ]
+    for _ in range(rng.randint(3, 12)):
+        lines.append(_sentence(rng, FILLER + keywords + skills, rng.randint(6, 16)))
+    return "\n".join(lines)
+
+
+def generate_jd(rng, index):
+    domain = rng.choice(DOMAINS)
+    skills = _skills_for(rng, domain, rng.randint(3, 6))
+    keywords = DOMAIN_KEYWORDS[domain]
+    lines = [
+        f"Position {index}: {rng.choice(keywords).title()} {rng.choice(['Engineer', 'Specialist', 'Analyst'])}",
+        f"Experience: {rng.randint(1, 5)}+ years",
+        f"Education: {rng.choice(DEGREE_WORDS)} degree required.",
+        "Required Skills: " + ", ".join(skills),
+        "Responsibilities:",
+    ]
+    for _ in range(rng.randint(4, 10)):
+        lines.append(_sentence(rng, FILLER + keywords + skills, rng.randint(8, 14)))
+    return "\n".join(lines)
+
+
+def generate_feedback(rng):
+    if rng.random() < 0.6:
+        return rng.choice(TEMPLATED_FEEDBACK)
+    words = FILLER + POSITIVE + NEGATIVE + ["not", "very", "but", "somewhat", "really"]
+    text = _sentence(rng, words, rng.randint(5, 15))
+    return text + ("!" if rng.random() < 0.2 else "")
+
+
+def generate_cvs(n, seed=0):
+    rng = random.Random(f"cvs-{seed}")
+    return [generate_cv(rng, i + 1) for i in range(n)]
+
+
+def generate_jds(n, seed=0):
+    rng = random.Random(f"jds-{seed}")
+    return [generate_jd(rng, i + 1) for i in range(n)]
+
+
+def generate_feedbacks(n, seed=0):
+    rng = random.Random(f"feedback-{seed}")
+    return [generate_feedback(rng) for _ in range(n)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cvs", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    for text in generate_cvs(args.cvs, args.seed) + generate_jds(1, args.seed):
+        print(text, end="\n\n")
+    print("\n".join(generate_feedbacks(5, args.seed)))
@@ -0,0 +1,261 @@
+# utils/batch.py
+"""
+Headless batch run: every CV in a folder against every JD in a folder.
+
+    python -m utils.batch --cvs data/sample_cvs --jds data/sample_jds \
+        --feedback data/feedbacks.txt --out batch_results --workers 4
+
+- CV text extraction (PDFs) and CV parsing run across a process pool;
+  extracted text and parsed features go to the CV cache, so a rerun
+  skips both for unchanged files.
+- Feedback line i belongs to the i-th CV in sorted filename order.
+- Each JD is scored with a fresh trained agent and a seeded `random`, so its
+  results do not depend on which JDs ran before it.
+- Results are written per JD to <out>/<jd name>.jsonl (written to a temp
+  file and renamed). <out>/progress.jsonl records finished JDs; running the
+  same command again resumes after the last finished JD.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.cv_cache import CvCache, DEFAULT_CACHE_PATH, content_key
+from utils.decision import decision_records, make_decision_columnar
+from utils.document import Document
+from utils.pdf_extract import extract_texts
+from utils.rl_agent import build_trained_agent
+from utils.universal_parser import FEATURE_FIELDS, parse_cv_texts
+
+PROGRESS_FILE = "progress.jsonl"
+PARSE_CHUNK_SIZE = 64   # CVs per parsing task
+
+
+# ----------------------
+# Inputs
+# ----------------------
+def list_files(folder, extensions):
+    return sorted(f for f in os.listdir(folder) if f.lower().endswith(extensions))
+
+
+def load_cv_documents(folder, names, workers=None, cache=None):
+    """
+    A Document for every CV (.pdf or .txt), extracting uncached PDFs in
+    parallel. With a cache, PDF Documents carry the key of their file bytes,
+    so their features are cached in the same entry as the extracted text.
+    """
+    texts = {}
+    file_keys = {}
+    pdf_names = []
+    for name in names:
+        path = os.path.join(folder, name)
+        if name.lower().endswith(".txt"):
+            with open(path, "r", encoding="utf-8") as f:
+                texts[name] = f.read()
+            continue
+        pdf_names.append(name)
+        if cache is not None:
+            with open(path, "rb") as f:
+                file_keys[name] = content_key(f.read())
+    if cache is not None:
+        texts.update(zip(pdf_names, cache.get_many([file_keys[n] for n in pdf_names], "raw_text")))
+
+    pending = [n for n in names if texts.get(n) is None]
+    extracted, errors = extract_texts([os.path.join(folder, n) for n in pending], workers=workers)
+    failed = set()
+    for i, name in enumerate(pending):
+        texts[name] = extracted[i]
+        if i in errors:
+            print(f"Error reading file {name}: {errors[i]}")
+            failed.add(name)
+    if cache is not None:
+        stored = [n for n in pending if n not in failed]
+        cache.put_many([file_keys[n] for n in stored], raw_text=[texts[n] for n in stored])
+    return [Document(texts[name], file_keys.get(name), cacheable=name not in failed) for name in names]
+
+
+def _parse_chunk(texts):
+    # Runs in a worker process; only the parsed fields travel back
+    return [{field: cv[field] for field in FEATURE_FIELDS} for cv in parse_cv_texts(texts)]
+
+
+def parse_documents(docs, workers=None, cache=None):
+    """Fill `doc.features` for every Document, parsing uncached CVs across processes."""
+    if cache is not None:
+        cached = [doc for doc in docs if doc.cacheable]
+        for doc, features in zip(cached, cache.get_many([doc.key for doc in cached], "features")):
+            doc.features = features
+
+    missing = [i for i, doc in enumerate(docs) if doc.features is None]
+    chunks = [missing[i:i + PARSE_CHUNK_SIZE] for i in range(0, len(missing), PARSE_CHUNK_SIZE)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) <= 1:
+        results = [_parse_chunk([docs[i] for i in chunk]) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            results = list(pool.map(_parse_chunk, [[docs[i].text for i in chunk] for chunk in chunks]))
+
+    for chunk, features in zip(chunks, results):
+        for i, feats in zip(chunk, features):
+            docs[i].features = feats
+    if cache is not None:
+        stored = [docs[i] for i in missing if docs[i].cacheable]
+        cache.put_many([doc.key for doc in stored], features=[doc.features for doc in stored])
+
+
+def load_feedbacks(path, n_cvs):
+    with open(path, "r", encoding="utf-8") as f:
+        feedbacks = [line.strip() for line in f if line.strip()]
+    if len(feedbacks) < n_cvs:
+        raise ValueError(f"{path} has {len(feedbacks)} feedbacks for {n_cvs} CVs")
+    return feedbacks[:n_cvs]
+
+
+# ----------------------
+# Progress / resume
+# ----------------------
+def run_fingerprint(cv_dir, cv_names, jd_dir, jd_names, feedback_path, settings):
+    """
+    Identifies one batch configuration (settings plus the name, size and
+    mtime of every CV, JD and the feedback file); a resume is only allowed
+    for the same one, so an edited JD is never taken as already finished.
+    """
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    inputs = [("cv", os.path.join(cv_dir, n)) for n in cv_names]
+    inputs += [("jd", os.path.join(jd_dir, n)) for n in jd_names]
+    inputs.append(("feedback", feedback_path))
+    for kind, path in inputs:
+        stat = os.stat(path)
+        digest.update(f"{kind}\0{os.path.basename(path)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def read_progress(out_dir, fingerprint):
+    """Names of JDs already finished by a run with this fingerprint."""
+    path = os.path.join(out_dir, PROGRESS_FILE)
+    if not os.path.exists(path):
+        return set()
+    done = set()
+    with open(path, "r", encoding="utf-8") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("fingerprint") != fingerprint:
+            raise ValueError(
+                f"{path} belongs to a different run (inputs or settings changed); "
+                "use --restart to start over"
+            )
+        for line in f:
+            try:
+                done.add(json.loads(line)["jd"])
+            except (ValueError, KeyError):
+                break   # torn last line from a killed run
+    return done
+
+
+def start_progress(out_dir, fingerprint):
+    with open(os.path.join(out_dir, PROGRESS_FILE), "w", encoding="utf-8") as f:
+        f.write(json.dumps({"fingerprint": fingerprint, "started": time.time()}) + "\n")
+
+
+def mark_done(out_dir, entry):
+    with open(os.path.join(out_dir, PROGRESS_FILE), "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def write_results(path, records):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, default=float) + "\n")
+    os.replace(tmp_path, path)
+
+
+# ----------------------
+# Run
+# ----------------------
+def run_batch(cv_dir, jd_dir, feedback_path, out_dir, workers=None, cache_path=DEFAULT_CACHE_PATH,
+              similarity_threshold=0.5, skill_match_threshold=0.2, seed=0, restart=False):
+    """Score every JD in `jd_dir`, skipping JDs a previous identical run finished. Returns the JDs scored now."""
+    cv_names = list_files(cv_dir, (".pdf", ".txt"))
+    jd_names = list_files(jd_dir, (".txt",))
+    settings = {"similarity_threshold": similarity_threshold,
+                "skill_match_threshold": skill_match_threshold, "seed": seed}
+    fingerprint = run_fingerprint(cv_dir, cv_names, jd_dir, jd_names, feedback_path, settings)
+
+    os.makedirs(out_dir, exist_ok=True)
+    done = set() if restart else read_progress(out_dir, fingerprint)
+    if not done:
+        start_progress(out_dir, fingerprint)
+    todo = [name for name in jd_names if name not in done]
+    if not todo:
+        print(f"All {len(jd_names)} JDs already finished in {out_dir}")
+        return []
+
+    cache = CvCache(cache_path) if cache_path else None
+    try:
+        start = time.perf_counter()
+        docs = load_cv_documents(cv_dir, cv_names, workers, cache)
+        parse_documents(docs, workers, cache)
+        feedbacks = load_feedbacks(feedback_path, len(docs))
+        print(f"Prepared {len(docs)} CVs in {time.perf_counter() - start:.1f}s; "
+              f"{len(todo)} of {len(jd_names)} JDs to score")
+
+        for n, jd_name in enumerate(todo, 1):
+            start = time.perf_counter()
+            with open(os.path.join(jd_dir, jd_name), "r", encoding="utf-8") as f:
+                jd_text = f.read()
+
+            random.seed(seed)
+            agent = build_trained_agent()
+            table = make_decision_columnar(docs, jd_text, feedbacks, agent,
+                                           similarity_threshold, skill_match_threshold, cache)
+            records = decision_records(table)
+            for record, cv_name in zip(records, cv_names):
+                record["cv_name"] = cv_name
+                record["jd"] = jd_name
+
+            output = os.path.join(out_dir, os.path.splitext(jd_name)[0] + ".jsonl")
+            write_results(output, records)
+            mark_done(out_dir, {"jd": jd_name, "output": os.path.basename(output),
+                                "candidates": len(records), "finished": time.time()})
+            decisions = table["decision"].value_counts().to_dict()
+            print(f"[{n}/{len(todo)}] {jd_name}: {decisions} -> {output} "
+                  f"({time.perf_counter() - start:.1f}s)")
+    finally:
+        if cache is not None:
+            cache.close()
+    return todo
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Match every CV in a folder against every JD in a folder.")
+    parser.add_argument("--cvs", required=True, help="folder of CV .pdf/.txt files")
+    parser.add_argument("--jds", required=True, help="folder of JD .txt files")
+    parser.add_argument("--feedback", required=True, help="one HR feedback per line, in sorted CV order")
+    parser.add_argument("--out", default="batch_results", help="output folder (results + progress)")
+    parser.add_argument("--workers", type=int, default=None, help="processes for extraction/parsing")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="CV cache path ('' disables it)")
+    parser.add_argument("--similarity-threshold", type=float, default=0.5)
+    parser.add_argument("--skill-threshold", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--restart", action="store_true", help="ignore previous progress")
+    args = parser.parse_args(argv)
+
+    for folder in (args.cvs, args.jds):
+        if not os.path.isdir(folder):
+            raise FileNotFoundError(f"Folder not found: {folder}")
+    if not os.path.exists(args.feedback):
+        raise FileNotFoundError(f"Feedback file not found: {args.feedback}")
+
+    run_batch(args.cvs, args.jds, args.feedback, args.out, args.workers, args.cache,
+              args.similarity_threshold, args.skill_threshold, args.seed, args.restart)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# utils/cv_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Bump whenever PDF extraction, clean_text or parse_cv_text output changes,
+# so entries written by older code are never served.
+PARSER_VERSION = "1"
+
+DEFAULT_CACHE_PATH = "models/cv_cache.sqlite"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+FIELDS = ("raw_text", "clean_text", "features")
+LOOKUP_CHUNK_SIZE = 500   # keys per SELECT ... IN (...), below SQLite's variable limit
+
+
+def content_key(data):
+    """SHA-256 of the file bytes (or UTF-8 text), salted with PARSER_VERSION."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    digest = hashlib.sha256(f"v{PARSER_VERSION}\0".encode("utf-8"))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class CvCache:
+    """
+    Content-addressed SQLite cache of extracted and parsed CV artifacts.
+
+    Each key (see `content_key`) can hold the raw extracted text, the cleaned
+    text and the parsed features (domain, degree, skills, experience). When
+    the stored size exceeds `max_bytes`, least recently used entries are
+    evicted; recency of cache hits is buffered and written with the next
+    put, so lookups never write to the database. Lookups are counted per field in `stats()`.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = {field: 0 for field in FIELDS}
+        self.misses = {field: 0 for field in FIELDS}
+        self._lock = threading.Lock()
+        self._touched = {}   # key -> last hit time not yet written
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, raw_text TEXT, clean_text TEXT, features TEXT,"
+            " size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access)")
+        self._conn.commit()
+        self._total_bytes = self._stored_bytes()
+
+    # ----------------------
+    # Lookups
+    # ----------------------
+    def get(self, key, field):
+        """Return the cached `field` for `key`, or None on a miss."""
+        return self.get_many([key], field)[0]
+
+    def get_many(self, keys, field):
+        """
+        Cached `field` for each key (None on a miss). Hits only refresh their
+        recency in memory; it is written with the next put or on close().
+        """
+        if field not in FIELDS:
+            raise ValueError(f"Unknown cache field: {field}")
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            unique = list(dict.fromkeys(keys))
+            for start in range(0, len(unique), LOOKUP_CHUNK_SIZE):
+                chunk = unique[start:start + LOOKUP_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(self._conn.execute(
+                    f"SELECT key, {field} FROM entries WHERE key IN ({placeholders}) AND {field} IS NOT NULL",
+                    chunk
+                ))
+            now = time.time()
+            for key in keys:
+                if key in found:
+                    self.hits[field] += 1
+                    self._touched[key] = now
+                else:
+                    self.misses[field] += 1
+        if field == "features":
+            return [json.loads(found[key]) if key in found else None for key in keys]
+        return [found.get(key) for key in keys]
+
+    def put(self, key, raw_text=None, clean_text=None, features=None):
+        """Store any of the artifacts for `key`, keeping fields already cached."""
+        self.put_many([key], raw_text=[raw_text], clean_text=[clean_text], features=[features])
+
+    def put_many(self, keys, raw_text=None, clean_text=None, features=None):
+        """
+        `put` for many keys in one transaction. Each given field is a list
+        aligned with `keys`; None entries keep what is already cached.
+        """
+        keys = list(keys)
+        columns = {"raw_text": raw_text, "clean_text": clean_text, "features": features}
+        columns = {field: values or [None] * len(keys) for field, values in columns.items()}
+        with self._lock:
+            now = time.time()
+            for n, key in enumerate(keys):
+                new = {field: columns[field][n] for field in FIELDS}
+                if new["features"] is not None:
+                    new["features"] = json.dumps(new["features"])
+                row = self._conn.execute(
+                    "SELECT raw_text, clean_text, features, size FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                old_size = 0
+                if row is not None:
+                    old_size = row[3]
+                    for field, old_value in zip(FIELDS, row[:3]):
+                        if new[field] is None:
+                            new[field] = old_value
+                size = sum(len(v.encode("utf-8")) for v in new.values() if v is not None)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, raw_text, clean_text, features, size, last_access)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, new["raw_text"], new["clean_text"], new["features"], size, now)
+                )
+                self._touched.pop(key, None)
+                self._total_bytes += size - old_size
+            self._flush_touches()
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    # ----------------------
+    # Maintenance
+    # ----------------------
+    def _stored_bytes(self):
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _flush_touches(self):
+        # Write the recency of hits since the last flush; the caller commits
+        self._conn.executemany(
+            "UPDATE entries SET last_access = ? WHERE key = ?",
+            [(when, key) for key, when in self._touched.items()]
+        )
+        self._touched.clear()
+
+    def _evict(self):
+        # Other processes may share the file, so recount before deleting
+        self._total_bytes = self._stored_bytes()
+        cursor = self._conn.execute("SELECT key, size FROM entries ORDER BY last_access")
+        doomed = []
+        for key, size in cursor:
+            if self._total_bytes <= self.max_bytes:
+                break
+            doomed.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "entries": entries,
+            "bytes": self._total_bytes,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            self._touched.clear()
+            self._total_bytes = 0
+
+    def close(self):
+        with self._lock:
+            if self._touched:
+                self._flush_touches()
+                self._conn.commit()
+            self._conn.close()
@@ -1,13 +1,18 @@
 import json
 import csv
+import io
 import sys
 import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from utils.embedding import compute_similarity
-from utils.sentiment import classify_sentiment
+from utils.sentiment import classify_sentiments
+from utils.document import as_document
+from utils.instrumentation import count, log_event, stage, timed
 
 # Replace these imports with the universal parser
-from utils.universal_parser import parse_cv_text, extract_requirements
+from utils.universal_parser import FEATURE_FIELDS, parse_cv_texts, extract_requirements
 
 
 def evaluate_candidate(sim_score, sentiment_label, sentiment_score, degree_match, skill_pct,
@@ -32,12 +37,11 @@ def evaluate_candidate(sim_score, sentiment_label, sentiment_score, degree_match
         sentiment_bias = 0.0
 
     # RL Agent decision
-    action = rl_agent.choose_action(sim_score, sentiment_label, degree_match, skill_pct)
-    q_values = rl_agent.get_q_values(sim_score, sentiment_label, degree_match, skill_pct)
+    with stage("rl.choose_action"):
+        action = rl_agent.choose_action(sim_score, sentiment_label, degree_match, skill_pct)
+        q_values = rl_agent.get_q_values(sim_score, sentiment_label, degree_match, skill_pct)
 
-    # Confidence = normalized Q-value for chosen action
-    max_q = max(q_values.values()) if q_values else 1
-    rl_conf = round((q_values.get(action, 0) / max_q) * 100, 1) if max_q != 0 else 0
+    rl_conf = rl_confidence(q_values, action)
 
     explanation = (
         f"Sim={sim_score*100:.1f}%, Sentiment={sentiment_label}({sentiment_score:.2f}), "
@@ -47,29 +51,106 @@ def evaluate_candidate(sim_score, sentiment_label, sentiment_score, degree_match
     return action, explanation, rl_conf
 
 
+def rl_confidence(q_values, action):
+    """Confidence = normalized Q-value for chosen action"""
+    max_q = max(q_values.values()) if q_values else 1
+    return round((q_values.get(action, 0) / max_q) * 100, 1) if max_q != 0 else 0
+
+
+def parse_cvs_cached(cv_texts, cache=None):
+    """
+    Parse CVs (strings or Documents) in one batch, reusing features stored in
+    `cache` (a CvCache) and storing features for the CVs that had to be parsed.
+    """
+    if cache is None:
+        return parse_cv_texts(cv_texts)
+
+    docs = [as_document(cv) for cv in cv_texts]
+    pending = [doc for doc in docs if doc.features is None and doc.cacheable]
+    for doc, features in zip(pending, cache.get_many([doc.key for doc in pending], "features")):
+        doc.features = features
+    missed = [doc for doc in pending if doc.features is None]
+
+    parsed_cvs = parse_cv_texts(docs)
+    cache.put_many([doc.key for doc in missed], features=[doc.features for doc in missed])
+    return parsed_cvs
+
+
+@timed("make_decision")
 def make_decision(cv_texts, jd_text, feedbacks, rl_agent,
-                  similarity_threshold, skill_match_threshold):
+                  similarity_threshold, skill_match_threshold, cache=None, dedup_threshold=None):
+    """
+    `cv_texts` may hold strings or Documents; each CV is lowercased and
+    cleaned once and shared by the similarity, parsing and scoring steps.
+
+    With `dedup_threshold` (a Jaccard similarity in (0, 1]), near-duplicate
+    CVs are clustered first (utils/dedup.py). Similarity and parsing run once
+    per cluster representative and are copied to the other members; the
+    similarity IDF is then fitted on the representatives only. Sentiment and
+    the RL step still run for every row, and each result gets a
+    "duplicate_of" field: the cv_index of its representative, or None.
+    """
+    docs = [as_document(cv) for cv in cv_texts]
+    duplicate_of = None
+    if dedup_threshold is not None:
+        from utils.dedup import find_duplicates
+        with stage("dedup"):
+            duplicate_of = find_duplicates(docs, dedup_threshold)
+        owners = [i if rep is None else rep for i, rep in enumerate(duplicate_of)]
+        representatives = sorted(set(owners))
+        position = {i: p for p, i in enumerate(representatives)}
+        count("dedup.duplicates", len(docs) - len(representatives))
+        unique_docs = [docs[i] for i in representatives]
+    else:
+        unique_docs = docs
 
-    similarity_scores = compute_similarity(cv_texts, jd_text)
-    sentiments = [classify_sentiment(fb) for fb in feedbacks]  # [(label, score), ...]
+    similarity_scores = compute_similarity(unique_docs, jd_text)
+    sentiments = classify_sentiments(feedbacks)  # [(label, score), ...]
 
     jd_req = extract_requirements(jd_text)
+
+    # Parse all CVs in one batch using universal parser (cached features are reused)
+    parsed_cvs = parse_cvs_cached(unique_docs, cache)
+
+    if duplicate_of is not None:
+        # Fan representative features out to every member of its cluster
+        fan_out = [position[owner] for owner in owners]
+        similarity_scores = similarity_scores[fan_out]
+        parsed_cvs = [parsed_cvs[p] for p in fan_out]
+
+    results = decide_in_order(similarity_scores, sentiments, parsed_cvs, jd_req, rl_agent,
+                              similarity_threshold, skill_match_threshold)
+    if duplicate_of is not None:
+        for result, rep in zip(results, duplicate_of):
+            result["duplicate_of"] = None if rep is None else rep + 1
+    return results
+
+
+def structured_match(parsed_cv, jd_req):
+    """(degree_match, skill_pct) of one parsed CV against the JD requirements."""
     required_degrees = jd_req["degrees"]
     required_skills = jd_req["skills"]
+    degree_match = parsed_cv["degree"] in required_degrees or "ANY" in required_degrees
+    skill_matches = set(parsed_cv["skills"]) & set(required_skills)
+    skill_pct = len(skill_matches) / len(required_skills) if required_skills else 0.0
+    return degree_match, skill_pct
+
 
+def decide_in_order(similarity_scores, sentiments, parsed_cvs, jd_req, rl_agent,
+                    similarity_threshold, skill_match_threshold, skip_updates=()):
+    """
+    The sequential half of `make_decision`: rules + RL choice and update for
+    every CV, in CV order. Each RL choice depends on the updates before it, so
+    this is the only part that cannot be split across processes.
+    `parsed_cvs` only needs the "degree" and "skills" fields. Rows in
+    `skip_updates` (hard-filter rejects only) get no RL update and may have
+    (None, None) as their sentiment.
+    """
     results = []
-    for i, cv_text in enumerate(cv_texts):
+    for i in range(len(parsed_cvs)):
         sim_score = similarity_scores[i]
         sent_label, sent_score = sentiments[i]
-
-        # Parse CV using universal parser
-        parsed_cv = parse_cv_text(f"cv_{i+1}", cv_text)
-        cv_degree = parsed_cv["degree"]
-        cv_skills = parsed_cv["skills"]
-
-        degree_match = cv_degree in required_degrees or "ANY" in required_degrees
-        skill_matches = set(cv_skills) & set(required_skills)
-        skill_pct = len(skill_matches) / len(required_skills) if required_skills else 0.0
+        degree_match, skill_pct = structured_match(parsed_cvs[i], jd_req)
 
         action, explanation, rl_conf = evaluate_candidate(
             sim_score, sent_label, sent_score, degree_match, skill_pct,
@@ -81,7 +162,9 @@ def make_decision(cv_texts, jd_text, feedbacks, rl_agent,
         reward = 1.0 if action in ["Strong Hire", "Consider"] else 0.0
 
         # Update RL agent with this reward
-        rl_agent.update(sim_score, sent_label, degree_match, skill_pct, action, reward)
+        if i not in skip_updates:
+            with stage("rl.update"):
+                rl_agent.update(sim_score, sent_label, degree_match, skill_pct, action, reward)
 
         match_score = round((sim_score + skill_pct + (1 if degree_match else 0)) / 3 * 100, 1)
 
@@ -92,7 +175,7 @@ def make_decision(cv_texts, jd_text, feedbacks, rl_agent,
             "degree_match": degree_match,
             "match_score_%": match_score,
             "sentiment_label": sent_label,
-            "sentiment_score": round(sent_score, 2),
+            "sentiment_score": None if sent_score is None else round(sent_score, 2),
             "rl_confidence_%": rl_conf,
             "decision": action,
             "explanation": explanation
@@ -104,18 +187,372 @@ def make_decision(cv_texts, jd_text, feedbacks, rl_agent,
     return results
 
 
+# ----------------------
+# Sharded parallel mode
+# ----------------------
+SHARD_SIZE = 256   # CVs (and their feedbacks) per worker task
+
+
+def _shard_features(cv_texts, feedbacks):
+    # Runs in a worker process: parse the CVs that need it and score the feedbacks.
+    features = [{field: cv[field] for field in FEATURE_FIELDS} for cv in parse_cv_texts(cv_texts)] \
+        if cv_texts else []
+    return features, classify_sentiments(feedbacks, workers=1)
+
+
+@timed("make_decision_parallel")
+def make_decision_parallel(cv_texts, jd_text, feedbacks, rl_agent, similarity_threshold,
+                           skill_match_threshold, cache=None, workers=None, executor=None):
+    """
+    `make_decision` with the per-CV work spread over processes. Results and
+    the agent's final state are identical to `make_decision` for the same seed.
+
+    1. CVs and their feedbacks are cut into SHARD_SIZE shards; each shard is
+       parsed and sentiment-scored in a worker process (`workers` processes,
+       None = all cores, or an existing `executor` to reuse one pool).
+    2. Meanwhile the parent computes the similarities (TF-IDF is fitted on the
+       whole CV pool, so it cannot be sharded) and the JD requirements.
+    3. `decide_in_order` then applies the rules and RL choose/update in the
+       original CV order, exactly as `make_decision` does.
+    """
+    docs = [as_document(cv) for cv in cv_texts]
+    n = len(docs)
+    feedbacks = list(feedbacks)[:n]
+    if len(feedbacks) < n:
+        raise IndexError("fewer feedbacks than CVs")
+    workers = workers or os.cpu_count() or 1
+    if executor is None and (workers == 1 or n <= SHARD_SIZE):
+        return make_decision(docs, jd_text, feedbacks, rl_agent,
+                             similarity_threshold, skill_match_threshold, cache)
+
+    # Cached features are reused; only the rest travel to the workers
+    if cache is not None:
+        pending = [doc for doc in docs if doc.features is None and doc.cacheable]
+        for doc, features in zip(pending, cache.get_many([doc.key for doc in pending], "features")):
+            doc.features = features
+    shards = [range(start, min(start + SHARD_SIZE, n)) for start in range(0, n, SHARD_SIZE)]
+
+    pool = executor or ProcessPoolExecutor(max_workers=min(workers, len(shards)))
+    try:
+        with stage("make_decision_parallel.features"):
+            futures = [
+                pool.submit(_shard_features, [docs[i].text for i in shard if docs[i].features is None],
+                            feedbacks[shard.start:shard.stop])
+                for shard in shards
+            ]
+            similarity_scores = compute_similarity(docs, jd_text)
+            jd_req = extract_requirements(jd_text)
+
+            sentiments = []
+            parsed_docs = []
+            for shard, future in zip(shards, futures):
+                features, shard_sentiments = future.result()
+                sentiments.extend(shard_sentiments)
+                parsed = iter(features)
+                for i in shard:
+                    if docs[i].features is None:
+                        docs[i].features = next(parsed)
+                        if docs[i].cacheable:
+                            parsed_docs.append(docs[i])
+            if cache is not None:
+                cache.put_many([doc.key for doc in parsed_docs], features=[doc.features for doc in parsed_docs])
+    finally:
+        if executor is None:
+            pool.shutdown()
+
+    return decide_in_order(similarity_scores, sentiments, [doc.features for doc in docs], jd_req,
+                           rl_agent, similarity_threshold, skill_match_threshold)
+
+
+# ----------------------
+# Staged mode (cheap filters first)
+# ----------------------
+SENTIMENT_LABELS = ("Positive", "Neutral", "Negative")
+
+
+def _reject_updates_needed(rl_agent, rejected, passed, sims, degree_match, skill_pct):
+    """
+    Rejected rows whose RL update could change a later decision.
+
+    A reject only moves Q[state]["Reject"] towards 0 (reward 0), and only for
+    its own state. It can matter only if a later surviving row may share that
+    state (same similarity/degree/skill buckets; its sentiment is not known
+    yet, so every label is considered) and that Q value is not already 0.
+    A Q value of 0 for "Reject" stays 0, since "Reject" is always rewarded 0.
+    """
+    def group(i):
+        return (rl_agent._sim_bucket(sims[i]), bool(degree_match[i]), rl_agent._skill_bucket(skill_pct[i]))
+
+    last_survivor = {}
+    for i in passed:
+        last_survivor[group(i)] = i
+    q_table = rl_agent.q_table
+    needed = []
+    for i in rejected:
+        if last_survivor.get(group(i), -1) < i:
+            continue
+        for label in SENTIMENT_LABELS:
+            key = rl_agent._state_key(sims[i], label, degree_match[i], skill_pct[i])
+            if q_table.get(key, {}).get("Reject", 0.0) != 0:
+                needed.append(i)
+                break
+    return needed
+
+
+@timed("make_decision_staged")
+def make_decision_staged(cv_texts, jd_text, feedbacks, rl_agent,
+                         similarity_threshold, skill_match_threshold, cache=None):
+    """
+    `make_decision` with the hard filters applied before the expensive work.
+    Returns (results, stage_counts).
+
+    1. CVs are parsed and matched against the JD (degree, skill %); rows
+       failing the degree or skill filter are rejected here.
+    2. Similarity runs next. The TF-IDF IDF weights are fitted on the whole
+       CV pool, so it is still computed for every CV (scoring only the
+       survivors would change their scores); rows below the threshold are
+       rejected.
+    3. Sentiment is scored and the RL agent runs only for the surviving rows,
+       plus the few rejects whose RL update could affect a later decision
+       (see `_reject_updates_needed`); other rejects are not sent to the agent.
+
+    Decisions and explanations match `make_decision` for every row. The
+    records of rejects whose feedback was not scored have None as sentiment
+    label and score, and the agent's final Q-table/reward history lacks the
+    skipped reject updates. `stage_counts` gives the rows each stage removed.
+    """
+    docs = [as_document(cv) for cv in cv_texts]
+    n = len(docs)
+    if len(feedbacks) < n:
+        raise IndexError("fewer feedbacks than CVs")
+
+    with stage("make_decision_staged.structured"):
+        jd_req = extract_requirements(jd_text)
+        parsed_cvs = parse_cvs_cached(docs, cache)
+        matches = [structured_match(cv, jd_req) for cv in parsed_cvs]
+        degree_match = [m[0] for m in matches]
+        skill_pct = [m[1] for m in matches]
+
+    sims = compute_similarity(docs, jd_text)
+    hard_filter = [
+        DEGREE_MISMATCH if not degree_match[i] else
+        SKILLS_BELOW if skill_pct[i] < skill_match_threshold else
+        SIMILARITY_BELOW if sims[i] < similarity_threshold else PASSED
+        for i in range(n)
+    ]
+    passed = [i for i in range(n) if hard_filter[i] == PASSED]
+    rejected = [i for i in range(n) if hard_filter[i] != PASSED]
+    replayed = _reject_updates_needed(rl_agent, rejected, passed, sims, degree_match, skill_pct)
+
+    scored = sorted(passed + replayed)
+    sentiments = [(None, None)] * n
+    for i, sentiment in zip(scored, classify_sentiments([feedbacks[i] for i in scored])):
+        sentiments[i] = sentiment
+
+    skip_updates = set(rejected).difference(replayed)
+    results = decide_in_order(sims, sentiments, parsed_cvs, jd_req, rl_agent,
+                              similarity_threshold, skill_match_threshold, skip_updates)
+
+    stage_counts = {
+        "candidates": n,
+        "degree_mismatch": hard_filter.count(DEGREE_MISMATCH),
+        "skills_below": hard_filter.count(SKILLS_BELOW),
+        "similarity_below": hard_filter.count(SIMILARITY_BELOW),
+        "passed": len(passed),
+        "sentiment_scored": len(scored),
+        "reject_updates_applied": len(replayed),
+        "reject_updates_skipped": len(skip_updates),
+    }
+    for name, value in stage_counts.items():
+        count(f"make_decision_staged.{name}", value)
+    return results, stage_counts
+
+
+# ----------------------
+# Columnar mode
+# ----------------------
+# Hard-filter codes stored in the "hard_filter" column
+PASSED, DEGREE_MISMATCH, SKILLS_BELOW, SIMILARITY_BELOW = 0, 1, 2, 3
+
+RESULT_COLUMNS = ["cv_index", "similarity_score_%", "skill_match_%", "degree_match", "match_score_%",
+                  "sentiment_label", "sentiment_score", "rl_confidence_%", "decision"]
+
+
+def _round_like_rows(values, ndigits):
+    # Python's round, as make_decision uses: np.round scales by 10**ndigits
+    # first, so values such as 0.15 can round the other way on ties
+    return np.array([round(value, ndigits) for value in values.tolist()], dtype=float)
+
+
+@timed("make_decision_columnar")
+def make_decision_columnar(cv_texts, jd_text, feedbacks, rl_agent,
+                           similarity_threshold, skill_match_threshold, cache=None):
+    """
+    Same decisions as `make_decision`, returned as a pandas DataFrame.
+
+    Similarity, skill %, degree match, the hard filters and the match score are
+    computed as whole NumPy columns. Only the RL step stays sequential (each
+    choice depends on the updates before it); rows rejected by the hard filters
+    between two RL choices are sent to the agent with one `update_batch` call.
+    No explanation strings are built and nothing is printed per row: use
+    `build_explanations` / `decision_records` for the rows you display or export.
+
+    Besides RESULT_COLUMNS the table keeps the raw inputs of the explanation
+    ("similarity", "skill_pct", "hard_filter", "rl_unscored"); the thresholds
+    are stored in `table.attrs`.
+    """
+    import pandas as pd
+
+    docs = [as_document(cv) for cv in cv_texts]
+    n = len(docs)
+    sims = np.asarray(compute_similarity(docs, jd_text), dtype=float)
+    sentiments = classify_sentiments(feedbacks)[:n]
+    if len(sentiments) < n:
+        raise IndexError("fewer feedbacks than CVs")
+    sent_labels = np.array([label for label, _ in sentiments], dtype=object)
+    sent_scores = np.array([score for _, score in sentiments], dtype=float)
+
+    jd_req = extract_requirements(jd_text)
+    required_degrees = jd_req["degrees"]
+    required_skills = set(jd_req["skills"])
+    n_required = len(jd_req["skills"])
+    parsed_cvs = parse_cvs_cached(docs, cache)
+
+    degree_match = np.array([cv["degree"] in required_degrees for cv in parsed_cvs], dtype=bool)
+    if "ANY" in required_degrees:
+        degree_match[:] = True
+    matched = np.fromiter((len(required_skills.intersection(cv["skills"])) for cv in parsed_cvs),
+                          dtype=np.intp, count=n)
+    skill_pct = matched / n_required if n_required else np.zeros(n)
+    # skill_pct only takes n_required + 1 values; round each like the row path does
+    skill_pct_rounded = np.array([round(k / n_required * 100, 1) for k in range(n_required + 1)]) \
+        if n_required else np.zeros(1)
+
+    hard_filter = np.select(
+        [~degree_match, skill_pct < skill_match_threshold, sims < similarity_threshold],
+        [DEGREE_MISMATCH, SKILLS_BELOW, SIMILARITY_BELOW], default=PASSED
+    ).astype(np.int8)
+
+    decisions = np.full(n, "Reject", dtype=object)
+    rl_conf = np.zeros(n)
+    rl_unscored = np.zeros(n, dtype=bool)
+
+    def send_rejects(rows):
+        if len(rows):
+            with stage("rl.update_batch"):
+                rl_agent.update_batch(sims[rows], sent_labels[rows], degree_match[rows], skill_pct[rows],
+                                      ["Reject"] * len(rows), [0.0] * len(rows))
+
+    previous = -1
+    for i in np.flatnonzero(hard_filter == PASSED):
+        send_rejects(np.arange(previous + 1, i))
+        args = (sims[i], sent_labels[i], bool(degree_match[i]), skill_pct[i])
+        with stage("rl.choose_action"):
+            action = rl_agent.choose_action(*args)
+            q_values = rl_agent.get_q_values(*args)
+        rl_conf[i] = rl_confidence(q_values, action)
+        rl_unscored[i] = bool(q_values) and max(q_values.values()) == 0
+        decisions[i] = action
+        with stage("rl.update"):
+            rl_agent.update(*args, action, 1.0 if action in ["Strong Hire", "Consider"] else 0.0)
+        previous = i
+    send_rejects(np.arange(previous + 1, n))
+
+    table = pd.DataFrame({
+        "cv_index": np.arange(1, n + 1),
+        "similarity_score_%": _round_like_rows(sims * 100, 1),
+        "skill_match_%": skill_pct_rounded[matched] if n_required else np.zeros(n),
+        "degree_match": degree_match,
+        "match_score_%": _round_like_rows((sims + skill_pct + degree_match) / 3 * 100, 1),
+        "sentiment_label": sent_labels,
+        "sentiment_score": _round_like_rows(sent_scores, 2),
+        "rl_confidence_%": rl_conf,
+        "decision": decisions,
+        "similarity": sims,
+        "skill_pct": skill_pct,
+        "hard_filter": hard_filter,
+        "rl_unscored": rl_unscored,
+    })
+    table.attrs["similarity_threshold"] = similarity_threshold
+    table.attrs["skill_match_threshold"] = skill_match_threshold
+    return table
+
+
+def build_explanations(table, rows=None):
+    """
+    Explanation strings (as `make_decision` writes them) for the given row
+    labels of a `make_decision_columnar` table, or for every row.
+    """
+    view = table if rows is None else table.loc[rows]
+    similarity_threshold = table.attrs["similarity_threshold"]
+    skill_match_threshold = table.attrs["skill_match_threshold"]
+    rejected = {
+        DEGREE_MISMATCH: "❌ Degree mismatch",
+        SKILLS_BELOW: f"❌ Skills match below {skill_match_threshold*100:.0f}%",
+        SIMILARITY_BELOW: f"❌ Similarity score below {similarity_threshold:.2f}",
+    }
+    explanations = []
+    for hard_filter, sim, label, score, degree_match, skill_pct, action, rl_conf, unscored in zip(
+            view["hard_filter"], view["similarity"], view["sentiment_label"], view["sentiment_score"],
+            view["degree_match"], view["skill_pct"], view["decision"], view["rl_confidence_%"],
+            view["rl_unscored"]):
+        if hard_filter != PASSED:
+            explanations.append(rejected[hard_filter])
+            continue
+        explanations.append(
+            f"Sim={sim*100:.1f}%, Sentiment={label}({score:.2f}), "
+            f"DegreeMatch={degree_match}, Skills={skill_pct*100:.1f}%, "
+            f"RL Action={action}, RL Confidence={0 if unscored else rl_conf}%"
+        )
+    return explanations
+
+
+def decision_records(table, rows=None):
+    """
+    Result dicts, identical to what `make_decision` returns, for the given
+    row labels of a `make_decision_columnar` table (or every row). Use this
+    for exports; explanations are only built for the rows requested.
+    """
+    view = table if rows is None else table.loc[rows]
+    records = view[RESULT_COLUMNS].to_dict("records")
+    for record, unscored, explanation in zip(records, view["rl_unscored"], build_explanations(table, view.index)):
+        record["cv_index"] = int(record["cv_index"])
+        record["degree_match"] = bool(record["degree_match"])
+        if unscored:
+            record["rl_confidence_%"] = 0
+        record["explanation"] = explanation
+    return records
+
+
 def log_decision(result):
-    print(f"[CV {result['cv_index']}] → {result['decision']} | {result['explanation']}")
+    """Buffer a structured "decision" event (see utils.instrumentation.events)."""
+    log_event("decision", **result)
+
+
+def format_decision(event):
+    """The one-line console form of a decision event."""
+    return f"[CV {event['cv_index']}] → {event['decision']} | {event['explanation']}"
+
+
+def results_to_csv(results):
+    """CSV text for the results, as written by `save_results_to_csv`."""
+    buffer = io.StringIO(newline='')
+    dict_writer = csv.DictWriter(buffer, results[0].keys())
+    dict_writer.writeheader()
+    dict_writer.writerows(results)
+    return buffer.getvalue()
+
+
+def results_to_json(results):
+    """JSON text for the results, as written by `save_results_to_json`."""
+    return json.dumps(results, indent=4)
 
 
 def save_results_to_csv(results, filename="final_decisions.csv"):
-    keys = results[0].keys()
     with open(filename, "w", newline='', encoding="utf-8") as output_file:
-        dict_writer = csv.DictWriter(output_file, keys)
-        dict_writer.writeheader()
-        dict_writer.writerows(results)
+        output_file.write(results_to_csv(results))
 
 
 def save_results_to_json(results, filename="final_decisions.json"):
     with open(filename, "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=4)
+        f.write(results_to_json(results))
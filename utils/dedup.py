@@ -0,0 +1,191 @@
+# utils/dedup.py
+import os
+import sys
+import zlib
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.document import as_document
+
+NUM_PERM = 128           # MinHash permutations per signature
+SHINGLE_SIZE = 3         # words per shingle
+MAX_BUCKET_PAIRS = 32    # larger LSH buckets are checked against their first member only
+LSH_RECALL = 0.99        # chance that a pair exactly at the threshold becomes a candidate
+_EMPTY = np.iinfo(np.uint32).max
+_FNV_OFFSET = np.uint32(2166136261)
+_FNV_PRIME = np.uint32(16777619)
+
+
+def shingles(text, k=SHINGLE_SIZE, word_hashes=None):
+    """
+    Sorted unique uint32 hashes of the k-word shingles of a CV's
+    `clean_text` (text may be a string or a Document). Each word is
+    crc32-hashed once (through the optional `word_hashes` dict shared across
+    texts) and the k hashes of a shingle are folded FNV-style in NumPy.
+    Texts shorter than k words give one shingle of the whole text.
+    """
+    words = as_document(text).tokens
+    if not words:
+        return np.empty(0, dtype=np.uint32)
+    if word_hashes is None:
+        word_hashes = {}
+    for word in words:
+        if word not in word_hashes:
+            word_hashes[word] = zlib.crc32(word.encode("utf-8"))
+    ids = np.fromiter(map(word_hashes.__getitem__, words), dtype=np.uint32, count=len(words))
+    k = min(k, len(words))
+    n = len(words) - k + 1
+    hashes = np.full(n, _FNV_OFFSET, dtype=np.uint32)
+    for j in range(k):
+        hashes = (hashes ^ ids[j:j + n]) * _FNV_PRIME
+    return np.unique(hashes)
+
+
+def jaccard(a, b):
+    """Jaccard similarity of two `shingles` arrays."""
+    if not len(a) and not len(b):
+        return 1.0
+    common = np.intersect1d(a, b, assume_unique=True).size
+    return common / (len(a) + len(b) - common)
+
+
+class MinHasher:
+    """
+    MinHash signatures with `num_perm` hashes (a*x + b) mod 2**32 over 32-bit
+    shingle hashes. With odd `a` each hash is a permutation of the 32-bit
+    values, and uint32 arithmetic wraps for free (no modulo).
+    """
+
+    def __init__(self, num_perm=NUM_PERM, seed=0):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(0, 2**32, size=num_perm, dtype=np.uint32) | np.uint32(1)
+        self.b = rng.integers(0, 2**32, size=num_perm, dtype=np.uint32)
+        self.num_perm = num_perm
+
+    def signature(self, shingle_set):
+        return self.signatures([shingle_set])[0]
+
+    def signatures(self, shingle_sets, block_size=1 << 16):
+        """
+        (n, num_perm) uint32 signature matrix. All shingles are hashed as one
+        array, `block_size` shingles at a time, and reduced per text with
+        np.minimum.reduceat. Empty sets get the all-ones signature.
+        """
+        out = np.full((len(shingle_sets), self.num_perm), _EMPTY, dtype=np.uint32)
+        sizes = np.fromiter((len(s) for s in shingle_sets), dtype=np.intp, count=len(shingle_sets))
+        nonempty = np.flatnonzero(sizes)
+        if not len(nonempty):
+            return out
+        x = np.concatenate([shingle_sets[i] for i in nonempty]).astype(np.uint32, copy=False)
+        starts = np.concatenate(([0], np.cumsum(sizes[nonempty])[:-1]))
+
+        # Blocks end on text boundaries so every reduceat segment is complete
+        first = 0
+        while first < len(nonempty):
+            last = int(np.searchsorted(starts, starts[first] + block_size, side="right"))
+            last = max(last, first + 1)
+            lo = starts[first]
+            hi = starts[last] if last < len(nonempty) else len(x)
+            hashed = np.outer(self.a, x[lo:hi]) + self.b[:, None]
+            out[nonempty[first:last]] = np.minimum.reduceat(hashed, starts[first:last] - lo, axis=1).T
+            first = last
+        return out
+
+
+def choose_bands(num_perm, threshold, recall=LSH_RECALL):
+    """
+    Fewest LSH bands (a divisor of num_perm) for which a pair with Jaccard
+    similarity `threshold` shares at least one bucket with probability
+    >= `recall`. More bands only add candidates, which are checked exactly.
+    """
+    for bands in range(1, num_perm + 1):
+        if num_perm % bands:
+            continue
+        rows = num_perm // bands
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            return bands
+    return num_perm
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i, j):
+        # The lower index stays the root, so the first CV of a cluster represents it
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+def find_duplicates(texts, threshold=0.9, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=0):
+    """
+    Cluster near-duplicate CVs. Returns `duplicate_of`, one entry per text:
+    None for a cluster representative (the first CV of its cluster), else
+    the index of its representative.
+
+    MinHash + LSH banding proposes candidate pairs; a pair is merged only if
+    the exact Jaccard similarity of its shingle sets is >= `threshold`.
+    Clusters are transitive (union-find).
+    """
+    if not 0 < threshold <= 1:
+        raise ValueError("threshold must be in (0, 1]")
+    word_hashes = {}
+    shingle_sets = [shingles(text, shingle_size, word_hashes) for text in texts]
+    n = len(shingle_sets)
+    signatures = MinHasher(num_perm, seed).signatures(shingle_sets)
+    bands = choose_bands(num_perm, threshold)
+    rows = num_perm // bands
+
+    clusters = _UnionFind(n)
+
+    def merge(i, j):
+        if clusters.find(i) != clusters.find(j) and jaccard(shingle_sets[i], shingle_sets[j]) >= threshold:
+            clusters.union(i, j)
+
+    for band in range(bands):
+        buckets = {}
+        for i, key in enumerate(map(bytes, signatures[:, band * rows:(band + 1) * rows])):
+            buckets.setdefault(key, []).append(i)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            if len(members) <= MAX_BUCKET_PAIRS:
+                for p, i in enumerate(members):
+                    for j in members[p + 1:]:
+                        merge(i, j)
+            else:
+                for j in members[1:]:
+                    merge(members[0], j)
+
+    roots = [clusters.find(i) for i in range(n)]
+    return [None if root == i else root for i, root in enumerate(roots)]
+
+
+def duplicate_groups(duplicate_of):
+    """{representative: [member, ...]} for clusters with more than one CV."""
+    groups = {}
+    for i, rep in enumerate(duplicate_of):
+        if rep is not None:
+            groups.setdefault(rep, []).append(i)
+    return groups
+
+
+if __name__ == "__main__":
+    from utils.pdf_extract import extract_texts
+
+    folder = "data/sample_cvs"
+    names = sorted(f for f in os.listdir(folder) if f.lower().endswith(".pdf"))
+    texts, _ = extract_texts([os.path.join(folder, name) for name in names])
+    for threshold in (1.0, 0.9, 0.7):
+        groups = duplicate_groups(find_duplicates(texts, threshold))
+        print(f"Jaccard >= {threshold}:" + ("" if groups else " no duplicates"))
+        for rep, members in groups.items():
+            print(f"  {names[rep]} <- {', '.join(names[m] for m in members)}")
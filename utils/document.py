@@ -0,0 +1,80 @@
+# utils/document.py
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.cv_cache import content_key
+from utils.preprocess import clean_lowered_text
+
+
+class Document:
+    """
+    One CV (or JD) text, normalised once and shared by every pipeline stage.
+
+    `lower`, `clean` and `tokens` are computed on first access and kept, so
+    embedding, parsing, matching and decisions never re-lowercase or
+    re-clean the same text. `features` caches the parsed fields (domain,
+    degree, skills, experience) once `parse_cv_text` has seen the document.
+    `key` is its CvCache key: pass the source file's key when the text was
+    extracted from a file, so extraction and features share one cache entry.
+    `cacheable` is False when the text is not the real content (e.g. the empty
+    text of a failed extraction): its features are then never read from or
+    written to the cache.
+    """
+
+    __slots__ = ("text", "_key", "_lower", "_clean", "_tokens", "features", "cacheable")
+
+    def __init__(self, text, key=None, cacheable=True):
+        self.text = text
+        self._key = key
+        self.cacheable = cacheable
+        self._lower = None
+        self._clean = None
+        self._tokens = None
+        self.features = None
+
+    @property
+    def key(self):
+        if self._key is None:
+            self._key = content_key(self.text)
+        return self._key
+
+    @property
+    def lower(self):
+        if self._lower is None:
+            self._lower = self.text.lower()
+        return self._lower
+
+    @property
+    def clean(self):
+        """Same output as `clean_text(self.text)`."""
+        if self._clean is None:
+            self._clean = clean_lowered_text(self.lower)
+        return self._clean
+
+    @property
+    def tokens(self):
+        """Words of the cleaned text (what near-duplicate shingles are built from)."""
+        if self._tokens is None:
+            self._tokens = self.clean.split()
+        return self._tokens
+
+    def __repr__(self):
+        return f"Document({self.text[:40]!r}{'...' if len(self.text) > 40 else ''})"
+
+
+def as_document(obj):
+    """Wrap a string in a Document; Documents are returned unchanged."""
+    return obj if isinstance(obj, Document) else Document(obj)
+
+
+def text_of(obj):
+    return obj.text if isinstance(obj, Document) else obj
+
+
+def lower_of(obj):
+    return obj.lower if isinstance(obj, Document) else obj.lower()
+
+
+def clean_of(obj):
+    return obj.clean if isinstance(obj, Document) else clean_lowered_text(obj.lower())
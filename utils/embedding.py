@@ -1,18 +1,25 @@
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+import numpy as np
+import scipy.sparse as sp
+import json
 import sys
 import os
+import tempfile
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from utils.preprocess import clean_text
+from utils.document import clean_of
+from utils.instrumentation import timed
 
+@timed("compute_similarity")
 def compute_similarity(cv_texts, jd_text):
     """
     Takes a list of CV texts and a single JD text, returns a list of cosine similarity scores.
+    Texts may be strings or Documents (whose cleaned text is reused).
     """
     # Clean JD and all CVs
-    jd_clean = clean_text(jd_text)
-    cv_clean_list = [clean_text(cv) for cv in cv_texts]
+    jd_clean = clean_of(jd_text)
+    cv_clean_list = [clean_of(cv) for cv in cv_texts]
 
     # Combine all texts for vectorization
     corpus = [jd_clean] + cv_clean_list
@@ -30,6 +37,430 @@ def compute_similarity(cv_texts, jd_text):
 
     return similarities
 
+
+def top_k_indices(scores, k):
+    """
+    Indices of the `k` highest scores, best first, using argpartition so the
+    full score vector is never sorted. Ties keep the lower index first.
+    """
+    scores = np.asarray(scores)
+    k = min(int(k), scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.lexsort((idx, -scores[idx]))]
+
+
+def vectorize_batch(cv_texts, jd_texts):
+    """
+    Fit one TF-IDF vocabulary over all JDs and CVs.
+    Returns (jd_matrix, cv_matrix) as L2-normalised CSR matrices.
+    """
+    jd_clean = [clean_of(jd) for jd in jd_texts]
+    cv_clean = [clean_of(cv) for cv in cv_texts]
+
+    vectorizer = TfidfVectorizer()
+    tfidf_matrix = vectorizer.fit_transform(jd_clean + cv_clean).tocsr()
+    return tfidf_matrix[:len(jd_clean)], tfidf_matrix[len(jd_clean):]
+
+
+def iter_similarity_chunks(jd_matrix, cv_matrix, chunk_size=64, dense=True):
+    """
+    Yield (start_row, block) for consecutive blocks of at most `chunk_size` JDs,
+    where block is the (rows, n_cvs) cosine similarity matrix for that block.
+    Only one block is materialised at a time, so memory stays bounded.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    cv_matrix_t = cv_matrix.T.tocsc()
+    for start in range(0, jd_matrix.shape[0], chunk_size):
+        block = jd_matrix[start:start + chunk_size] @ cv_matrix_t
+        yield start, (block.toarray() if dense else block.tocsr())
+
+
+def compute_similarity_matrix(cv_texts, jd_texts, top_k=None, chunk_size=64):
+    """
+    Score many JDs against many CVs from a single vectorization.
+    - top_k=None: returns a sparse (n_jds, n_cvs) CSR matrix of cosine similarities
+    - top_k=k:    returns one (cv_indices, scores) pair per JD, best first
+    The vocabulary is fitted on all JDs and CVs together, so scores can differ
+    slightly from calling `compute_similarity` once per JD.
+    """
+    jd_matrix, cv_matrix = vectorize_batch(cv_texts, jd_texts)
+    return score_chunks(jd_matrix, cv_matrix, top_k=top_k, chunk_size=chunk_size)
+
+
+def score_chunks(jd_matrix, cv_matrix, top_k=None, chunk_size=64):
+    """Sparse similarity matrix or per-JD top-k from pre-vectorized matrices."""
+    if top_k is None:
+        blocks = [block for _, block in iter_similarity_chunks(jd_matrix, cv_matrix, chunk_size, dense=False)]
+        if not blocks:
+            return sp.csr_matrix((0, cv_matrix.shape[0]))
+        return sp.vstack(blocks, format="csr")
+
+    results = []
+    for _, block in iter_similarity_chunks(jd_matrix, cv_matrix, chunk_size):
+        for row in block:
+            idx = top_k_indices(row, top_k)
+            results.append((idx, row[idx]))
+    return results
+
+
+def _write_atomic(path, write, text=False):
+    """Call `write(f)` on a temp file next to `path`, then rename it over `path`."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w" if text else "wb", **({"encoding": "utf-8"} if text else {})) as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class CvIndex:
+    """
+    Persistent TF-IDF index over a pool of CVs.
+
+    The vocabulary and IDF weights are fitted once on the CV pool; every CV is
+    stored as an L2-normalised sparse row, so scoring a JD is one sparse
+    mat-vec instead of a refit over the whole pool. CVs can be added or
+    removed without refitting (terms unseen at fit time are ignored until
+    the next `fit`). Because the JD is not part of the fitted corpus, scores
+    are close to, but not identical with, `compute_similarity`.
+    """
+
+    MATRIX_FILE = "matrix.npz"
+    META_FILE = "index.json"
+
+    def __init__(self):
+        self.vectorizer = None
+        self.cv_ids = []
+        self.matrix = None
+        self._row_of = {}
+        self._pending_ids = []
+        self._pending_rows = []
+
+    # ----------------------
+    # Building
+    # ----------------------
+    def fit(self, cv_ids, cv_texts):
+        """Fit vocabulary/IDF on the given CVs and index them."""
+        cv_ids = list(cv_ids)
+        if len(cv_ids) != len(cv_texts):
+            raise ValueError("cv_ids and cv_texts must have the same length")
+        if len(set(cv_ids)) != len(cv_ids):
+            raise ValueError("cv_ids must be unique")
+
+        self.vectorizer = TfidfVectorizer()
+        self.matrix = self.vectorizer.fit_transform([clean_of(t) for t in cv_texts]).tocsr()
+        self.cv_ids = cv_ids
+        self._row_of = {cv_id: i for i, cv_id in enumerate(cv_ids)}
+        self._pending_ids = []
+        self._pending_rows = []
+        return self
+
+    def add(self, cv_id, text):
+        """Index one CV with the fitted vocabulary; replaces an existing id."""
+        self.add_many([cv_id], [text])
+
+    def add_many(self, cv_ids, cv_texts):
+        self._check_fitted()
+        cv_ids = list(cv_ids)
+        if len(cv_ids) != len(cv_texts):
+            raise ValueError("cv_ids and cv_texts must have the same length")
+        if len(set(cv_ids)) != len(cv_ids):
+            raise ValueError("cv_ids must be unique")
+
+        existing = [cv_id for cv_id in cv_ids if cv_id in self]
+        if existing:
+            self.remove_many(existing)
+
+        self._pending_rows.append(self.vectorizer.transform([clean_of(t) for t in cv_texts]))
+        for cv_id in cv_ids:
+            self._row_of[cv_id] = len(self.cv_ids) + len(self._pending_ids)
+            self._pending_ids.append(cv_id)
+
+    def remove(self, cv_id):
+        """Drop one CV from the index. Raises KeyError if it is not indexed."""
+        self.remove_many([cv_id])
+
+    def remove_many(self, cv_ids):
+        self._flush()
+        drop = set(cv_ids)
+        missing = drop - self._row_of.keys()
+        if missing:
+            raise KeyError(f"CV id(s) not in index: {sorted(map(str, missing))}")
+
+        keep = [i for i, cv_id in enumerate(self.cv_ids) if cv_id not in drop]
+        self.matrix = self.matrix[keep]
+        self.cv_ids = [self.cv_ids[i] for i in keep]
+        self._row_of = {cv_id: i for i, cv_id in enumerate(self.cv_ids)}
+
+    # ----------------------
+    # Querying
+    # ----------------------
+    def query(self, jd_text):
+        """
+        Score a JD against every indexed CV.
+        Returns cosine similarities aligned with `self.cv_ids`.
+        """
+        self._check_fitted()
+        self._flush()
+        jd_vector = self.vectorizer.transform([clean_of(jd_text)])
+        return (self.matrix @ jd_vector.T).toarray().ravel()
+
+    def query_many(self, jd_texts, top_k=None, chunk_size=64):
+        """
+        Score many JDs at once, in blocks of `chunk_size`.
+        Same return shapes as `compute_similarity_matrix`; indices refer to `self.cv_ids`.
+        """
+        self._check_fitted()
+        self._flush()
+        jd_matrix = self.vectorizer.transform([clean_of(jd) for jd in jd_texts])
+        return score_chunks(jd_matrix, self.matrix, top_k=top_k, chunk_size=chunk_size)
+
+    # ----------------------
+    # Persistence
+    # ----------------------
+    def save(self, path):
+        """
+        Write the index to directory `path` (sparse matrix + JSON metadata).
+        Each file is replaced atomically, the metadata last; `load` rejects a
+        matrix that does not match it.
+        """
+        self._check_fitted()
+        self._flush()
+        os.makedirs(path, exist_ok=True)
+        _write_atomic(os.path.join(path, self.MATRIX_FILE),
+                      lambda f: sp.save_npz(f, self.matrix, compressed=False))
+        meta = {
+            "cv_ids": self.cv_ids,
+            "vocabulary": {term: int(col) for term, col in self.vectorizer.vocabulary_.items()},
+            "idf": self.vectorizer.idf_.tolist(),
+        }
+        _write_atomic(os.path.join(path, self.META_FILE), lambda f: json.dump(meta, f), text=True)
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, cls.META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        index = cls()
+        index.vectorizer = TfidfVectorizer(vocabulary=meta["vocabulary"])
+        index.vectorizer.idf_ = np.asarray(meta["idf"], dtype=np.float64)
+        index.matrix = sp.load_npz(os.path.join(path, cls.MATRIX_FILE)).tocsr()
+        if index.matrix.shape != (len(meta["cv_ids"]), len(meta["vocabulary"])):
+            raise ValueError(f"{path}: matrix does not match {cls.META_FILE} (interrupted save?)")
+        index.cv_ids = meta["cv_ids"]
+        index._row_of = {cv_id: i for i, cv_id in enumerate(index.cv_ids)}
+        return index
+
+    # ----------------------
+    # Helpers
+    # ----------------------
+    def _check_fitted(self):
+        if self.vectorizer is None:
+            raise RuntimeError("CvIndex is not fitted; call fit() or load() first")
+
+    def _flush(self):
+        """Append buffered rows so repeated add() calls avoid one vstack each."""
+        if not self._pending_rows:
+            return
+        self.matrix = sp.vstack([self.matrix] + self._pending_rows, format="csr")
+        self.cv_ids.extend(self._pending_ids)
+        self._pending_ids = []
+        self._pending_rows = []
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def __contains__(self, cv_id):
+        return cv_id in self._row_of
+
+class LsaIndex:
+    """
+    Dense LSA counterpart of CvIndex.
+
+    A TruncatedSVD projection is fitted offline on the CV pool's TF-IDF
+    matrix (scikit-learn only, nothing is downloaded). Each CV is stored as
+    an L2-normalised float32 vector of `n_components` values, so scoring a JD
+    is one BLAS matrix-vector product. `save` writes the vectors as a .npy
+    file that `load` memory-maps read-only: worker processes loading the same
+    index share its pages instead of each holding a copy, and a pickled
+    memory-mapped index is reopened from disk rather than copied.
+
+    LSA scores are cosines in the reduced space, so rankings are close to,
+    but not the same as, the sparse TF-IDF ones.
+    """
+
+    VECTORS_FILE = "vectors.npy"
+    COMPONENTS_FILE = "components.npy"
+    META_FILE = "lsa.json"
+
+    def __init__(self, n_components=256):
+        self.n_components = n_components
+        self.vectorizer = None
+        self.components = None   # (n_components, vocabulary) float32
+        self.vectors = None      # (n_cvs, n_components) float32, unit rows
+        self.cv_ids = []
+        self.path = None         # set when the vectors are memory-mapped
+        self._row_of = {}
+
+    # ----------------------
+    # Building
+    # ----------------------
+    def fit(self, cv_ids, cv_texts, random_state=0):
+        """Fit TF-IDF + TruncatedSVD on the given CVs and index them."""
+        from sklearn.decomposition import TruncatedSVD
+
+        cv_ids = list(cv_ids)
+        if len(cv_ids) != len(cv_texts):
+            raise ValueError("cv_ids and cv_texts must have the same length")
+        if len(set(cv_ids)) != len(cv_ids):
+            raise ValueError("cv_ids must be unique")
+
+        self.vectorizer = TfidfVectorizer()
+        tfidf = self.vectorizer.fit_transform([clean_of(t) for t in cv_texts])
+        n_components = min(self.n_components, tfidf.shape[1] - 1, tfidf.shape[0])
+        if n_components < 1:
+            raise ValueError("need at least two distinct terms to fit LSA")
+        svd = TruncatedSVD(n_components, random_state=random_state)
+        svd.fit(tfidf)
+        self.components = svd.components_.astype(np.float32)
+        self.vectors = self._project(tfidf)
+        self.cv_ids = cv_ids
+        self._row_of = {cv_id: i for i, cv_id in enumerate(cv_ids)}
+        self.path = None
+        return self
+
+    def transform(self, texts):
+        """Unit-length float32 LSA vectors for texts (strings or Documents)."""
+        self._check_fitted()
+        return self._project(self.vectorizer.transform([clean_of(t) for t in texts]))
+
+    def _project(self, tfidf):
+        vectors = np.asarray(tfidf.astype(np.float32) @ self.components.T, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def add_many(self, cv_ids, cv_texts):
+        """Project new CVs with the fitted model; replaces existing ids. Loads a mapped index into memory."""
+        self._check_fitted()
+        cv_ids = list(cv_ids)
+        if len(cv_ids) != len(cv_texts):
+            raise ValueError("cv_ids and cv_texts must have the same length")
+        existing = [cv_id for cv_id in cv_ids if cv_id in self]
+        if existing:
+            self.remove_many(existing)
+        self.vectors = np.vstack([self.vectors, self.transform(cv_texts)])
+        for cv_id in cv_ids:
+            self._row_of[cv_id] = len(self.cv_ids)
+            self.cv_ids.append(cv_id)
+        self.path = None
+
+    def remove_many(self, cv_ids):
+        drop = set(cv_ids)
+        missing = drop - self._row_of.keys()
+        if missing:
+            raise KeyError(f"CV id(s) not in index: {sorted(map(str, missing))}")
+        keep = [i for i, cv_id in enumerate(self.cv_ids) if cv_id not in drop]
+        self.vectors = np.ascontiguousarray(self.vectors[keep])
+        self.cv_ids = [self.cv_ids[i] for i in keep]
+        self._row_of = {cv_id: i for i, cv_id in enumerate(self.cv_ids)}
+        self.path = None
+
+    # ----------------------
+    # Querying
+    # ----------------------
+    def query(self, jd_text):
+        """Cosine similarities (LSA space) aligned with `self.cv_ids`."""
+        return self.vectors @ self.transform([jd_text])[0]
+
+    def query_many(self, jd_texts, top_k=None, chunk_size=64):
+        """
+        Dense (n_jds, n_cvs) float32 scores, or with top_k one
+        (cv_indices, scores) pair per JD, best first.
+        """
+        jd_vectors = self.transform(jd_texts)
+        if top_k is None:
+            return jd_vectors @ self.vectors.T
+        results = []
+        for start in range(0, len(jd_vectors), chunk_size):
+            for row in jd_vectors[start:start + chunk_size] @ self.vectors.T:
+                idx = top_k_indices(row, top_k)
+                results.append((idx, row[idx]))
+        return results
+
+    # ----------------------
+    # Persistence
+    # ----------------------
+    def save(self, path):
+        """
+        Write the index to directory `path` (.npy vectors and components +
+        JSON metadata). Each file goes to a temp file and is renamed into
+        place, the metadata last, so saving an index mapped from `path` back
+        to it never truncates the mapped vectors; `load` rejects files that
+        do not match the metadata.
+        """
+        self._check_fitted()
+        os.makedirs(path, exist_ok=True)
+        vectors = np.ascontiguousarray(self.vectors, dtype=np.float32)
+        _write_atomic(os.path.join(path, self.VECTORS_FILE), lambda f: np.save(f, vectors))
+        _write_atomic(os.path.join(path, self.COMPONENTS_FILE), lambda f: np.save(f, self.components))
+        meta = {
+            "cv_ids": self.cv_ids,
+            "n_components": int(self.components.shape[0]),
+            "vocabulary": {term: int(col) for term, col in self.vectorizer.vocabulary_.items()},
+            "idf": self.vectorizer.idf_.tolist(),
+        }
+        _write_atomic(os.path.join(path, self.META_FILE), lambda f: json.dump(meta, f), text=True)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load an index; with `mmap` the CV vectors stay on disk, mapped read-only."""
+        with open(os.path.join(path, cls.META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        index = cls(meta["n_components"])
+        index.vectorizer = TfidfVectorizer(vocabulary=meta["vocabulary"])
+        index.vectorizer.idf_ = np.asarray(meta["idf"], dtype=np.float64)
+        index.components = np.load(os.path.join(path, cls.COMPONENTS_FILE))
+        index.vectors = np.load(os.path.join(path, cls.VECTORS_FILE), mmap_mode="r" if mmap else None)
+        n_components, n_terms = meta["n_components"], len(meta["vocabulary"])
+        if (index.vectors.shape != (len(meta["cv_ids"]), n_components)
+                or index.components.shape != (n_components, n_terms)):
+            raise ValueError(f"{path}: vectors or components do not match {cls.META_FILE} (interrupted save?)")
+        index.cv_ids = meta["cv_ids"]
+        index._row_of = {cv_id: i for i, cv_id in enumerate(index.cv_ids)}
+        index.path = path if mmap else None
+        return index
+
+    def __reduce__(self):
+        # Send only the path to worker processes so they map the same file
+        if self.path is not None:
+            return (LsaIndex.load, (self.path, True))
+        return super().__reduce__()
+
+    # ----------------------
+    # Helpers
+    # ----------------------
+    def _check_fitted(self):
+        if self.vectorizer is None:
+            raise RuntimeError("LsaIndex is not fitted; call fit() or load() first")
+
+    def nbytes(self):
+        """Bytes held by the CV vectors (mapped from disk when loaded with mmap)."""
+        return 0 if self.vectors is None else self.vectors.nbytes
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def __contains__(self, cv_id):
+        return cv_id in self._row_of
+
+
 # Sample usage (can delete after testing)
 if __name__ == "__main__":
     cv_samples = [
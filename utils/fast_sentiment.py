@@ -0,0 +1,327 @@
+# utils/fast_sentiment.py
+import os
+import string
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.sentiment import get_analyzer, sentiment_label
+
+# Same constants and word lists as vaderSentiment, so scores match exactly
+from vaderSentiment.vaderSentiment import (
+    BOOSTER_DICT, C_INCR, N_SCALAR, NEGATE, SPECIAL_CASES
+)
+
+BATCH_SIZE = 4096   # texts scored per padded (texts x tokens) block
+
+# Bit flags for the handful of words VADER's rules test for by name
+NO, KIND, OF, LEAST, AT_VERY, OR_NOR, NEVER, SO_THIS, WITHOUT, DOUBT, BUT = (1 << i for i in range(11))
+WORD_FLAGS = {
+    "no": NO, "kind": KIND, "of": OF, "least": LEAST, "at": AT_VERY, "very": AT_VERY,
+    "or": OR_NOR, "nor": OR_NOR, "never": NEVER, "so": SO_THIS, "this": SO_THIS,
+    "without": WITHOUT, "doubt": DOUBT, "but": BUT,
+}
+_NEGATE = frozenset(NEGATE)
+
+
+class _RawTokenIds(dict):
+    """Memo of raw token -> token id, filled on first lookup."""
+
+    def __init__(self, scorer):
+        super().__init__()
+        self.scorer = scorer
+
+    def __missing__(self, raw):
+        token_id = self[raw] = self.scorer._raw_token_id(raw)
+        return token_id
+
+
+def _shift(a, k, fill):
+    """a[:, j - k] for every column j, with `fill` where j - k falls outside the row."""
+    out = np.full_like(a, fill)
+    if k > 0:
+        out[:, k:] = a[:, :-k]
+    else:
+        out[:, :k] = a[:, -k:]
+    return out
+
+
+class FastSentimentScorer:
+    """
+    Array-backed re-implementation of VADER's compound score.
+
+    Every distinct token is looked up once and turned into a row of numeric
+    properties (lexicon valence, booster weight, negation, caps, rule words).
+    A batch of texts becomes a padded (texts x tokens) id matrix and VADER's
+    per-word rules (booster/dampener, negation, "no", caps emphasis, special
+    idioms, "least") run as whole-column array operations, in the same order
+    as VADER so the floats are identical. Only the "but" rule, whose
+    list-index quirk depends on exact values, is replayed per text.
+    """
+
+    def __init__(self, analyzer=None):
+        analyzer = analyzer or get_analyzer()
+        self.lexicon = analyzer.lexicon
+        self.emojis = analyzer.emojis
+        # polarity_scores only ever matches emoji keys one character at a time
+        self._emoji_chars = frozenset(e for e in self.emojis if len(e) == 1)
+
+        # Words appearing in multi-word special cases / booster phrases get a
+        # small phrase id so bigrams and trigrams can be looked up in dense tables
+        phrases = [p for p in list(SPECIAL_CASES) + list(BOOSTER_DICT) if " " in p]
+        words = sorted({w for p in phrases for w in p.split()})
+        self._phrase_id = {w: i + 1 for i, w in enumerate(words)}
+        m = len(words) + 1
+        self._m = m
+        self._special2 = np.full(m * m, np.nan)
+        self._special3 = np.full(m * m * m, np.nan)
+        self._booster2 = np.full(m * m, np.nan)
+        for phrase, value in SPECIAL_CASES.items():
+            ids = [self._phrase_id.get(w, 0) for w in phrase.split()]
+            if len(ids) == 2:
+                self._special2[ids[0] * m + ids[1]] = value
+            elif len(ids) == 3:
+                self._special3[(ids[0] * m + ids[1]) * m + ids[2]] = value
+        for phrase, value in BOOSTER_DICT.items():
+            ids = [self._phrase_id.get(w, 0) for w in phrase.split()]
+            if len(ids) == 2:
+                self._booster2[ids[0] * m + ids[1]] = value
+
+        # Token table; row 0 is the padding token and matches no rule.
+        # _raw_ids maps whitespace-split tokens (before punctuation stripping).
+        self._token_ids = {}
+        self._raw_ids = _RawTokenIds(self)
+        self._columns = {name: [0] for name in ("in_lex", "is_boost", "is_neg", "upper", "flags", "phrase")}
+        self._columns["valence"] = [0.0]
+        self._columns["boost"] = [0.0]
+        self._arrays = None
+
+    # ----------------------
+    # Tokens
+    # ----------------------
+    def _token_id(self, token):
+        token_id = self._token_ids.get(token)
+        if token_id is None:
+            token_id = self._add_token(token)
+        return token_id
+
+    def _add_token(self, token):
+        lower = token.lower()
+        columns = self._columns
+        columns["in_lex"].append(lower in self.lexicon)
+        columns["valence"].append(self.lexicon.get(lower, 0.0))
+        columns["is_boost"].append(lower in BOOSTER_DICT)
+        columns["boost"].append(BOOSTER_DICT.get(lower, 0.0))
+        columns["is_neg"].append(lower in _NEGATE or "n't" in lower)
+        columns["upper"].append(token.isupper())
+        columns["flags"].append(WORD_FLAGS.get(lower, 0))
+        columns["phrase"].append(self._phrase_id.get(lower, 0))
+        token_id = len(self._token_ids) + 1
+        self._token_ids[token] = token_id
+        return token_id
+
+    def _token_arrays(self):
+        size = len(self._columns["flags"])
+        if self._arrays is None or len(self._arrays["flags"]) != size:
+            dtypes = {"in_lex": bool, "is_boost": bool, "is_neg": bool, "upper": bool,
+                      "flags": np.int32, "phrase": np.int64, "valence": np.float64, "boost": np.float64}
+            self._arrays = {name: np.asarray(values, dtype=dtypes[name])
+                            for name, values in self._columns.items()}
+        return self._arrays
+
+    def _replace_emojis(self, text):
+        # Same conversion as SentimentIntensityAnalyzer.polarity_scores
+        if text.isascii() or self._emoji_chars.isdisjoint(text):
+            return text
+        out = []
+        prev_space = True
+        for ch in text:
+            if ch in self.emojis:
+                if not prev_space:
+                    out.append(' ')
+                out.append(self.emojis[ch])
+                prev_space = False
+            else:
+                out.append(ch)
+                prev_space = ch == ' '
+        return "".join(out).strip()
+
+    def _raw_token_id(self, raw):
+        # SentiText._strip_punc_if_word: keep short tokens (emoticons) as they are
+        stripped = raw.strip(string.punctuation)
+        return self._token_id(raw if len(stripped) <= 2 else stripped)
+
+    def _tokenize(self, text):
+        return list(map(self._raw_ids.__getitem__, text.split()))
+
+    # ----------------------
+    # Scoring
+    # ----------------------
+    def compound_scores(self, texts, batch_size=BATCH_SIZE):
+        """VADER compound score (rounded to 4 places, like VADER) for every text."""
+        texts = [self._replace_emojis(text) for text in texts]
+        token_ids = [self._tokenize(text) for text in texts]
+        amplifiers = np.array([self._punctuation_emphasis(text) for text in texts], dtype=np.float64)
+
+        # Group similar lengths together to keep padding small
+        order = sorted(range(len(texts)), key=lambda i: len(token_ids[i]))
+        scores = np.zeros(len(texts))
+        for start in range(0, len(order), batch_size):
+            rows = order[start:start + batch_size]
+            scores[rows] = self._score_block([token_ids[i] for i in rows], amplifiers[rows])
+        return [round(float(score), 4) for score in scores]
+
+    def classify(self, texts, batch_size=BATCH_SIZE):
+        """Returns [(label, score), ...] exactly as classify_sentiment would."""
+        return [(sentiment_label(score), round(score, 2))
+                for score in self.compound_scores(texts, batch_size)]
+
+    @staticmethod
+    def _punctuation_emphasis(text):
+        ep_count = min(text.count("!"), 4)
+        qm_count = text.count("?")
+        qm_amplifier = 0
+        if qm_count > 1:
+            qm_amplifier = qm_count * 0.18 if qm_count <= 3 else 0.96
+        return ep_count * 0.292 + qm_amplifier
+
+    def _score_block(self, rows, amplifiers):
+        arrays = self._token_arrays()
+        lengths = np.array([len(ids) for ids in rows])
+        width = max(int(lengths.max()), 1)
+        ids = np.zeros((len(rows), width), dtype=np.int64)
+        for r, row_ids in enumerate(rows):
+            ids[r, :len(row_ids)] = row_ids
+
+        in_lex = arrays["in_lex"][ids]
+        lex = arrays["valence"][ids]
+        upper = arrays["upper"][ids]
+        flags = arrays["flags"][ids]
+        is_boost = arrays["is_boost"][ids]
+        boost = arrays["boost"][ids]
+        is_neg = arrays["is_neg"][ids]
+        phrase = arrays["phrase"][ids]
+        pos = np.arange(width)[None, :]
+
+        def flag(f, k=0):
+            return _shift((flags & f) != 0, k, False) if k else (flags & f) != 0
+
+        n_upper = upper.sum(axis=1)
+        cap_diff = ((n_upper > 0) & (n_upper < lengths))[:, None]
+
+        # Words that are boosters or the "kind" of "kind of" score 0; so do non-lexicon words
+        scored = in_lex & ~is_boost & ~(flag(KIND) & flag(OF, -1))
+
+        v = lex.copy()
+        # "no" before a lexicon word is a negation, not a sentiment word
+        v = np.where(flag(NO) & _shift(in_lex, -1, False), 0.0, v)
+        after_no = flag(NO, 1) | flag(NO, 2) | (flag(NO, 3) & flag(OR_NOR, 1))
+        v = np.where(after_no, lex * N_SCALAR, v)
+        v = np.where(upper & cap_diff, np.where(v > 0, v + C_INCR, v - C_INCR), v)
+
+        for start_i in range(3):
+            k = start_i + 1
+            applies = (pos > start_i) & ~_shift(in_lex, k, True)
+            prev_is_boost = _shift(is_boost, k, False)
+            scalar = np.where(prev_is_boost, _shift(boost, k, 0.0), 0.0)
+            scalar = np.where(prev_is_boost & (v < 0), -scalar, scalar)
+            caps = prev_is_boost & _shift(upper, k, False) & cap_diff
+            scalar = np.where(caps, np.where(v > 0, scalar + C_INCR, scalar - C_INCR), scalar)
+            if start_i == 1:
+                scalar = np.where(scalar != 0, scalar * 0.95, scalar)
+            elif start_i == 2:
+                scalar = np.where(scalar != 0, scalar * 0.9, scalar)
+            v = np.where(applies, v + scalar, v)
+
+            # Negation check
+            if start_i == 0:
+                negate = _shift(is_neg, 1, False)
+                v = np.where(applies & negate, v * N_SCALAR, v)
+            elif start_i == 1:
+                emphasis = flag(NEVER, 2) & flag(SO_THIS, 1)
+                keep = flag(WITHOUT, 2) & flag(DOUBT, 1)
+                negate = ~emphasis & ~keep & _shift(is_neg, 2, False)
+                v = np.where(applies & emphasis, v * 1.25, v)
+                v = np.where(applies & negate, v * N_SCALAR, v)
+            else:
+                emphasis = (flag(NEVER, 3) & flag(SO_THIS, 2)) | flag(SO_THIS, 1)
+                keep = flag(WITHOUT, 3) & (flag(DOUBT, 2) | flag(DOUBT, 1))
+                negate = ~emphasis & ~keep & _shift(is_neg, 3, False)
+                v = np.where(applies & emphasis, v * 1.25, v)
+                v = np.where(applies & negate, v * N_SCALAR, v)
+                v = self._special_idioms(v, applies, phrase)
+
+        # "least" before a lexicon word negates it, unless it is "at least" / "very least"
+        prev_least = flag(LEAST, 1) & ~_shift(in_lex, 1, True)
+        least = prev_least & ((pos == 1) | ((pos > 1) & ~flag(AT_VERY, 2)))
+        v = np.where(least, v * N_SCALAR, v)
+
+        sentiments = np.where(scored, v, 0.0)
+        for r in np.flatnonzero((flag(BUT) & (pos < lengths[:, None])).any(axis=1)):
+            n = lengths[r]
+            but_index = int(np.argmax((flags[r, :n] & BUT) != 0))
+            sentiments[r, :n] = self._but_check(sentiments[r, :n].tolist(), but_index)
+
+        # Sequential row sums, like Python's sum(); + 0.0 drops a possible -0.0
+        sums = np.add.accumulate(sentiments, axis=1)[:, -1] + 0.0
+        sums = np.where(sums > 0, sums + amplifiers, np.where(sums < 0, sums - amplifiers, sums))
+        compound = np.clip(sums / np.sqrt(sums * sums + 15), -1.0, 1.0)
+        return np.where(lengths > 0, compound, 0.0)
+
+    def _special_idioms(self, v, applies, phrase):
+        m = self._m
+        p1, p2, p3 = _shift(phrase, 1, 0), _shift(phrase, 2, 0), _shift(phrase, 3, 0)
+        n1, n2 = _shift(phrase, -1, 0), _shift(phrase, -2, 0)
+
+        # First match among the preceding sequences wins (VADER breaks out of the loop)...
+        value = np.full(v.shape, np.nan)
+        preceding = [
+            self._special2[p1 * m + phrase],                 # onezero
+            self._special3[(p2 * m + p1) * m + phrase],      # twoonezero
+            self._special2[p2 * m + p1],                     # twoone
+            self._special3[(p3 * m + p2) * m + p1],          # threetwoone
+            self._special2[p3 * m + p2],                     # threetwo
+        ]
+        for candidate in reversed(preceding):
+            value = np.where(np.isnan(candidate), value, candidate)
+        # ...then the following sequences override it
+        for candidate in (self._special2[phrase * m + n1], self._special3[(phrase * m + n1) * m + n2]):
+            value = np.where(np.isnan(candidate), value, candidate)
+        v = np.where(applies & ~np.isnan(value), value, v)
+
+        for candidate in (self._booster2[p3 * m + p2], self._booster2[p2 * m + p1]):
+            v = np.where(applies & ~np.isnan(candidate), v + candidate, v)
+        return v
+
+    @staticmethod
+    def _but_check(sentiments, but_index):
+        # Replays SentimentIntensityAnalyzer._but_check, including its use of
+        # list.index(), which rescales the first equal value it finds
+        for sentiment in sentiments:
+            si = sentiments.index(sentiment)
+            if si < but_index:
+                sentiments.pop(si)
+                sentiments.insert(si, sentiment * 0.5)
+            elif si > but_index:
+                sentiments.pop(si)
+                sentiments.insert(si, sentiment * 1.5)
+        return sentiments
+
+
+@lru_cache(maxsize=None)
+def get_fast_scorer():
+    """Build the shared fast scorer (from the custom-lexicon analyzer) on first use."""
+    return FastSentimentScorer()
+
+
+if __name__ == "__main__":
+    scorer = get_fast_scorer()
+    samples = [
+        "The candidate was confident and articulate, but a little unprepared.",
+        "Not impressive. Answers were vague and disorganized!!",
+        "Candidate met minimum technical expectations but did not exceed them.",
+    ]
+    for text, (label, score) in zip(samples, scorer.classify(samples)):
+        print(f"{label:8s} {score:+.2f}  {text}")
@@ -0,0 +1,292 @@
+# utils/instrumentation.py
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+EVENT_LOG_SIZE = 10000   # structured events kept in memory (oldest dropped first)
+
+_NOOP = nullcontext()
+_lock = threading.Lock()
+_local = threading.local()
+_tracing_users = 0
+_started_tracing = False
+
+
+class Collector:
+    """
+    Stage timings, counters and events of one run. `collect()` gives every
+    run its own collector through a ContextVar, so concurrent sessions (e.g.
+    Streamlit threads) neither mix nor clear each other's data.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._counters = {}
+        self._events = deque(maxlen=EVENT_LOG_SIZE)
+
+    def record(self, name, elapsed, peak_bytes=None):
+        with self._lock:
+            entry = self._stages.get(name)
+            if entry is None:
+                entry = self._stages[name] = {"calls": 0, "total_s": 0.0, "max_s": 0.0, "peak_bytes": None}
+            entry["calls"] += 1
+            entry["total_s"] += elapsed
+            entry["max_s"] = max(entry["max_s"], elapsed)
+            if peak_bytes is not None:
+                entry["peak_bytes"] = max(entry["peak_bytes"] or 0, peak_bytes)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def log_event(self, kind, fields):
+        fields["event"] = kind
+        fields["time"] = time.time()
+        self._events.append(fields)
+
+    def events(self, kind=None):
+        return [e for e in list(self._events) if kind is None or e["event"] == kind]
+
+    def clear_events(self):
+        self._events.clear()
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+            self._events.clear()
+
+    def report(self):
+        """Per-stage calls / total / mean / max time (and peak memory), plus counters."""
+        with self._lock:
+            stages = {
+                name: {
+                    "calls": entry["calls"],
+                    "total_s": round(entry["total_s"], 6),
+                    "mean_ms": round(entry["total_s"] / entry["calls"] * 1000, 3),
+                    "max_ms": round(entry["max_s"] * 1000, 3),
+                    "peak_kb": None if entry["peak_bytes"] is None else round(entry["peak_bytes"] / 1024, 1),
+                }
+                for name, entry in sorted(self._stages.items(), key=lambda item: -item[1]["total_s"])
+            }
+            counters = dict(self._counters)
+        return {"stages": stages, "counters": counters}
+
+    def to_json(self, include_events=True, indent=2):
+        data = self.report()
+        if include_events:
+            data["events"] = self.events()
+        return json.dumps(data, indent=indent, default=str)
+
+
+# The run collecting in this context (see `collect`), else the process-wide
+# collector while `enable()` is on
+_current = ContextVar("instrumentation_collector", default=None)
+_process = Collector()
+_enabled = False
+
+
+def _active():
+    collector = _current.get()
+    if collector is None and _enabled:
+        return _process
+    return collector
+
+
+def _start_tracing():
+    global _tracing_users, _started_tracing
+    with _lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _tracing_users += 1
+
+
+def _stop_tracing():
+    global _tracing_users, _started_tracing
+    with _lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+# ----------------------
+# Switches
+# ----------------------
+def enable(trace_memory=False):
+    """
+    Start collecting into the process-wide collector (stage timings, and
+    tracemalloc peaks if `trace_memory`). Runs inside `collect()` keep
+    their own collector.
+    """
+    global _enabled
+    if trace_memory and not _process.trace_memory:
+        _start_tracing()
+    elif _process.trace_memory and not trace_memory:
+        _stop_tracing()
+    _process.trace_memory = trace_memory
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    if _process.trace_memory:
+        _stop_tracing()
+    _process.trace_memory = False
+
+
+@contextmanager
+def collect(trace_memory=False):
+    """
+    Collect into a fresh Collector for the duration of the block, in this
+    context only. Yields the collector; read it with its `report()`,
+    `events()` and `to_json()` after the block.
+    """
+    collector = Collector(trace_memory)
+    token = _current.set(collector)
+    if trace_memory:
+        _start_tracing()
+    try:
+        yield collector
+    finally:
+        if trace_memory:
+            _stop_tracing()
+        _current.reset(token)
+
+
+def is_enabled():
+    return _active() is not None
+
+
+def _target():
+    # Readers fall back to the process-wide collector after disable()
+    return _current.get() or _process
+
+
+def reset():
+    """Forget all timings, counters and events of the current collector."""
+    _target().reset()
+
+
+# ----------------------
+# Timers and counters
+# ----------------------
+class _Stage:
+    __slots__ = ("name", "collector", "start", "mem_start", "child_peak")
+
+    def __init__(self, name, collector):
+        self.name = name
+        self.collector = collector
+
+    def __enter__(self):
+        self.mem_start = None
+        if self.collector.trace_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            stack = _memory_stack()
+            if stack:
+                stack[-1].child_peak = max(stack[-1].child_peak, peak)
+            tracemalloc.reset_peak()
+            self.mem_start = current
+            self.child_peak = 0
+            stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        peak_bytes = None
+        if self.mem_start is not None and tracemalloc.is_tracing():
+            stack = _memory_stack()
+            _, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, self.child_peak)
+            peak_bytes = max(peak - self.mem_start, 0)
+            if stack and stack[-1] is self:
+                stack.pop()
+            # The parent's peak counter was reset on entry; carry ours up to it
+            if stack:
+                stack[-1].child_peak = max(stack[-1].child_peak, peak)
+        self.collector.record(self.name, elapsed, peak_bytes)
+        return False
+
+
+def _memory_stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def stage(name):
+    """Context manager timing one stage; a shared no-op while nothing collects."""
+    collector = _active()
+    return _NOOP if collector is None else _Stage(name, collector)
+
+
+def timed(name):
+    """Decorator form of `stage`; costs one context lookup per call while disabled."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            collector = _active()
+            if collector is None:
+                return func(*args, **kwargs)
+            with _Stage(name, collector):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, n=1):
+    collector = _active()
+    if collector is not None:
+        collector.count(name, n)
+
+
+# ----------------------
+# Structured event log
+# ----------------------
+def log_event(kind, **fields):
+    """Buffer one structured event (bounded by EVENT_LOG_SIZE) while collecting."""
+    collector = _active()
+    if collector is not None:
+        collector.log_event(kind, fields)
+
+
+def events(kind=None):
+    return _target().events(kind)
+
+
+def clear_events():
+    _target().clear_events()
+
+
+# ----------------------
+# Reports
+# ----------------------
+def report():
+    """Per-stage calls / total / mean / max time (and peak memory), plus counters."""
+    return _target().report()
+
+
+def to_json(include_events=True, indent=2):
+    return _target().to_json(include_events, indent)
+
+
+if __name__ == "__main__":
+    enable(trace_memory=True)
+    with stage("demo.outer"):
+        for _ in range(3):
+            with stage("demo.inner"):
+                [str(i) for i in range(100000)]
+    count("demo.items", 3)
+    log_event("demo", message="done")
+    print(to_json())
@@ -1,39 +1,115 @@
 import os
 import sys
+import heapq
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from utils.embedding import compute_similarity
+from utils.embedding import compute_similarity, vectorize_batch, iter_similarity_chunks, top_k_indices
 from utils.preprocess import clean_text
+from utils.document import lower_of
+
+# Expected skills used when a JD does not provide its own list
+DEFAULT_JD_SKILLS = ["Python", "Flask", "APIs", "NLP", "Machine Learning"]
+
+def skill_bonus(cv_text, jd_skills):
+    """0.05 per JD skill found in the CV text (a string or Document)."""
+    cv_lower = lower_of(cv_text)
+    bonus = 0.0
+    for skill in jd_skills:
+        if skill.lower() in cv_lower:
+            bonus += 0.05
+    return bonus
 
 def rule_based_score(similarity, cv_text, jd_skills):
     """
     Enhances similarity score based on skill keyword matches.
     - Adds 0.05 per skill match (up to max 1.0)
     """
-    bonus = 0.0
-    for skill in jd_skills:
-        if skill.lower() in cv_text.lower():
-            bonus += 0.05
-    final_score = min(similarity + bonus, 1.0)
+    final_score = min(similarity + skill_bonus(cv_text, jd_skills), 1.0)
     return final_score
 
-import os
-from utils.preprocess import prepare_document  # make sure this import is correct
+from utils.pdf_extract import ExtractorPool, extract_texts
+from utils.cv_cache import content_key
 
-def read_files_from_folder(folder_path):
-    texts = []
-    filenames = []
-    for filename in os.listdir(folder_path):
-        if filename.lower().endswith((".txt", ".pdf")):
-            path = os.path.join(folder_path, filename)
+def read_files_from_folder(folder_path, workers=None, cache=None):
+    """
+    Read and clean every .txt/.pdf in a folder. PDFs are extracted in
+    parallel across `workers` processes (None = all cores). With a CvCache,
+    files whose bytes were seen before skip extraction and cleaning.
+    """
+    names = [f for f in os.listdir(folder_path) if f.lower().endswith((".txt", ".pdf"))]
+    return _read_files(folder_path, names, workers, cache)
+
+
+def iter_files_from_folder(folder_path, chunk_size=256, workers=None, cache=None):
+    """
+    Streaming version of `read_files_from_folder`: yields (filenames, texts)
+    for consecutive chunks of at most `chunk_size` files, so only one chunk
+    of text is held in memory at a time.
+    """
+    names = []
+    # One set of extraction workers serves every chunk
+    with ExtractorPool(workers) as pool, os.scandir(folder_path) as entries:
+        for entry in entries:
+            if entry.name.lower().endswith((".txt", ".pdf")):
+                names.append(entry.name)
+                if len(names) == chunk_size:
+                    yield _read_files(folder_path, names, workers, cache, pool)
+                    names = []
+        if names:
+            yield _read_files(folder_path, names, workers, cache, pool)
+
+
+def _read_files(folder_path, names, workers, cache, pool=None):
+    clean_texts = {}
+    keys = {}
+    if cache is not None:
+        for filename in names:
             try:
-                text = prepare_document(path)
-                if text.strip():  # skip empty texts
-                    texts.append(text)
-                    filenames.append(filename)
-            except Exception as e:
+                with open(os.path.join(folder_path, filename), "rb") as f:
+                    keys[filename] = content_key(f.read())
+            except OSError as e:
                 print(f"Error reading file {filename}: {e}")
+        cached = cache.get_many(keys.values(), "clean_text")
+        clean_texts = {filename: text for filename, text in zip(keys, cached) if text is not None}
+
+    pdf_names = [f for f in names if f.lower().endswith(".pdf") and f not in clean_texts]
+    pdf_texts, errors = extract_texts([os.path.join(folder_path, f) for f in pdf_names],
+                                      workers=workers, pool=pool)
+    raw_texts = dict(zip(pdf_names, pdf_texts))
+    for i, message in errors.items():
+        print(f"Error reading file {pdf_names[i]}: {message}")
+        del raw_texts[pdf_names[i]]
+
+    texts = []
+    filenames = []
+    stored = {}
+    for filename in names:
+        try:
+            if filename in clean_texts:
+                text = clean_texts[filename]
+            else:
+                if filename in raw_texts:
+                    raw_text = raw_texts[filename]
+                elif filename.lower().endswith(".txt"):
+                    with open(os.path.join(folder_path, filename), "r", encoding="utf-8") as f:
+                        raw_text = f.read()
+                else:
+                    continue
+                text = clean_text(raw_text)
+                if filename in keys:
+                    stored[keys[filename]] = (raw_text, text)
+            if text.strip():  # skip empty texts
+                texts.append(text)
+                filenames.append(filename)
+        except Exception as e:
+            print(f"Error reading file {filename}: {e}")
+    if stored:
+        cache.put_many(stored, raw_text=[raw for raw, _ in stored.values()],
+                       clean_text=[clean for _, clean in stored.values()])
     return filenames, texts
 
 
@@ -50,7 +126,7 @@ def match_cvs_to_jd(cv_folder, jd_path):
     scores = compute_similarity(cv_texts, jd_text)
 
     # Step 2: Define expected skills from JD manually
-    jd_skills = ["Python", "Flask", "APIs", "NLP", "Machine Learning"]
+    jd_skills = DEFAULT_JD_SKILLS
 
     # Step 3: Apply rule-based enhancement
     adjusted_results = []
@@ -62,6 +138,80 @@ def match_cvs_to_jd(cv_folder, jd_path):
     adjusted_results.sort(key=lambda x: x[1], reverse=True)
     return adjusted_results
 
+
+def iter_match_cvs_to_jd(cv_folder, jd_path, chunk_size=256, jd_skills=None,
+                         index=None, workers=None, cache=None):
+    """
+    Stream (cv_filename, score) pairs as each chunk of CVs is scored.
+
+    The JD is vectorized once. Without `index` it uses a stateless hashing
+    vectorizer (TF cosine, no IDF, since IDF would need the whole corpus up
+    front); pass a fitted CvIndex to score with its vocabulary and IDF.
+    Scores include the `rule_based_score` skill bonus.
+    """
+    with open(jd_path, "r", encoding="utf-8") as f:
+        jd_text = clean_text(f.read())
+    jd_skills = DEFAULT_JD_SKILLS if jd_skills is None else jd_skills
+
+    if index is not None:
+        vectorizer = index.vectorizer
+    else:
+        vectorizer = HashingVectorizer(alternate_sign=False, norm="l2")
+    jd_vector = vectorizer.transform([jd_text]).T.tocsc()
+
+    for cv_filenames, cv_texts in iter_files_from_folder(cv_folder, chunk_size, workers, cache):
+        if not cv_texts:
+            continue
+        scores = (vectorizer.transform(cv_texts) @ jd_vector).toarray().ravel()
+        for filename, text, score in zip(cv_filenames, cv_texts, scores):
+            yield filename, rule_based_score(float(score), text, jd_skills)
+
+
+def stream_match_cvs_to_jd(cv_folder, jd_path, top_k=10, chunk_size=256, **kwargs):
+    """
+    Bounded-memory version of `match_cvs_to_jd`: keeps only a top_k heap.
+    Peak memory depends on chunk_size, not on the number of CVs.
+    Returns [(cv_filename, score), ...] best first.
+    """
+    if top_k <= 0:
+        return []
+    heap = []
+    for order, (filename, score) in enumerate(iter_match_cvs_to_jd(cv_folder, jd_path, chunk_size, **kwargs)):
+        # On equal scores the earlier file wins, like the stable sort in match_cvs_to_jd
+        item = (score, -order, filename)
+        if len(heap) < top_k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+    return [(filename, score) for score, _, filename in sorted(heap, reverse=True)]
+
+
+def match_cvs_to_jds(cv_folder, jd_paths, top_k=10, chunk_size=64, jd_skills=None):
+    """
+    Read CVs once and score them against many JDs with a single vectorization.
+    Returns {jd_path: [(cv_filename, score), ...]} holding the top_k CVs per JD,
+    best first, scored like `match_cvs_to_jd`.
+    """
+    cv_filenames, cv_texts = read_files_from_folder(cv_folder)
+    jd_paths = list(jd_paths)
+    jd_texts = []
+    for jd_path in jd_paths:
+        with open(jd_path, "r", encoding="utf-8") as f:
+            jd_texts.append(f.read())
+
+    # The skill list is shared by every JD, so the bonus is computed once per CV
+    jd_skills = DEFAULT_JD_SKILLS if jd_skills is None else jd_skills
+    bonus = np.array([skill_bonus(text, jd_skills) for text in cv_texts])
+
+    jd_matrix, cv_matrix = vectorize_batch(cv_texts, jd_texts)
+    results = {}
+    for start, block in iter_similarity_chunks(jd_matrix, cv_matrix, chunk_size):
+        block = np.minimum(block + bonus, 1.0)
+        for offset, row in enumerate(block):
+            best = top_k_indices(row, top_k)
+            results[jd_paths[start + offset]] = [(cv_filenames[i], float(row[i])) for i in best]
+    return results
+
 # Test run
 if __name__ == "__main__":
     cv_folder = "data/sample_cvs"
@@ -0,0 +1,267 @@
+# utils/pdf_extract.py
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.instrumentation import count, log_event, timed
+
+DEFAULT_MAX_PAGES = 100     # pages read per file; None reads everything
+DEFAULT_TIMEOUT = 60.0      # seconds per file (all of its page ranges together)
+PAGES_PER_TASK = 25         # PDFs longer than this are split into page ranges
+
+
+def _open_pdf(source):
+    """Open a PDF from a path or from raw bytes (e.g. a Streamlit upload)."""
+    try:
+        import pymupdf as fitz
+    except ImportError:
+        import fitz  # PyMuPDF < 1.24
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=bytes(source), filetype="pdf")
+    return fitz.open(source)
+
+
+def _source_name(source, index):
+    return source if isinstance(source, str) else f"file #{index + 1}"
+
+
+def count_pages(source):
+    with _open_pdf(source) as doc:
+        return doc.page_count
+
+
+def _note_truncation(name, n_pages, max_pages):
+    count("pdf_extract.truncated")
+    log_event("pdf_truncated", file=name, pages=n_pages, pages_read=max_pages)
+
+
+def extract_pages(source, start=0, stop=None, timeout=DEFAULT_TIMEOUT, name=None):
+    """
+    Extract text from pages [start, stop) of one PDF.
+    Raises TimeoutError once `timeout` seconds have passed between pages; a
+    single page stuck inside MuPDF is only stopped by `extract_texts`, which
+    kills the worker process. With `name`, reading fewer pages than the
+    file has is logged as a "pdf_truncated" event.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    parts = []
+    with _open_pdf(source) as doc:
+        if name is not None and stop is not None and stop < doc.page_count:
+            _note_truncation(name, doc.page_count, stop)
+        stop = doc.page_count if stop is None else min(stop, doc.page_count)
+        for page_no in range(start, stop):
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"PDF extraction exceeded {timeout}s (stopped at page {page_no + 1})")
+            parts.append(doc[page_no].get_text())
+    return "".join(parts)
+
+
+def extract_text(source, max_pages=DEFAULT_MAX_PAGES, timeout=DEFAULT_TIMEOUT):
+    """
+    Extract the text of a single PDF (path or bytes) in this process, reading
+    at most `max_pages` pages (None = all). The timeout is only checked
+    between pages; use `extract_texts` for a hard limit.
+    """
+    return extract_pages(source, 0, max_pages, timeout, name=_source_name(source, 0))
+
+
+def _plan_tasks(sources, max_pages, pages_per_task):
+    """Split every file into (file index, start page, stop page) tasks."""
+    tasks = []
+    for i, source in enumerate(sources):
+        if not pages_per_task:
+            tasks.append((i, 0, max_pages))
+            continue
+        try:
+            n_pages = count_pages(source)
+        except Exception:
+            # Let the worker raise the real error for this file
+            tasks.append((i, 0, max_pages))
+            continue
+        if max_pages is not None and n_pages > max_pages:
+            _note_truncation(_source_name(source, i), n_pages, max_pages)
+            n_pages = max_pages
+        for start in range(0, max(n_pages, 1), pages_per_task):
+            tasks.append((i, start, min(start + pages_per_task, n_pages)))
+    return tasks
+
+
+@timed("pdf_extract")
+def extract_texts(sources, workers=None, max_pages=DEFAULT_MAX_PAGES,
+                  timeout=DEFAULT_TIMEOUT, pages_per_task=PAGES_PER_TASK, pool=None):
+    """
+    Extract text from many PDFs (paths or bytes), in input order.
+    - workers: process count (None = all cores)
+    - pool: an ExtractorPool to reuse across calls (its size replaces `workers`)
+    - large PDFs are split into ranges of `pages_per_task` pages run in parallel
+    - timeout: one deadline per file, shared by all of its page ranges and
+      started when its first range is handed to a worker. A file that
+      overruns it fails with a timeout, and the workers still busy with it
+      are killed. Without a timeout and with workers=1 everything runs in
+      this process.
+    Returns (texts, errors): a failed file gets "" in texts and its message
+    in errors, keyed by its position in `sources`.
+    """
+    sources = list(sources)
+    texts = [""] * len(sources)
+    errors = {}
+    count("pdf_extract.files", len(sources))
+    if not sources:
+        return texts, errors
+
+    workers = pool.workers if pool is not None else workers or os.cpu_count() or 1
+    if timeout is None and workers == 1:
+        for i, source in enumerate(sources):
+            try:
+                texts[i] = extract_text(source, max_pages, None)
+            except Exception as e:
+                errors[i] = f"{_source_name(source, i)}: {e}"
+        return texts, errors
+
+    tasks = _plan_tasks(sources, max_pages, pages_per_task)
+    parts = {i: {} for i in range(len(sources))}
+    if pool is not None:
+        _run_tasks(sources, tasks, pool, timeout, parts, errors)
+    else:
+        with ExtractorPool(min(workers, len(tasks))) as own_pool:
+            _run_tasks(sources, tasks, own_pool, timeout, parts, errors)
+
+    for i, file_parts in parts.items():
+        if i not in errors:
+            texts[i] = "".join(file_parts[start] for start in sorted(file_parts))
+    return texts, errors
+
+
+def _register_worker(pids):
+    # Runs once in every worker process, so the pool knows whom to kill
+    pids.put(os.getpid())
+
+
+class ExtractorPool:
+    """
+    Worker processes for `extract_texts`, reusable across calls (e.g. the
+    chunks of a stream). They start on first use; when a file times out they
+    are killed and a fresh set is started for the next task.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = None
+        self._pid_queue = None
+        self._pids = set()
+
+    def submit(self, *args):
+        if self._executor is None:
+            self._pid_queue = multiprocessing.SimpleQueue()
+            self._pids = set()
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_register_worker,
+                                                 initargs=(self._pid_queue,))
+        return self._executor.submit(*args)
+
+    def kill(self):
+        """Terminate the workers (running tasks cannot be cancelled) and drop the pool."""
+        if self._executor is None:
+            return
+        while not self._pid_queue.empty():
+            self._pids.add(self._pid_queue.get())
+        for pid in self._pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass   # already gone
+        self.shutdown(cancel_futures=True)
+
+    def shutdown(self, cancel_futures=False):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=cancel_futures)
+            self._executor = None
+            self._pid_queue.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+def _run_tasks(sources, tasks, pool, timeout, parts, errors):
+    """
+    Run (file, start, stop) tasks on an ExtractorPool, filling
+    parts[file][start] and errors. At most `pool.workers` tasks are in
+    flight, so a submitted task starts right away and its file's deadline
+    is real time.
+
+    A worker that dies (e.g. MuPDF crashing) breaks the whole pool and
+    every task in flight with it. Those tasks are retried one at a time on
+    a fresh pool, each file with a fresh deadline; only a file whose task
+    crashes while running alone gets an error.
+    """
+    pending = deque(tasks)
+    suspects = deque()   # tasks in flight when a worker crashed
+    in_flight = {}       # future -> (file index, start, stop)
+    deadlines = {}       # file index -> time.monotonic() deadline
+
+    def submit(task):
+        i, start, stop = task
+        if i in errors:
+            return
+        remaining = None
+        if timeout is not None:
+            deadline = deadlines.setdefault(i, time.monotonic() + timeout)
+            remaining = max(deadline - time.monotonic(), 0.0)
+        in_flight[pool.submit(extract_pages, sources[i], start, stop, remaining)] = task
+
+    while pending or suspects or in_flight:
+        if suspects:
+            if not in_flight:
+                submit(suspects.popleft())
+        else:
+            while pending and len(in_flight) < pool.workers:
+                submit(pending.popleft())
+        if not in_flight:
+            continue
+
+        wait_for = None
+        if timeout is not None:
+            wait_for = max(min(deadlines[i] for i, _, _ in in_flight.values()) - time.monotonic(), 0.0)
+        done, _ = wait(in_flight, timeout=wait_for, return_when=FIRST_COMPLETED)
+        crashed = []
+        for future in done:
+            task = in_flight.pop(future)
+            i, start, _ = task
+            try:
+                parts[i][start] = future.result()
+            except BrokenProcessPool:
+                crashed.append(task)
+            except Exception as e:
+                errors.setdefault(i, f"{_source_name(sources[i], i)}: {e}")
+
+        now = time.monotonic()
+        expired = {i for i, _, _ in in_flight.values() if timeout is not None and deadlines[i] <= now}
+        if not crashed and not expired:
+            continue
+        for i in expired:
+            errors.setdefault(i, f"{_source_name(sources[i], i)}: PDF extraction exceeded {timeout}s")
+        lost = crashed + list(in_flight.values())
+        in_flight.clear()
+        if crashed and len(lost) == 1:
+            i = lost[0][0]
+            errors.setdefault(i, f"{_source_name(sources[i], i)}: PDF extraction worker crashed")
+        elif crashed:
+            for task in lost:
+                if task[0] not in errors:
+                    deadlines.pop(task[0], None)
+                    suspects.append(task)
+        else:
+            # Requeue the other files' unfinished ranges on fresh workers
+            pending.extendleft(reversed([task for task in lost if task[0] not in errors]))
+        if expired:
+            pool.kill()
+        else:
+            pool.shutdown(cancel_futures=True)   # the broken pool's workers are already gone
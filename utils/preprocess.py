@@ -1,20 +1,37 @@
 import re
 import string
-import nltk
-from nltk.corpus import stopwords
-from PyPDF2 import PdfReader 
-# Download stopwords once
-nltk.download('stopwords', quiet=True)
-stop_words = set(stopwords.words('english'))
+import sys
+import os
+from functools import lru_cache
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.instrumentation import timed
+
+@lru_cache(maxsize=None)
+def get_stop_words():
+    """English stopwords; the NLTK corpus is downloaded only if it is missing."""
+    import nltk
+    from nltk.corpus import stopwords
+    try:
+        return frozenset(stopwords.words('english'))
+    except LookupError:
+        nltk.download('stopwords', quiet=True)
+        return frozenset(stopwords.words('english'))
+
+def __getattr__(name):
+    # Former module-level global, now loaded lazily
+    if name == "stop_words":
+        return get_stop_words()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def extract_text_from_pdf(pdf_path):
     """Extract all text from a PDF file."""
-    text = ""
-    with open(pdf_path, "rb") as file:
-        reader = PdfReader(file)
-        for page in reader.pages:
-            text += page.extract_text() or ""
-    return text
+    from utils.pdf_extract import extract_text
+    return extract_text(pdf_path, max_pages=None)
+
+_PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+_DIGITS_RE = re.compile(r'\d+')
+_SPACES_RE = re.compile(r'\s+')
 
 def clean_text(text, remove_stopwords=False):
     """
@@ -24,13 +41,18 @@ def clean_text(text, remove_stopwords=False):
     - Removing numbers & extra spaces
     - Optional stopword removal
     """
-    text = text.lower()
-    text = text.translate(str.maketrans('', '', string.punctuation))
-    text = re.sub(r'\d+', '', text)
-    text = re.sub(r'\s+', ' ', text).strip()
+    return clean_lowered_text(text.lower(), remove_stopwords)
+
+@timed("clean_text")
+def clean_lowered_text(text, remove_stopwords=False):
+    """`clean_text` for text that is already lowercase."""
+    text = text.translate(_PUNCTUATION_TABLE)
+    text = _DIGITS_RE.sub('', text)
+    text = _SPACES_RE.sub(' ', text).strip()
 
     if remove_stopwords:
         words = text.split()
+        stop_words = get_stop_words()
         words = [word for word in words if word not in stop_words]
         text = ' '.join(words)
 
@@ -3,22 +3,36 @@ import os
 import json
 import random
 import math
+import tempfile
+from collections import deque
 import numpy as np
 from typing import List, Tuple
 
+DEFAULT_REWARD_HISTORY = 10000   # rewards kept in memory; None keeps all of them
+
 class SimpleRLAgent:
     """
     Q-table style lightweight agent that indexes states by:
       (sim_bucket, sentiment, degree_match_bool, skill_bucket)
+
+    Only the last `reward_history` rewards are kept; reward_stats() covers
+    every reward seen. Checkpoints are either the JSON format or a binary
+    .npz snapshot plus an append-only update log (see open_update_log).
     """
 
-    def __init__(self, actions: List[str], learning_rate=0.1, discount=0.9, epsilon=0.15):
+    rng = None   # random.Random for exploration (see reseed); None uses the module-level random
+
+    def __init__(self, actions: List[str], learning_rate=0.1, discount=0.9, epsilon=0.15,
+                 reward_history=DEFAULT_REWARD_HISTORY):
         self.actions = actions
         self.lr = learning_rate
         self.gamma = discount
         self.epsilon = epsilon
         self.q_table = {}
-        self.rewards = []
+        self.rewards = deque(maxlen=reward_history)
+        self._reset_reward_stats()
+        self.update_log = None
+        self._log_generation = 0
 
     # ----------------------
     # Helpers
@@ -106,13 +120,18 @@ class SimpleRLAgent:
         key = self._state_key(sim, sentiment, degree_match, skill_pct)
         self._ensure_state(key)
 
-        if random.random() < self.epsilon:
-            return random.choice(self.actions)
+        rng = self.rng or random
+        if rng.random() < self.epsilon:
+            return rng.choice(self.actions)
 
         qvals = self.q_table[key]
         best_action = max(qvals, key=qvals.get)
         return best_action
 
+    def reseed(self, seed=None):
+        """Explore with a private random.Random(seed), leaving the global random untouched."""
+        self.rng = random.Random(seed)
+
     # ----------------------
     # Q update
     # ----------------------
@@ -127,7 +146,57 @@ class SimpleRLAgent:
         new = old + self.lr * (float(reward) - old)
         self.q_table[key][action] = new
 
-        self.rewards.append(float(reward))
+        self._record_rewards([float(reward)])
+        self._log_updates([key], [action], [new], [float(reward)])
+
+    # ----------------------
+    # Reward history
+    # ----------------------
+    def _reset_reward_stats(self):
+        self._reward_count = 0
+        self._reward_mean = 0.0
+        self._reward_m2 = 0.0
+        self._reward_min = math.inf
+        self._reward_max = -math.inf
+
+    def _record_rewards(self, rewards):
+        """Append to the bounded history and fold into the running statistics."""
+        if len(rewards) == 0:
+            return
+        self.rewards.extend(rewards)
+        batch = np.asarray(rewards, dtype=float)
+        n, mean = len(batch), float(batch.mean())
+        m2 = float(((batch - mean) ** 2).sum())
+        # Chan et al. parallel update of count / mean / sum of squared deviations
+        total = self._reward_count + n
+        delta = mean - self._reward_mean
+        self._reward_mean += delta * n / total
+        self._reward_m2 += m2 + delta * delta * self._reward_count * n / total
+        self._reward_count = total
+        self._reward_min = min(self._reward_min, float(batch.min()))
+        self._reward_max = max(self._reward_max, float(batch.max()))
+
+    def reward_stats(self):
+        """Count, mean, std, min and max over every reward seen, not just the retained history."""
+        if not self._reward_count:
+            return {"count": 0, "mean": 0.0, "std": 0.0, "min": None, "max": None}
+        return {
+            "count": self._reward_count,
+            "mean": self._reward_mean,
+            "std": math.sqrt(self._reward_m2 / self._reward_count),
+            "min": self._reward_min,
+            "max": self._reward_max,
+        }
+
+    # ----------------------
+    # Batch API (one call per candidate; DenseRLAgent vectorises these)
+    # ----------------------
+    def choose_actions(self, sims, sentiments, degree_matches, skill_pcts) -> List[str]:
+        return [self.choose_action(*row) for row in zip(sims, sentiments, degree_matches, skill_pcts)]
+
+    def update_batch(self, sims, sentiments, degree_matches, skill_pcts, actions, rewards):
+        for row in zip(sims, sentiments, degree_matches, skill_pcts, actions, rewards):
+            self.update(*row)
 
     # ----------------------
     # Utilities
@@ -144,13 +213,27 @@ class SimpleRLAgent:
     def get_reward_history(self):
         return list(self.rewards)
 
+    def _set_history(self, rewards):
+        self.rewards = deque(maxlen=self.rewards.maxlen)
+        self._reset_reward_stats()
+        self._record_rewards(list(rewards))
+
+    # ----------------------
+    # Checkpoints
+    # ----------------------
     def save_q_table(self, path="models/q_table.json"):
+        """Save as JSON, or as a binary snapshot when `path` ends in .npz."""
+        if path.endswith(".npz"):
+            return self.save_snapshot(path)
         os.makedirs(os.path.dirname(path), exist_ok=True)
         serializable = {json.dumps(k): v for k, v in self.q_table.items()}
         with open(path, "w", encoding="utf-8") as f:
-            json.dump({"q_table": serializable, "rewards": self.rewards}, f, indent=2)
+            json.dump({"q_table": serializable, "rewards": list(self.rewards)}, f, indent=2)
 
     def load_q_table(self, path="models/q_table.json"):
+        """Load a JSON checkpoint, or a .npz snapshot (replaying its update log)."""
+        if path.endswith(".npz"):
+            return self.load_snapshot(path)
         if not os.path.exists(path):
             return False
         with open(path, "r", encoding="utf-8") as f:
@@ -161,5 +244,324 @@ class SimpleRLAgent:
             k = tuple(json.loads(kstr))
             reconstructed[k] = v
         self.q_table = reconstructed
-        self.rewards = data.get("rewards", [])
+        self._set_history(data.get("rewards", []))
         return True
+
+    def save_snapshot(self, path="models/q_table.npz"):
+        """
+        Write the Q-table, reward history and running stats as one .npz file.
+        The file is written to a temporary name and renamed into place, so a
+        crash never leaves a half-written snapshot. An open update log is
+        compacted: the snapshot already holds its updates, so logging restarts
+        in a new log generation.
+        """
+        table = self.q_table
+        keys = list(table)
+        actions = list(self.actions)
+        for qvals in table.values():
+            actions.extend(a for a in qvals if a not in actions)
+        values = np.full((len(keys), len(actions)), np.nan)
+        for i, key in enumerate(keys):
+            for j, action in enumerate(actions):
+                if action in table[key]:
+                    values[i, j] = table[key][action]
+
+        generation = self._log_generation + 1
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    states=np.array([json.dumps(k) for k in keys], dtype=str),
+                    actions=np.array(actions, dtype=str),
+                    values=values,
+                    rewards=np.array(self.rewards, dtype=float),
+                    reward_stats=np.array([self._reward_count, self._reward_mean, self._reward_m2,
+                                           self._reward_min, self._reward_max]),
+                    log_generation=np.array(generation),
+                )
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self._log_generation = generation
+        if self.update_log is not None:
+            self.open_update_log(self.update_log.name, truncate=True)
+
+    def load_snapshot(self, path="models/q_table.npz", log_path=None):
+        """
+        Load a .npz snapshot, then replay the update log at `log_path`
+        (default: alongside the snapshot) if it belongs to this snapshot.
+        """
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as data:
+            actions = data["actions"].tolist()
+            table = {}
+            for kstr, row in zip(data["states"].tolist(), data["values"]):
+                table[tuple(json.loads(kstr))] = {a: float(v) for a, v in zip(actions, row) if not np.isnan(v)}
+            rewards = data["rewards"].tolist()
+            count, mean, m2, lo, hi = data["reward_stats"].tolist()
+            self._log_generation = int(data["log_generation"])
+
+        self.q_table = table
+        self.rewards = deque(rewards, maxlen=self.rewards.maxlen)
+        self._reward_count, self._reward_mean, self._reward_m2 = int(count), mean, m2
+        self._reward_min, self._reward_max = lo, hi
+        self.replay_update_log(log_path or default_log_path(path))
+        return True
+
+    # ----------------------
+    # Append-only update log
+    # ----------------------
+    def open_update_log(self, path="models/q_table.updates.jsonl", truncate=False):
+        """
+        Append every Q update to `path` as one JSON line, so checkpoints between
+        snapshots cost one line per update. The first line records which
+        snapshot generation the log extends.
+        """
+        if self.update_log is not None:
+            self.update_log.close()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        if not truncate and os.path.exists(path) and self._read_log_generation(path) != self._log_generation:
+            truncate = True     # log from another snapshot generation; its updates are not ours
+        self.update_log = open(path, "w" if truncate else "a", encoding="utf-8", buffering=1)
+        if self.update_log.tell() == 0:
+            self.update_log.write(json.dumps({"generation": self._log_generation}) + "\n")
+
+    def close_update_log(self):
+        if self.update_log is not None:
+            self.update_log.close()
+            self.update_log = None
+
+    @staticmethod
+    def _read_log_generation(path):
+        with open(path, "r", encoding="utf-8") as f:
+            header = f.readline()
+        try:
+            return json.loads(header).get("generation")
+        except (ValueError, AttributeError):
+            return None
+
+    def _log_updates(self, keys, actions, values, rewards):
+        if self.update_log is None:
+            return
+        self.update_log.write("".join(
+            json.dumps([list(k), a, v, r]) + "\n" for k, a, v, r in zip(keys, actions, values, rewards)
+        ))
+
+    def _set_q(self, key, action, value):
+        self._ensure_state(key)
+        self.q_table[key][action] = value
+
+    def replay_update_log(self, path):
+        """Re-apply the updates logged since the last snapshot. Returns how many were applied."""
+        if not os.path.exists(path) or self._read_log_generation(path) != self._log_generation:
+            return 0
+        applied = []
+        with open(path, "r", encoding="utf-8") as f:
+            next(f)
+            for line in f:
+                try:
+                    key, action, value, reward = json.loads(line)
+                except ValueError:
+                    break       # torn last line from a crash mid-write
+                self._set_q(tuple(key), action, value)
+                applied.append(reward)
+        self._record_rewards(applied)
+        return len(applied)
+
+
+class DenseRLAgent(SimpleRLAgent):
+    """
+    SimpleRLAgent backed by a dense NumPy Q-table.
+
+    States are enumerated as (sentiment id, sim bucket, degree, skill bucket)
+    cells of a float array with one column per action; sentiment labels get
+    ids as they are first seen. choose_actions / update_batch bucket whole
+    arrays of candidates at once and epsilon-greedy sampling uses a seeded
+    numpy.random.Generator. `q_table` is still available as the usual dict
+    of visited states, so save_q_table / load_q_table keep the JSON format.
+    """
+
+    SIM_BUCKETS = ["low", "medium", "high", "sim_unknown"]
+    SKILL_BUCKETS = ["low", "mid", "high", "skill_unknown"]
+
+    def __init__(self, actions: List[str], learning_rate=0.1, discount=0.9, epsilon=0.15, seed=None,
+                 reward_history=DEFAULT_REWARD_HISTORY):
+        self._sentiment_ids = {}
+        self._q = np.zeros((0, len(self.SIM_BUCKETS), 2, len(self.SKILL_BUCKETS), len(actions)))
+        self._visited = np.zeros(self._q.shape[:-1], dtype=bool)
+        super().__init__(list(actions), learning_rate, discount, epsilon, reward_history)
+        self.rng = np.random.default_rng(seed)
+        for label in ("positive", "neutral", "negative"):
+            self._sentiment_id(label)
+
+    def reseed(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+
+    # ----------------------
+    # State enumeration
+    # ----------------------
+    def _sentiment_id(self, label: str) -> int:
+        if label not in self._sentiment_ids:
+            self._sentiment_ids[label] = len(self._sentiment_ids)
+            grow = np.zeros((1,) + self._q.shape[1:])
+            self._q = np.concatenate([self._q, grow])
+            self._visited = np.concatenate([self._visited, np.zeros((1,) + self._visited.shape[1:], dtype=bool)])
+        return self._sentiment_ids[label]
+
+    def _as_floats(self, values) -> np.ndarray:
+        try:
+            return np.asarray(values, dtype=float)
+        except (TypeError, ValueError):
+            # e.g. None mixed in: treat like the scalar helpers do
+            return np.array([np.nan if self._is_missing_numeric(v) else float(v) for v in values], dtype=float)
+
+    def _cells(self, sims, sentiments, degree_matches, skill_pcts) -> Tuple:
+        """Index arrays (sentiment, sim bucket, degree, skill bucket) for a batch of candidates."""
+        sims = self._as_floats(sims)
+        skills = self._as_floats(skill_pcts)
+        # NaN compares False everywhere, so it falls through to the "unknown" bucket
+        sim_ids = np.select([sims >= 0.6, sims >= 0.2, sims < 0.2], [2, 1, 0], default=3)
+        skill_ids = np.select([skills >= 0.6, skills >= 0.3, skills < 0.3], [2, 1, 0], default=3)
+
+        # Labels repeat a lot, so each distinct string is normalised once
+        label_ids = {}
+        sent_ids = np.empty(len(sims), dtype=np.intp)
+        for i, sentiment in enumerate(sentiments):
+            if isinstance(sentiment, str) and sentiment in label_ids:
+                sent_ids[i] = label_ids[sentiment]
+                continue
+            sent_ids[i] = self._sentiment_id(self._normalize_sentiment_label(sentiment))
+            if isinstance(sentiment, str):
+                label_ids[sentiment] = sent_ids[i]
+
+        deg_ids = np.array([bool(d) for d in degree_matches], dtype=np.intp)
+        return sent_ids, sim_ids, deg_ids, skill_ids
+
+    def _action_ids(self, actions) -> np.ndarray:
+        index = {a: i for i, a in enumerate(self.actions)}
+        try:
+            return np.array([index[a] for a in actions], dtype=np.intp)
+        except KeyError as e:
+            raise ValueError(f"Unknown action: {e.args[0]}")
+
+    # ----------------------
+    # Q-table as a dict (JSON save/load, printing)
+    # ----------------------
+    @property
+    def q_table(self):
+        labels = list(self._sentiment_ids)
+        table = {}
+        for sent, sim, deg, skill in zip(*np.nonzero(self._visited)):
+            key = (self.SIM_BUCKETS[sim], labels[sent], bool(deg), self.SKILL_BUCKETS[skill])
+            table[key] = dict(zip(self.actions, self._q[sent, sim, deg, skill].tolist()))
+        return table
+
+    @q_table.setter
+    def q_table(self, table):
+        self._q[:] = 0.0
+        self._visited[:] = False
+        for (sim, sent, deg, skill), qvals in table.items():
+            for action in qvals:
+                if action not in self.actions:
+                    self.actions.append(action)
+                    self._q = np.concatenate([self._q, np.zeros(self._q.shape[:-1] + (1,))], axis=-1)
+            cell = (self._sentiment_id(sent), self.SIM_BUCKETS.index(sim), int(bool(deg)),
+                    self.SKILL_BUCKETS.index(skill))
+            self._visited[cell] = True
+            for action, value in qvals.items():
+                self._q[cell + (self.actions.index(action),)] = float(value)
+
+    # ----------------------
+    # Policy and updates
+    # ----------------------
+    def choose_actions(self, sims, sentiments, degree_matches, skill_pcts) -> List[str]:
+        cells = self._cells(sims, sentiments, degree_matches, skill_pcts)
+        self._visited[cells] = True
+        n = len(cells[0])
+        explore = self.rng.random(n) < self.epsilon
+        random_ids = self.rng.integers(len(self.actions), size=n)
+        # argmax keeps the first best action, like max() over the action dict
+        best_ids = self._q[cells].argmax(axis=-1)
+        return [self.actions[i] for i in np.where(explore, random_ids, best_ids)]
+
+    def update_batch(self, sims, sentiments, degree_matches, skill_pcts, actions, rewards):
+        """
+        Same result as calling update() for each row in order. Rows are
+        grouped by (state, action) cell; the k-th update of every cell is
+        applied in one vectorised step, so the loop runs once per repeat
+        of the busiest cell rather than once per row.
+        """
+        cells = self._cells(sims, sentiments, degree_matches, skill_pcts)
+        action_ids = self._action_ids(actions)
+        rewards = np.asarray(rewards, dtype=float)
+        self._visited[cells] = True
+
+        if len(action_ids):
+            flat = np.ravel_multi_index(cells + (action_ids,), self._q.shape)
+            order = np.argsort(flat, kind="stable")
+            sorted_flat = flat[order]
+            starts = np.r_[0, np.flatnonzero(np.diff(sorted_flat)) + 1]
+            counts = np.diff(np.r_[starts, len(flat)])
+
+            q = self._q.reshape(-1)
+            new_values = np.empty(len(flat))
+            for k in range(int(counts.max())):
+                live = starts[counts > k] + k       # k-th row of every cell that has one
+                target = sorted_flat[live]
+                old = q[target]
+                q[target] = new_values[order[live]] = old + self.lr * (rewards[order[live]] - old)
+
+            if self.update_log is not None:
+                labels = list(self._sentiment_ids)
+                keys = [(self.SIM_BUCKETS[sim], labels[sent], bool(deg), self.SKILL_BUCKETS[skill])
+                        for sent, sim, deg, skill in zip(*cells)]
+                self._log_updates(keys, list(actions), new_values.tolist(), rewards.tolist())
+        self._record_rewards(rewards.tolist())
+
+    def choose_action(self, sim: float, sentiment, degree_match: bool, skill_pct: float) -> str:
+        return self.choose_actions([sim], [sentiment], [degree_match], [skill_pct])[0]
+
+    def update(self, sim: float, sentiment, degree_match: bool, skill_pct: float, action: str, reward: float):
+        self.update_batch([sim], [sentiment], [degree_match], [skill_pct], [action], [reward])
+
+    def _set_q(self, key, action, value):
+        sim, sent, deg, skill = key
+        cell = (self._sentiment_id(sent), self.SIM_BUCKETS.index(sim), int(bool(deg)),
+                self.SKILL_BUCKETS.index(skill))
+        self._visited[cell] = True
+        self._q[cell + (self._action_ids([action])[0],)] = value
+
+    def get_q_values(self, sim: float, sentiment, degree_match: bool, skill_pct: float):
+        cell = tuple(ids[0] for ids in self._cells([sim], [sentiment], [degree_match], [skill_pct]))
+        return dict(zip(self.actions, self._q[cell].tolist()))
+
+
+def default_log_path(snapshot_path):
+    """models/q_table.npz -> models/q_table.updates.jsonl"""
+    return os.path.splitext(snapshot_path)[0] + ".updates.jsonl"
+
+
+# Seed experience the Streamlit app gives a fresh agent before scoring
+DEFAULT_ACTIONS = ["Hire", "Reject", "Reassign"]
+DEFAULT_TRAINING_DATA = [
+    (0.85, "Positive", 1, 1, "Hire", 10),
+    (0.20, "Negative", 0, 0, "Reject", 9),
+    (0.60, "Neutral", 1, 0, "Reassign", 6),
+]
+
+def build_trained_agent(actions=None, training_data=None):
+    """New SimpleRLAgent updated once with each (sim, sentiment, degree, skill, action, reward) row."""
+    agent = SimpleRLAgent(list(DEFAULT_ACTIONS if actions is None else actions))
+    for sim, sent, deg, skill, act, rew in (DEFAULT_TRAINING_DATA if training_data is None else training_data):
+        agent.update(sim, sent, deg, skill, act, rew)
+    return agent
@@ -1,10 +1,16 @@
 # utils/sentiment.py
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
 
-# Initialize VADER sentiment analyzer
-analyzer = SentimentIntensityAnalyzer()
-analyzer.lexicon.update({
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.instrumentation import count, timed
+
+# HR-specific terms added on top of the VADER lexicon
+CUSTOM_LEXICON = {
     "poor": -2.0, "weak": -1.8, "unprepared": -2.0,
     "disorganized": -1.7, "hesitant": -1.5, "lacked": -1.5,
     "confusing": -1.6, "vague": -1.4, "defensive": -1.5,
@@ -13,37 +19,136 @@ analyzer.lexicon.update({
     "prepared": 1.6, "engaging": 1.8, "insightful": 1.9,
     "impressive": 2.0, "strong": 1.5, "excellent": 2.2,
     "clear": 1.6, "thoughtful": 1.7, "professional": 1.5
-})
+}
+
+@lru_cache(maxsize=None)
+def get_analyzer():
+    """Build the VADER analyzer (with the custom lexicon) on first use."""
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    analyzer = SentimentIntensityAnalyzer()
+    analyzer.lexicon.update(CUSTOM_LEXICON)
+    return analyzer
+
+def __getattr__(name):
+    # Former module-level global, now built lazily
+    if name == "analyzer":
+        return get_analyzer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
+@timed("classify_sentiment")
 def classify_sentiment(text):
     """
     Classify sentiment using VADER.
     Returns: (label, score)
     """
-    score = analyzer.polarity_scores(text)['compound']
+    score = get_analyzer().polarity_scores(text)['compound']
+    return sentiment_label(score), round(score, 2)
+
+def sentiment_label(score):
+    """Map a VADER compound score to Positive / Negative / Neutral."""
     if score >= 0.4:
-        label = "Positive"
-    elif score <= -0.2:
-        label = "Negative"
-    else:
-        label = "Neutral"
-    return label, round(score, 2)
+        return "Positive"
+    if score <= -0.2:
+        return "Negative"
+    return "Neutral"
 
-def process_feedbacks(feedback_file="data/feedbacks.txt"):
+# ----------------------
+# Batched scoring
+# ----------------------
+MEMO_SIZE = 100_000          # (label, score) results kept across calls
+PARALLEL_MIN_TEXTS = 2000    # fewer unseen texts than this are scored in-process
+POOL_CHUNK_SIZE = 500
+
+_memo = OrderedDict()
+
+def normalize_feedback(text):
     """
-    Reads feedbacks from file, returns a list of (feedback, label, score).
+    Collapse whitespace runs and trim. VADER tokenises on whitespace, so the
+    normalised text always gets the same score as the original.
+    """
+    return " ".join(text.split())
+
+def _classify_chunk(texts, engine="vader"):
+    # Runs in a worker process; the analyzer / scorer is built once per worker
+    if engine == "fast":
+        from utils.fast_sentiment import get_fast_scorer
+        return get_fast_scorer().classify(texts)
+    return [classify_sentiment(text) for text in texts]
+
+def _score_unseen(texts, workers, engine):
+    if workers == 1 or len(texts) < PARALLEL_MIN_TEXTS:
+        return _classify_chunk(texts, engine)
+    chunks = [texts[i:i + POOL_CHUNK_SIZE] for i in range(0, len(texts), POOL_CHUNK_SIZE)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        results = pool.map(_classify_chunk, chunks, [engine] * len(chunks))
+        return [result for chunk in results for result in chunk]
+
+@timed("classify_sentiments")
+def classify_sentiments(texts, workers=None, engine="vader"):
+    """
+    Classify many feedbacks at once. Returns [(label, score), ...] in input order,
+    identical to calling classify_sentiment on each text.
+    - texts are normalised and deduplicated, so repeated templates are scored once
+    - results are kept in a bounded LRU memo (MEMO_SIZE entries) across calls
+    - large batches of unseen texts are split over `workers` processes
+      (None = all cores, 1 = always in this process)
+    - engine="fast" scores with the array-backed FastSentimentScorer
+      (utils/fast_sentiment.py), which gives the same results much faster
+    """
+    if engine not in ("vader", "fast"):
+        raise ValueError(f"Unknown sentiment engine: {engine}")
+    keys = [normalize_feedback(text) for text in texts]
+    found = {}
+    unseen = []
+    for key in keys:
+        if key in found:
+            continue
+        if key in _memo:
+            _memo.move_to_end(key)
+            found[key] = _memo[key]
+        else:
+            found[key] = None
+            unseen.append(key)
+    count("sentiment.texts", len(keys))
+    count("sentiment.scored", len(unseen))
+
+    if unseen:
+        workers = workers or os.cpu_count() or 1
+        for key, result in zip(unseen, _score_unseen(unseen, workers, engine)):
+            found[key] = result
+            _memo[key] = result
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+
+    return [found[key] for key in keys]
+
+def clear_sentiment_memo():
+    _memo.clear()
+
+def iter_feedback_sentiments(feedback_file="data/feedbacks.txt", batch_size=5000, workers=None,
+                             engine="vader"):
+    """
+    Stream (feedback, label, score) from a feedback file, one line per feedback.
+    Only `batch_size` lines are held in memory at a time.
     """
     if not os.path.exists(feedback_file):
         raise FileNotFoundError(f"Feedback file not found: {feedback_file}")
 
-    results = []
     with open(feedback_file, "r", encoding="utf-8") as f:
-        for line in f:
-            feedback = line.strip()
-            if feedback:
-                label, score = classify_sentiment(feedback)
-                results.append((feedback, label, score))
-    return results
+        feedbacks = (line.strip() for line in f)
+        feedbacks = (feedback for feedback in feedbacks if feedback)
+        while True:
+            batch = list(islice(feedbacks, batch_size))
+            if not batch:
+                break
+            for feedback, (label, score) in zip(batch, classify_sentiments(batch, workers, engine)):
+                yield feedback, label, score
+
+def process_feedbacks(feedback_file="data/feedbacks.txt"):
+    """
+    Reads feedbacks from file, returns a list of (feedback, label, score).
+    """
+    return list(iter_feedback_sentiments(feedback_file))
 
 if __name__ == "__main__":
     feedback_results = process_feedbacks()
@@ -0,0 +1,434 @@
+# utils/service.py
+"""
+Local scoring service that keeps the models warm between requests.
+
+    python -m utils.service --port 8765 --cv-folder data/sample_cvs
+
+spaCy, VADER, the TF-IDF CV index and a trained SimpleRLAgent are loaded
+once at startup. All endpoints take and return JSON (POST unless noted):
+
+    /parse       {"cv": text}                              -> parsed fields
+    /sentiment   {"feedbacks": [text, ...]}                -> [[label, score], ...]
+    /similarity  {"cvs": [text, ...], "jd": text}          -> compute_similarity scores
+    /match       {"jd": text, "top_k": 10}                 -> best CVs in the warm index
+                                                              (sparse CvIndex or dense LsaIndex)
+    /score       {"cvs": [...], "jd": text, "feedbacks": [...],
+                  "similarity_threshold": 0.5, "skill_match_threshold": 0.2}
+                                                           -> make_decision records
+    /index/add   {"cvs": {cv_id: text, ...}}               -> index size, ids added / replaced
+    GET /health, GET /stats
+
+Concurrent requests to the same endpoint are grouped into micro-batches
+(up to MAX_BATCH requests, waiting at most MAX_WAIT_MS for a batch to fill)
+so /parse, /sentiment and /match use the batch code paths; if a batch
+fails, its requests are retried one by one so a bad request only fails
+itself. Each endpoint
+has a bounded queue; when it is full the request gets 503 and a
+Retry-After header instead of piling up. Model work runs on one worker
+thread, so the event loop stays responsive and no model is used by two
+threads at once.
+"""
+import argparse
+import asyncio
+import copy
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.decision import decision_records, make_decision_columnar
+from utils.embedding import CvIndex, LsaIndex, compute_similarity
+from utils.rl_agent import build_trained_agent
+from utils.sentiment import classify_sentiments, get_analyzer
+from utils.universal_parser import FEATURE_FIELDS, get_nlp, parse_cv_texts
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BATCH = 64            # requests per micro-batch
+MAX_WAIT_MS = 5           # how long a batch may wait to fill up
+QUEUE_SIZE = 256          # pending requests per endpoint before 503
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class QueueFull(Exception):
+    pass
+
+
+class NoIndex(Exception):
+    pass
+
+
+class MicroBatcher:
+    """
+    Collects concurrent requests for one endpoint and runs them as a batch.
+    `handler(items)` runs on the model thread and returns one result per item
+    (an Exception result fails only that request). If the handler raises,
+    each item of the batch is run alone so only the failing ones get the error.
+    """
+
+    def __init__(self, name, handler, executor, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS,
+                 queue_size=QUEUE_SIZE):
+        self.name = name
+        self.handler = handler
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.requests = 0
+        self.batches = 0
+        self.rejected = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop batching and cancel the requests still queued."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        while not self.queue.empty():
+            _, future = self.queue.get_nowait()
+            future.cancel()
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((item, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFull(self.name)
+        self.requests += 1
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            items = [item for item, _ in batch]
+            self.batches += 1
+            try:
+                results = await loop.run_in_executor(self.executor, self.handler, items)
+            except Exception as e:
+                if len(items) == 1:
+                    results = [e]
+                else:
+                    results = await loop.run_in_executor(self.executor, self._run_each, items)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+
+    def _run_each(self, items):
+        results = []
+        for item in items:
+            try:
+                results.extend(self.handler([item]))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "queued": self.queue.qsize(),
+            "rejected": self.rejected,
+        }
+
+
+class ScoringService:
+    """Warm models plus one MicroBatcher per endpoint."""
+
+    def __init__(self, index=None, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS, queue_size=QUEUE_SIZE):
+        self.index = index
+        self.agent = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="models")
+        self.started = time.time()
+        handlers = {
+            "/parse": self._parse_batch,
+            "/sentiment": self._sentiment_batch,
+            "/similarity": self._similarity_batch,
+            "/match": self._match_batch,
+            "/score": self._score_batch,
+            "/index/add": self._index_add_batch,
+        }
+        self.batchers = {
+            path: MicroBatcher(path, handler, self.executor, max_batch, max_wait_ms, queue_size)
+            for path, handler in handlers.items()
+        }
+
+    def warm_up(self):
+        """Load every model now so the first request does not pay for it."""
+        get_nlp()
+        get_analyzer()
+        self.agent = build_trained_agent()
+        parse_cv_texts(["Python developer, bachelor degree, 3 years of experience"])
+        classify_sentiments(["warm up"])
+
+    # ----------------------
+    # Batch handlers (model thread)
+    # ----------------------
+    def _parse_batch(self, items):
+        texts = [item["cv"] for item in items]
+        return [{field: cv[field] for field in FEATURE_FIELDS} for cv in parse_cv_texts(texts)]
+
+    def _sentiment_batch(self, items):
+        flat = [text for item in items for text in item["feedbacks"]]
+        results = iter(classify_sentiments(flat))
+        return [[list(next(results)) for _ in item["feedbacks"]] for item in items]
+
+    def _similarity_batch(self, items):
+        # Each request keeps its own TF-IDF fit, so scores match compute_similarity exactly
+        return [compute_similarity(item["cvs"], item["jd"]).tolist() for item in items]
+
+    def _match_batch(self, items):
+        if self.index is None:
+            return [NoIndex("no CV index loaded; start with --cv-folder or --index")] * len(items)
+        top_k = max(item["top_k"] for item in items)
+        ranked = self.index.query_many([item["jd"] for item in items], top_k=top_k)
+        results = []
+        for item, (idx, scores) in zip(items, ranked):
+            k = item["top_k"]
+            results.append([{"cv_id": self.index.cv_ids[i], "score": float(s)}
+                            for i, s in zip(idx[:k], scores[:k])])
+        return results
+
+    def _score_batch(self, items):
+        results = []
+        for item in items:
+            try:
+                # A private RNG per request: the process-wide random is never reseeded
+                agent = copy.deepcopy(self.agent)
+                agent.reseed(item.get("seed"))
+                table = make_decision_columnar(
+                    item["cvs"], item["jd"], item["feedbacks"], agent,
+                    item.get("similarity_threshold", 0.5), item.get("skill_match_threshold", 0.2)
+                )
+                results.append(decision_records(table))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _index_add_batch(self, items):
+        # Existing ids are replaced, like CvIndex.add / LsaIndex.add_many
+        indexed = set() if self.index is None else {cv_id for item in items for cv_id in item["cvs"]
+                                                     if cv_id in self.index}
+        cvs = {}
+        for item in items:
+            cvs.update(item["cvs"])
+        if self.index is None:
+            self.index = CvIndex().fit(list(cvs), list(cvs.values()))
+        else:
+            self.index.add_many(list(cvs), list(cvs.values()))
+        results = []
+        for item in items:
+            replaced = sum(cv_id in indexed for cv_id in item["cvs"])
+            results.append({"indexed": len(self.index), "added": len(item["cvs"]) - replaced,
+                            "replaced": replaced})
+        return results
+
+    # ----------------------
+    # Request validation
+    # ----------------------
+    @staticmethod
+    def _validate(path, payload):
+        if not isinstance(payload, dict):
+            raise ValueError("request body must be a JSON object")
+
+        def require(field, kind):
+            if not isinstance(payload.get(field), kind):
+                raise ValueError(f"'{field}' must be a {kind.__name__}")
+
+        def require_texts(field):
+            require(field, list)
+            if not all(isinstance(text, str) for text in payload[field]):
+                raise ValueError(f"'{field}' must be a list of strings")
+
+        def optional(field, kinds, description):
+            value = payload.get(field)
+            if value is not None and (isinstance(value, bool) or not isinstance(value, kinds)):
+                raise ValueError(f"'{field}' must be {description}")
+
+        if path == "/parse":
+            require("cv", str)
+        elif path == "/sentiment":
+            require_texts("feedbacks")
+        elif path == "/similarity":
+            require_texts("cvs")
+            require("jd", str)
+        elif path == "/match":
+            require("jd", str)
+            top_k = payload.setdefault("top_k", 10)
+            if isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1:
+                raise ValueError("'top_k' must be a positive integer")
+        elif path == "/score":
+            require_texts("cvs")
+            require("jd", str)
+            require_texts("feedbacks")
+            if len(payload["feedbacks"]) < len(payload["cvs"]):
+                raise ValueError("need one feedback per CV")
+            optional("similarity_threshold", (int, float), "a number")
+            optional("skill_match_threshold", (int, float), "a number")
+            optional("seed", int, "an integer")
+        elif path == "/index/add":
+            require("cvs", dict)
+            if not all(isinstance(text, str) for text in payload["cvs"].values()):
+                raise ValueError("'cvs' must map CV ids to strings")
+        return payload
+
+    async def dispatch(self, method, path, body):
+        """Returns (status, JSON-serialisable payload, extra headers)."""
+        if path == "/health" and method == "GET":
+            return 200, {"status": "ok", "uptime_s": round(time.time() - self.started, 1)}, {}
+        if path == "/stats" and method == "GET":
+            return 200, {
+                "endpoints": {p: b.stats() for p, b in self.batchers.items()},
+                "indexed_cvs": len(self.index) if self.index is not None else 0,
+            }, {}
+        batcher = self.batchers.get(path)
+        if batcher is None:
+            return 404, {"error": f"unknown endpoint {path}"}, {}
+        if method != "POST":
+            return 405, {"error": "use POST"}, {}
+        try:
+            payload = self._validate(path, json.loads(body or b"{}"))
+        except (ValueError, TypeError, AttributeError) as e:
+            return 400, {"error": str(e)}, {}
+        try:
+            return 200, await batcher.submit(payload), {}
+        except QueueFull:
+            return 503, {"error": f"{path} queue is full, retry later"}, {"Retry-After": "1"}
+        except NoIndex as e:
+            return 503, {"error": str(e)}, {}
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}, {}
+
+    # ----------------------
+    # HTTP
+    # ----------------------
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "malformed request line"}, {}, False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {"error": "invalid Content-Length"}, {}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "request body too large"}, {}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                status, payload, extra = await self.dispatch(method.upper(), target.split("?", 1)[0], body)
+                await self._respond(writer, status, payload, extra, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, payload, extra_headers, keep_alive):
+        body = json.dumps(payload, default=float).encode("utf-8")
+        lines = [
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ] + [f"{name}: {value}" for name, value in extra_headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        for batcher in self.batchers.values():
+            batcher.start()
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Scoring service listening on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for batcher in self.batchers.values():
+                await batcher.stop()
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def load_index(index_path=None, cv_folder=None):
+    if index_path:
+        if os.path.exists(os.path.join(index_path, LsaIndex.META_FILE)):
+            return LsaIndex.load(index_path)
+        return CvIndex.load(index_path)
+    if cv_folder:
+        from utils.matcher import read_files_from_folder
+        filenames, texts = read_files_from_folder(cv_folder)
+        return CvIndex().fit(filenames, texts)
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm-model local scoring service.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--index", help="CvIndex or LsaIndex directory to load for /match")
+    parser.add_argument("--cv-folder", help="folder of CVs to index for /match")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    args = parser.parse_args(argv)
+
+    service = ScoringService(load_index(args.index, args.cv_folder), args.max_batch,
+                             args.max_wait_ms, args.queue_size)
+    start = time.perf_counter()
+    service.warm_up()
+    print(f"Models warmed up in {time.perf_counter() - start:.1f}s")
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
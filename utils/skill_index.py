@@ -0,0 +1,192 @@
+# utils/skill_index.py
+import json
+import os
+import sys
+import tempfile
+from collections import Counter, defaultdict
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.embedding import compute_similarity
+from utils.universal_parser import extract_requirements, parse_cv_texts
+
+DEFAULT_INDEX_PATH = "models/skill_index.json"
+
+
+def normalize_skill(skill):
+    return " ".join(skill.lower().split())
+
+
+class SkillIndex:
+    """
+    Inverted index from normalised skills and degree codes to CV ids.
+
+    Features are the "skills" / "degree" fields produced by `parse_cv_text`
+    (or `CvFeatureExtractor`). CVs can be added, replaced and removed as they
+    arrive; the index is saved as one JSON file listing each CV's id and
+    features (so int ids stay ints) and the posting lists are rebuilt on load.
+    """
+
+    def __init__(self):
+        self.skills = defaultdict(set)    # skill -> {cv_id}
+        self.degrees = defaultdict(set)   # degree code -> {cv_id}
+        self.features = {}                # cv_id -> {"degree": str, "skills": [str]}
+
+    # ----------------------
+    # Updating
+    # ----------------------
+    def add(self, cv_id, features):
+        """Index one CV from its parsed features; replaces an existing id."""
+        if cv_id in self.features:
+            self.remove(cv_id)
+        skills = sorted({normalize_skill(s) for s in features["skills"]})
+        degree = features["degree"]
+        self.features[cv_id] = {"degree": degree, "skills": skills}
+        self.degrees[degree].add(cv_id)
+        for skill in skills:
+            self.skills[skill].add(cv_id)
+
+    def add_many(self, cv_ids, features):
+        cv_ids = list(cv_ids)
+        features = list(features)
+        if len(cv_ids) != len(features):
+            raise ValueError("cv_ids and features must have the same length")
+        for cv_id, feats in zip(cv_ids, features):
+            self.add(cv_id, feats)
+
+    def add_texts(self, cv_ids, cv_texts):
+        """Parse CV texts (strings or Documents) in one batch and index them."""
+        self.add_many(cv_ids, parse_cv_texts(cv_texts))
+
+    def remove(self, cv_id):
+        """Drop one CV. Raises KeyError if it is not indexed."""
+        if cv_id not in self.features:
+            raise KeyError(f"CV id not in index: {cv_id}")
+        feats = self.features.pop(cv_id)
+        self._discard(self.degrees, feats["degree"], cv_id)
+        for skill in feats["skills"]:
+            self._discard(self.skills, skill, cv_id)
+
+    @staticmethod
+    def _discard(postings, key, cv_id):
+        ids = postings[key]
+        ids.discard(cv_id)
+        if not ids:
+            del postings[key]
+
+    # ----------------------
+    # Retrieval
+    # ----------------------
+    def overlaps(self, skills):
+        """{cv_id: number of `skills` the CV has}, for CVs sharing at least one."""
+        counts = Counter()
+        for skill in {normalize_skill(s) for s in skills}:
+            counts.update(self.skills.get(skill, ()))
+        return counts
+
+    def candidates(self, skills, degrees=None, min_overlap=1):
+        """
+        Ids of CVs having at least `min_overlap` of `skills` (and, if `degrees`
+        is given and not ["ANY"], one of those degree codes), in the order
+        they were indexed. min_overlap <= 0 disables the skill condition.
+        """
+        if min_overlap > 0:
+            ids = {cv_id for cv_id, n in self.overlaps(skills).items() if n >= min_overlap}
+        else:
+            ids = set(self.features)
+        if degrees and "ANY" not in degrees:
+            allowed = set().union(*(self.degrees.get(d, set()) for d in degrees))
+            ids &= allowed
+        return [cv_id for cv_id in self.features if cv_id in ids]
+
+    def candidates_for(self, jd_req, min_overlap=1, require_degree=False, skill_match_threshold=None):
+        """
+        `candidates` for the output of `extract_requirements`. With
+        `skill_match_threshold`, min_overlap is derived from it (see
+        `min_overlap_for`).
+        """
+        if skill_match_threshold is not None:
+            min_overlap = min_overlap_for(skill_match_threshold, len(jd_req["skills"]))
+        degrees = jd_req["degrees"] if require_degree else None
+        return self.candidates(jd_req["skills"], degrees, min_overlap)
+
+    # ----------------------
+    # Persistence
+    # ----------------------
+    def save(self, path=DEFAULT_INDEX_PATH):
+        """Write the index atomically (temp file + rename)."""
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"cvs": [{"id": cv_id, **feats} for cv_id, feats in self.features.items()]}, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Skill index not found: {path}")
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        index = cls()
+        for entry in data["cvs"]:
+            index.add(entry["id"], entry)
+        return index
+
+    def __len__(self):
+        return len(self.features)
+
+    def __contains__(self, cv_id):
+        return cv_id in self.features
+
+
+def min_overlap_for(skill_match_threshold, n_required):
+    """
+    Fewest matched skills that pass `make_decision`'s skill filter
+    (matched / n_required >= skill_match_threshold). Uses the filter's own
+    division instead of ceil(threshold * n), which float error can push one
+    too high (0.28 * 25 = 7.000000000000001). n_required + 1 when no CV can pass.
+    """
+    if n_required == 0:
+        return 0 if skill_match_threshold <= 0 else 1
+    return next((k for k in range(n_required + 1) if k / n_required >= skill_match_threshold),
+                n_required + 1)
+
+
+def shortlist_match(jd_text, skill_index, cv_texts, min_overlap=1, require_degree=False,
+                    top_k=None, jd_req=None, skill_match_threshold=None):
+    """
+    Two-stage matching: retrieve CVs sharing at least `min_overlap` of the
+    JD's required skills from `skill_index`, then run `compute_similarity`
+    on that shortlist only. `cv_texts` maps cv_id -> text (or Document).
+    Returns [(cv_id, score), ...] best first (ties keep index order).
+
+    Scores are TF-IDF over the shortlist, so they differ slightly from
+    scoring the full pool. Pass `skill_match_threshold` instead of
+    min_overlap to keep exactly the CVs `make_decision`'s skill filter
+    would pass.
+    """
+    jd_req = jd_req or extract_requirements(jd_text)
+    shortlist = skill_index.candidates_for(jd_req, min_overlap, require_degree, skill_match_threshold)
+    if not shortlist:
+        return []
+    scores = compute_similarity([cv_texts[cv_id] for cv_id in shortlist], jd_text)
+    ranked = sorted(zip(shortlist, scores.tolist()), key=lambda item: -item[1])
+    return ranked if top_k is None else ranked[:top_k]
+
+
+# Sample usage
+if __name__ == "__main__":
+    cvs = {
+        "alice": "Python developer with Django, SQL and machine learning. Master of Science.",
+        "bob": "Marketing specialist: SEO, social media and content creation. Bachelor degree.",
+        "carol": "Accountant experienced in auditing and financial analysis.",
+    }
+    index = SkillIndex()
+    index.add_texts(list(cvs), list(cvs.values()))
+    jd = "Looking for a Python engineer with SQL and Django experience, bachelor or master degree."
+    print(index.candidates(["python", "sql", "django"], min_overlap=2))
+    print(shortlist_match(jd, index, cvs))
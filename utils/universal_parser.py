@@ -1,11 +1,35 @@
 # universal_parser.py
 import re
-import spacy
-from rapidfuzz import fuzz
+import numpy as np
+from rapidfuzz import fuzz, process
 from collections import defaultdict
+from functools import lru_cache
+import sys
+import os
 
-nlp = spacy.load("en_core_web_sm")
-STOPWORDS = spacy.lang.en.stop_words.STOP_WORDS
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.document import Document, lower_of, text_of
+from utils.instrumentation import timed
+
+# extract_keywords only needs noun_chunks, which come from the tagger,
+# attribute_ruler (POS tags) and parser; NER and the lemmatizer are skipped.
+SPACY_MODEL = "en_core_web_sm"
+SPACY_EXCLUDE = ["ner", "lemmatizer"]
+
+@lru_cache(maxsize=None)
+def get_nlp():
+    """Load the spaCy pipeline on first use and reuse it afterwards."""
+    import spacy
+    return spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+
+def __getattr__(name):
+    # Former module-level globals, now loaded lazily
+    if name == "nlp":
+        return get_nlp()
+    if name == "STOPWORDS":
+        from spacy.lang.en.stop_words import STOP_WORDS
+        return STOP_WORDS
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 DEGREE_MAP = {
     "bachelor": "BTECH",
@@ -82,8 +106,189 @@ def extract_experience(text):
         return max(int(x) for x in matches)
     return 0
 
+def _trie_pattern(words):
+    """
+    Regex matching any of `words`, built from a character trie so shared
+    prefixes are tested once. Longer words are preferred at each position.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+class CvFeatureExtractor:
+    """
+    Compiled extractor that returns domain, degree, skills and experience
+    from a single lowercase copy of the text.
+
+    Every vocabulary term is folded into one overlapping-match regex, so one
+    scan finds all terms present verbatim. A verbatim hit scores 100 with
+    `fuzz.partial_ratio`, so only the remaining terms need the fuzzy
+    fallback, and results match `detect_domain`, `extract_degree`,
+    `extract_skills` and `extract_experience`.
+    """
+
+    EXPERIENCE_RE = re.compile(r'(\d+)\s+(?:years|yrs|year)')
+
+    def __init__(self, skills=None, domain_synonyms=None, domain_keywords=None, degree_map=None):
+        self.skills = list(BASE_SKILLS if skills is None else skills)
+        self.domain_synonyms = DOMAIN_SYNONYMS if domain_synonyms is None else domain_synonyms
+        self.domain_keywords = DOMAIN_KEYWORDS if domain_keywords is None else domain_keywords
+        self.degree_map = DEGREE_MAP if degree_map is None else degree_map
+
+        terms = {skill.lower() for skill in self.skills}
+        for synonyms in self.domain_synonyms.values():
+            terms.update(skill.lower() for skill in synonyms)
+        for keywords in self.domain_keywords.values():
+            terms.update(keywords)
+        terms.update(self.degree_map.keys())
+
+        # The lookahead reports the longest term starting at each position;
+        # every other term starting there is one of its prefixes.
+        self._term_re = re.compile("(?=(" + _trie_pattern(terms) + "))")
+        self._contains = {t: [u for u in terms if u in t] for t in terms}
+
+    def find_terms(self, text_lower):
+        """Set of vocabulary terms that occur verbatim in `text_lower`."""
+        found = set()
+        for term in set(self._term_re.findall(text_lower)):
+            found.update(self._contains[term])
+        return found
+
+    def extract(self, text):
+        text_lower = lower_of(text)
+        found = self.find_terms(text_lower)
+        domain = self._domain(found)
+        return {
+            'domain': domain,
+            'degree': self._degree(text_lower, found),
+            'skills': self._skills(text_lower, found, domain),
+            'experience': self._experience(text_lower),
+        }
+
+    def extract_many(self, texts, workers=-1):
+        """
+        Batch version of `extract`. Fuzzy scores come from one
+        `rapidfuzz.process.cdist` call per domain group (skills) plus one for
+        degree keys, spread over `workers` threads (-1 = all cores).
+        """
+        texts_lower = [lower_of(t) for t in texts]
+        found = [self.find_terms(t) for t in texts_lower]
+        domains = [self._domain(f) for f in found]
+
+        # CVs of the same domain share one candidate skill list
+        groups = defaultdict(list)
+        for j, domain in enumerate(domains):
+            groups[domain].append(j)
+        skills = [None] * len(texts_lower)
+        for domain, rows in groups.items():
+            skill_candidates = set(self.skills)
+            if domain in self.domain_synonyms:
+                skill_candidates.update(self.domain_synonyms[domain])
+            skill_candidates = sorted(skill_candidates)
+            scores = process.cdist(
+                [skill.lower() for skill in skill_candidates], [texts_lower[j] for j in rows],
+                scorer=fuzz.partial_ratio, score_cutoff=70, workers=workers, dtype=np.float64
+            )
+            matched = scores >= 70
+            for col, j in enumerate(rows):
+                skills[j] = [skill for skill, hit in zip(skill_candidates, matched[:, col]) if hit]
+
+        # A verbatim degree key decides the degree; only the rest need fuzzy scores
+        degrees = [None] * len(texts_lower)
+        fuzzy_rows = []
+        for j, terms in enumerate(found):
+            degrees[j] = next((self.degree_map[key] for key in self.degree_map if key in terms), None)
+            if degrees[j] is None:
+                fuzzy_rows.append(j)
+        if fuzzy_rows:
+            degree_keys = list(self.degree_map)
+            scores = process.cdist(
+                degree_keys, [texts_lower[j] for j in fuzzy_rows],
+                scorer=fuzz.partial_ratio, score_cutoff=70, workers=workers, dtype=np.float64
+            )
+            for col, j in enumerate(fuzzy_rows):
+                best_match = None
+                best_score = 0
+                for key, score in zip(degree_keys, scores[:, col].tolist()):
+                    if score > best_score and score > 70:
+                        best_score = score
+                        best_match = key
+                degrees[j] = self.degree_map.get(best_match, "UNKNOWN")
+
+        return [
+            {
+                'domain': domains[j],
+                'degree': degrees[j],
+                'skills': skills[j],
+                'experience': self._experience(texts_lower[j]),
+            }
+            for j in range(len(texts_lower))
+        ]
+
+    def _domain(self, found):
+        domain_scores = {}
+        for domain, keywords in self.domain_keywords.items():
+            hits = sum(1 for kw in keywords if kw in found)
+            if hits:
+                domain_scores[domain] = hits
+        if not domain_scores:
+            return "General"
+        return max(domain_scores, key=domain_scores.get)
+
+    def _degree(self, text_lower, found):
+        # A verbatim key scores 100, which no later key can beat
+        for key in self.degree_map:
+            if key in found:
+                return self.degree_map[key]
+        best_match = None
+        best_score = 0
+        for key in self.degree_map:
+            score = fuzz.partial_ratio(key, text_lower, score_cutoff=70)
+            if score > best_score and score > 70:
+                best_score = score
+                best_match = key
+        return self.degree_map.get(best_match, "UNKNOWN")
+
+    def _skills(self, text_lower, found, domain):
+        skill_candidates = set(self.skills)
+        if domain and domain in self.domain_synonyms:
+            skill_candidates.update(self.domain_synonyms[domain])
+        found_skills = set()
+        for skill in skill_candidates:
+            skill_lower = skill.lower()
+            if skill_lower in found or fuzz.partial_ratio(skill_lower, text_lower, score_cutoff=70) >= 70:
+                found_skills.add(skill)
+        return sorted(found_skills)
+
+    def _experience(self, text_lower):
+        matches = self.EXPERIENCE_RE.findall(text_lower)
+        if matches:
+            return max(int(x) for x in matches)
+        return 0
+
+
+_extractor = CvFeatureExtractor()
+
+# Components noun_chunks depends on; anything else is disabled in batch runs
+KEYWORD_PIPES = ("tok2vec", "tagger", "attribute_ruler", "parser")
+
 def extract_keywords(text, top_n=20):
-    doc = nlp(text.lower())
+    doc = get_nlp()(text.lower())
+    return _keywords_from_doc(doc, top_n)
+
+def _keywords_from_doc(doc, top_n):
     keywords = []
     for chunk in doc.noun_chunks:
         if len(chunk.text.strip()) > 2 and not any(tok.is_stop for tok in chunk):
@@ -94,24 +299,81 @@ def extract_keywords(text, top_n=20):
     sorted_kw = sorted(freq.items(), key=lambda x: x[1], reverse=True)
     return [kw for kw, _ in sorted_kw[:top_n]]
 
+FEATURE_FIELDS = ("domain", "degree", "skills", "experience")
+
+@timed("parse_cv_text")
 def parse_cv_text(filename, text):
-    domain = detect_domain(text)
-    degree = extract_degree(text)
-    skills = extract_skills(text, domain)
-    experience = extract_experience(text)
+    """`text` may be a string or a Document; a Document keeps its features for reuse."""
+    if isinstance(text, Document) and text.features is not None:
+        features = text.features
+    else:
+        features = _extractor.extract(text)
+        if isinstance(text, Document):
+            text.features = features
+    return _parsed_cv(filename, text, features)
+
+@timed("parse_cv_texts")
+def parse_cv_texts(texts, filenames=None, workers=-1):
+    """
+    Parse a batch of CVs (strings or Documents). Returns the same dicts as
+    `parse_cv_text`, in order. Filenames default to cv_1, cv_2, ...
+    """
+    texts = list(texts)
+    if filenames is None:
+        filenames = [f"cv_{i+1}" for i in range(len(texts))]
+    elif len(filenames) != len(texts):
+        raise ValueError("filenames and texts must have the same length")
+
+    features = [t.features if isinstance(t, Document) else None for t in texts]
+    missing = [i for i, feats in enumerate(features) if feats is None]
+    if missing:
+        for i, feats in zip(missing, _extractor.extract_many([texts[i] for i in missing], workers)):
+            features[i] = feats
+            if isinstance(texts[i], Document):
+                texts[i].features = feats
+
+    return [_parsed_cv(filename, text, feats) for filename, text, feats in zip(filenames, texts, features)]
+
+def _parsed_cv(filename, text, features):
     return {
         'filename': filename,
-        'domain': domain,
-        'degree': degree,
-        'skills': skills,
-        'experience': experience,
-        'text': text
+        'domain': features['domain'],
+        'degree': features['degree'],
+        'skills': features['skills'],
+        'experience': features['experience'],
+        'text': text_of(text)
     }
 
+@timed("extract_requirements")
 def extract_requirements(jd_text):
     domain = detect_domain(jd_text)
     keywords = extract_keywords(jd_text, top_n=30)
     skills = extract_skills(jd_text, domain)
+    return _build_requirements(jd_text, domain, skills, keywords)
+
+@timed("extract_requirements_many")
+def extract_requirements_many(jd_texts, n_process=1, batch_size=32):
+    """
+    Batch version of `extract_requirements`, returning the same dicts in order.
+    JDs are streamed through `nlp.pipe` with every component that noun_chunks
+    does not need disabled; `n_process` > 1 uses spaCy's multiprocessing.
+    """
+    jd_texts = list(jd_texts)
+    nlp = get_nlp()
+    disable = [name for name in nlp.pipe_names if name not in KEYWORD_PIPES]
+    docs = nlp.pipe(
+        (text.lower() for text in jd_texts),
+        batch_size=batch_size, n_process=n_process, disable=disable
+    )
+    features = _extractor.extract_many(jd_texts)
+
+    requirements = []
+    for jd_text, doc, feats in zip(jd_texts, docs, features):
+        keywords = _keywords_from_doc(doc, top_n=30)
+        requirements.append(_build_requirements(jd_text, feats["domain"], feats["skills"], keywords))
+    return requirements
+
+def _build_requirements(jd_text, domain, skills, keywords):
     degrees = []
     for deg_key in DEGREE_MAP.keys():
         if fuzz.partial_ratio(deg_key, jd_text.lower()) > 70: